@@ -0,0 +1,85 @@
+"""Expert demonstrations (tracking bot or planner) and behavior-cloning warm starts."""
+
+import numpy as np
+import torch as th
+
+from pong_core import PongBatch, tracking_actions
+from trajectory import TrajectoryReader, TrajectoryWriter
+
+
+def generate_demonstrations(path, n_transitions, n_envs=2048, seed=None, frame_skip=1, fast_forward=False,
+                            expert=None):
+    """Play an expert on the right paddle of ``n_envs`` headless games.
+
+    ``expert(game)`` returns the actions for a ``PongBatch`` (by default the
+    tracking bot's, e.g. ``LookaheadPlanner.plan`` of ``game.snapshot()``).
+    The ``(obs, action)`` pairs are appended to ``path`` as a trajectory
+    recording, one env step at a time, so memory use does not grow with
+    ``n_transitions``. Returns the number of transitions written.
+    """
+    game = PongBatch(n_envs, seed, frame_skip=frame_skip, fast_forward=fast_forward)
+    writer = TrajectoryWriter(
+        path, (5,), (), {"frame_skip": frame_skip, "fast_forward": fast_forward},
+        chunk_records=max(4096, n_envs),
+    )
+    episodes = writer.new_episodes(n_envs)
+    steps = np.zeros(n_envs, dtype=np.uint32)
+    written = 0
+    try:
+        while written < n_transitions:
+            obs = game.obs.copy()
+            actions = tracking_actions(obs) if expert is None else expert(game)
+            done_idx = game.step(actions)
+            writer.append(episodes, steps, obs, actions, game.rewards, game.dones, False)
+            written += n_envs
+            steps += 1
+            if done_idx.size:
+                episodes[done_idx] = writer.new_episodes(done_idx.size)
+                steps[done_idx] = 0
+    finally:
+        writer.close()
+    return written
+
+
+def pretrain_policy(model, path, epochs=3, batch_size=4096, learning_rate=1e-3, verbose=1):
+    """Fit the actor of an SB3 ``model`` to the demonstrations in ``path``.
+
+    Minimizes the cross-entropy of the recorded actions under the policy,
+    with an optimizer of its own so PPO's optimizer state is untouched.
+    Returns the fraction of recorded actions the policy then picks greedily.
+    """
+    records = TrajectoryReader(path).records
+    obs = np.ascontiguousarray(records["obs"])
+    actions = records["action"].astype(np.int64)
+    policy = model.policy
+    device = policy.device
+    optimizer = th.optim.Adam(policy.parameters(), lr=learning_rate)
+    rng = np.random.default_rng(0)
+
+    policy.set_training_mode(True)
+    for epoch in range(epochs):
+        order = rng.permutation(len(actions))
+        total_loss = 0.0
+        for start in range(0, len(order), batch_size):
+            idx = np.sort(order[start:start + batch_size])
+            obs_batch = th.as_tensor(obs[idx], device=device)
+            action_batch = th.as_tensor(actions[idx], device=device)
+            loss = -policy.get_distribution(obs_batch).log_prob(action_batch).mean()
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * len(idx)
+        if verbose:
+            print(f"Behavior cloning epoch {epoch + 1}/{epochs}: loss {total_loss / len(order):.4f}")
+    policy.set_training_mode(False)
+
+    correct = 0
+    with th.no_grad():
+        for start in range(0, len(actions), batch_size):
+            distribution = policy.get_distribution(th.as_tensor(obs[start:start + batch_size], device=device))
+            predicted = distribution.mode().cpu().numpy()
+            correct += int((predicted == actions[start:start + batch_size]).sum())
+    accuracy = correct / max(1, len(actions))
+    if verbose:
+        print(f"Behavior cloning accuracy: {accuracy:.3f}")
+    return accuracy
@@ -0,0 +1,244 @@
+# benchmarks/run.py
+"""Throughput benchmarks for the Pong environments and PPO training.
+
+    python benchmarks/run.py run --out results.json
+    python benchmarks/run.py run --save-baseline
+    python benchmarks/run.py compare results.json
+
+Throughput depends on the machine, so the baseline is not committed:
+record it with ``--save-baseline`` on the machine the comparisons run on.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+import numpy as np
+
+BASELINE_PATH = os.path.join(PROJECT_ROOT, "benchmarks", "baseline.json")
+MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "ppo_pong_agent.zip")
+VEC_SIZES = (64, 512, 2048)
+
+
+def timed(fn, calls, repeats=3):
+    """Return the best seconds-per-call of ``fn`` over ``repeats`` runs."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def rate(value, unit):
+    """Result entry for a throughput figure."""
+    return {"value": value, "unit": unit, "higher_is_better": True}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unknown."""
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_single_env(results, quick):
+    from pong_env import PongEnv  # pylint: disable=import-outside-toplevel
+    env = PongEnv()
+    env.reset(seed=0)
+    actions = itertools.cycle(np.random.default_rng(0).integers(0, 3, size=4096).tolist())
+
+    def step():
+        _, _, terminated, _, _ = env.step(next(actions))
+        if terminated:
+            env.reset()
+
+    calls = 20_000 if quick else 200_000
+    results["single_env.step"] = rate(1 / timed(step, calls), "steps/s")
+    results["single_env.reset"] = rate(1 / timed(env.reset, calls // 10), "resets/s")
+
+
+def bench_render(results, quick):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from pong_env import PongEnv  # pylint: disable=import-outside-toplevel
+    env = PongEnv(render_mode="human")
+    # Do not let the frame limiter throttle the measurement
+    env.metadata = {**env.metadata, "render_fps": 0}
+    env.reset(seed=0)
+    env.render()
+    results["single_env.render"] = rate(1 / timed(env.render, 200 if quick else 2000), "frames/s")
+    env.close()
+
+    env = PongEnv(render_mode="rgb_array")
+    env.reset(seed=0)
+    env.render()
+    results["single_env.render_rgb_array"] = rate(
+        1 / timed(env.render, 200 if quick else 2000), "frames/s"
+    )
+    env.close()
+
+
+def bench_vec_envs(results, quick):
+    # pylint: disable=import-outside-toplevel
+    import gymnasium as gym
+    from stable_baselines3.common.vec_env import DummyVecEnv
+    import pong_env  # pylint: disable=unused-import  # Registers CustomPong-v0
+    from pong_vec_env import PongVecEnv
+
+    def make_env():
+        return gym.make("CustomPong-v0", render_mode=None, sound_enabled=False)
+
+    rng = np.random.default_rng(0)
+    for n_envs in VEC_SIZES:
+        actions = rng.integers(0, 3, size=n_envs)
+        for name, env in (
+            ("dummy_vec_env", DummyVecEnv([make_env for _ in range(n_envs)])),
+            ("pong_vec_env", PongVecEnv(n_envs, seed=0)),
+        ):
+            env.reset()
+            calls = max(5, (20_000 if quick else 200_000) // n_envs)
+            per_step = timed(lambda env=env, actions=actions: env.step(actions), calls)
+            results[f"{name}.{n_envs}.step"] = rate(n_envs / per_step, "steps/s")
+            env.close()
+
+
+def bench_ppo(results, quick):
+    # pylint: disable=import-outside-toplevel
+    from stable_baselines3 import PPO
+    from pong_vec_env import PongVecEnv
+
+    n_envs, n_steps = (64, 64) if quick else (2048, 256)
+    env = PongVecEnv(n_envs, seed=0)
+    model = PPO(
+        "MlpPolicy", env, device="cpu", seed=0,
+        n_steps=n_steps, batch_size=256, n_epochs=4,
+    )
+    per_iteration = n_envs * n_steps
+    start = time.perf_counter()
+    model.learn(total_timesteps=per_iteration)
+    elapsed = time.perf_counter() - start
+    results["ppo.iteration"] = rate(per_iteration / elapsed, "steps/s")
+    env.close()
+
+
+def bench_predict(results, quick):
+    if not os.path.exists(MODEL_PATH):
+        print(f"Skipping predict latency: {MODEL_PATH} not found.")
+        return
+    from stable_baselines3 import PPO  # pylint: disable=import-outside-toplevel
+    model = PPO.load(MODEL_PATH, device="cpu")
+    obs = np.array([[400, 300, 5, 5, 250]], dtype=np.float32)
+    per_call = timed(lambda: model.predict(obs, deterministic=True), 500 if quick else 5000)
+    results["policy.predict_latency"] = {
+        "value": per_call * 1e6, "unit": "us", "higher_is_better": False
+    }
+
+
+BENCHMARKS = {
+    "single_env": bench_single_env,
+    "render": bench_render,
+    "vec_env": bench_vec_envs,
+    "ppo": bench_ppo,
+    "predict": bench_predict,
+}
+
+
+def run(args):
+    results = {}
+    for name in args.only or BENCHMARKS:
+        print(f"Running {name}...")
+        BENCHMARKS[name](results, args.quick)
+    rss = peak_rss_mb()
+    if rss is not None:
+        results["process.peak_rss"] = {"value": rss, "unit": "MB", "higher_is_better": False}
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": args.quick,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    for name, result in results.items():
+        print(f"{name:<32} {result['value']:>14.1f} {result['unit']}")
+
+    paths = [args.out] if args.out else []
+    if args.save_baseline:
+        paths.append(BASELINE_PATH)
+    for path in paths:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {path}")
+
+
+def compare(args):
+    with open(args.results, encoding="utf-8") as f:
+        current = json.load(f)["results"]
+    if not os.path.exists(args.baseline):
+        sys.exit(f"No baseline at {args.baseline}; record one on this machine with "
+                 "'python benchmarks/run.py run --save-baseline'.")
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    regressions = 0
+    for name, base in baseline.items():
+        if name not in current:
+            continue
+        value = current[name]["value"]
+        change = (value - base["value"]) / base["value"]
+        if not base["higher_is_better"]:
+            change = -change
+        status = "ok"
+        if change < -args.tolerance:
+            status = "REGRESSION"
+            regressions += 1
+        print(f"{name:<32} {base['value']:>14.1f} -> {value:>14.1f} {base['unit']:<9}"
+              f" {change:+7.1%}  {status}")
+
+    if regressions:
+        print(f"{regressions} regression(s) beyond {args.tolerance:.0%}.")
+        sys.exit(1)
+    print("No regressions.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PongIA throughput benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--out", help="Write results to this JSON file")
+    run_parser.add_argument("--save-baseline", action="store_true",
+                            help=f"Also store results as {BASELINE_PATH}")
+    run_parser.add_argument("--quick", action="store_true", help="Short smoke-test run")
+    run_parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS),
+                            help="Run only these benchmarks")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = sub.add_parser("compare", help="Compare results against a baseline")
+    compare_parser.add_argument("results", help="Results JSON from 'run --out'")
+    compare_parser.add_argument("--baseline", default=BASELINE_PATH)
+    compare_parser.add_argument("--tolerance", type=float, default=0.10,
+                                help="Allowed relative slowdown (default 0.10)")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
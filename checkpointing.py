@@ -0,0 +1,223 @@
+"""Non-blocking, atomic model checkpointing with a retention policy."""
+
+import copy
+import glob
+import json
+import os
+import queue
+import re
+import threading
+import zipfile
+
+import torch as th
+import stable_baselines3 as sb3
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.save_util import data_to_json
+from stable_baselines3.common.utils import get_system_info
+
+
+class CheckpointError(RuntimeError):
+    """A background checkpoint write failed."""
+
+
+def snapshot_model(model):
+    """Capture everything ``model.save`` would write, detached from training.
+
+    Class data is serialized right away and all state dicts are deep-copied,
+    so training can go on while the snapshot is written.
+    """
+    data = model.__dict__.copy()
+    exclude = set(model._excluded_save_params())  # pylint: disable=protected-access
+    state_dicts_names, torch_variable_names = model._get_torch_save_params()  # pylint: disable=protected-access
+    for torch_var in state_dicts_names + torch_variable_names:
+        exclude.add(torch_var.split(".")[0])
+    for name in exclude:
+        data.pop(name, None)
+
+    pytorch_variables = {}
+    for name in torch_variable_names:
+        attr = model
+        for part in name.split("."):
+            attr = getattr(attr, part)
+        pytorch_variables[name] = copy.deepcopy(attr)
+
+    return {
+        "data": data_to_json(data),
+        "params": copy.deepcopy(model.get_parameters()),
+        "pytorch_variables": pytorch_variables,
+    }
+
+
+def write_snapshot(snapshot, path):
+    """Write ``snapshot`` as a regular SB3 model zip, atomically.
+
+    The archive is written to a temporary file next to ``path`` and renamed
+    over it, so an interrupted write never leaves a truncated model behind.
+    """
+    if not path.endswith(".zip"):
+        path += ".zip"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with zipfile.ZipFile(tmp_path, mode="w") as archive:
+            archive.writestr("data", snapshot["data"])
+            with archive.open("pytorch_variables.pth", mode="w", force_zip64=True) as f:
+                th.save(snapshot["pytorch_variables"], f)
+            for file_name, state_dict in snapshot["params"].items():
+                with archive.open(file_name + ".pth", mode="w", force_zip64=True) as f:
+                    th.save(state_dict, f)
+            archive.writestr("_stable_baselines3_version", sb3.__version__)
+            archive.writestr("system_info.txt", get_system_info(print_info=False)[1])
+        with open(tmp_path, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+class AsyncCheckpointCallback(BaseCallback):
+    """Periodic checkpoints written from a background thread.
+
+    Every ``save_freq`` environment steps (timesteps, not callback calls)
+    the model is snapshotted in memory and handed to a writer thread. Only
+    the newest ``keep_last`` checkpoints are kept, plus the ``keep_best``
+    highest-scoring ones when a score is reported through ``report_score``
+    (``EarlyStoppingCallback`` reports each evaluation's win rate) or
+    computed by ``score_fn(model)`` at snapshot time.
+    """
+
+    def __init__(self, save_freq, save_path, name_prefix="ppo_pong",
+                 keep_last=5, keep_best=1, score_fn=None, verbose=0):
+        super().__init__(verbose)
+        self.save_freq = save_freq
+        self.save_path = save_path
+        self.name_prefix = name_prefix
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.score_fn = score_fn
+        self._next_save = save_freq
+        self._last_queued = None  # (path, num_timesteps) of the last save_async
+        self._scores_path = os.path.join(save_path, f"{name_prefix}_scores.json")
+        self.scores = {}
+        if os.path.exists(self._scores_path):
+            with open(self._scores_path, encoding="utf-8") as f:
+                self.scores = json.load(f)
+
+        self._queue = queue.Queue(maxsize=1)
+        self._lock = threading.Lock()
+        self._error = None
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _init_callback(self):
+        os.makedirs(self.save_path, exist_ok=True)
+        self._next_save = (self.model.num_timesteps // self.save_freq + 1) * self.save_freq
+
+    def checkpoint_path(self, num_timesteps):
+        return os.path.join(self.save_path, f"{self.name_prefix}_{num_timesteps}_steps.zip")
+
+    def _on_step(self):
+        if self.num_timesteps >= self._next_save:
+            self._next_save += self.save_freq
+            path = self.checkpoint_path(self.num_timesteps)
+            if self.score_fn is not None:
+                score = self.score_fn(self.model)
+                if score is not None:
+                    self.report_score(path, score)
+            self.save_async(path)
+        return True
+
+    def save_async(self, path, prune=True):
+        """Snapshot the model now and write it to ``path`` in the background.
+
+        A second request for the same path within one step (say, a periodic
+        checkpoint and an evaluation landing together) is a no-op.
+        """
+        self._raise_writer_error()
+        if self._last_queued == (path, self.num_timesteps):
+            return
+        self._last_queued = (path, self.num_timesteps)
+        # Blocks only if the previous checkpoint is still being written
+        self._queue.put((snapshot_model(self.model), path, prune))
+
+    def save_now(self, path, model=None):
+        """Snapshot the model and write it to ``path`` before returning.
+
+        The model is written even if an earlier background write failed;
+        that error is raised afterwards.
+        """
+        self._queue.join()
+        write_snapshot(snapshot_model(model or self.model), path)
+        if self.verbose:
+            print(f"Saved model to {path}")
+        self._raise_writer_error()
+
+    def report_score(self, path, score):
+        """Record an evaluation ``score`` for the checkpoint at ``path``."""
+        with self._lock:
+            self.scores[os.path.basename(path)] = float(score)
+            self._save_scores()
+
+    def flush(self):
+        """Wait until every queued checkpoint is on disk."""
+        self._queue.join()
+        self._raise_writer_error()
+
+    def _on_training_end(self):
+        # Errors are left for save_now, so the final model still gets written
+        self._queue.join()
+
+    def _raise_writer_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise CheckpointError("Background checkpoint write failed") from error
+
+    def _write_loop(self):
+        while True:
+            snapshot, path, prune = self._queue.get()
+            try:
+                write_snapshot(snapshot, path)
+                if self.verbose:
+                    print(f"Saving model checkpoint to {path}")
+                if prune:
+                    self._prune()
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _prune(self):
+        """Delete checkpoints outside the retention policy."""
+        pattern = re.compile(re.escape(self.name_prefix) + r"_(\d+)_steps\.zip$")
+        found = []
+        for path in glob.glob(os.path.join(self.save_path, f"{self.name_prefix}_*_steps.zip")):
+            match = pattern.search(os.path.basename(path))
+            if match:
+                found.append((int(match.group(1)), path))
+        found.sort()
+
+        keep = {path for _, path in found[-self.keep_last:]} if self.keep_last > 0 else set()
+        with self._lock:
+            scored = [(s, name) for name, s in self.scores.items()]
+            scored.sort(reverse=True)
+            best = {name for _, name in scored[:self.keep_best]}
+            for _, path in found:
+                if path in keep or os.path.basename(path) in best:
+                    continue
+                os.remove(path)
+                # Drop a policy exported next to it (see numpy_policy.npz_path)
+                exported = os.path.splitext(path)[0] + ".npz"
+                if os.path.exists(exported):
+                    os.remove(exported)
+                self.scores.pop(os.path.basename(path), None)
+            self._save_scores()
+
+    def _save_scores(self):
+        """Write ``scores`` atomically (callers hold the lock)."""
+        os.makedirs(self.save_path, exist_ok=True)
+        tmp_path = self._scores_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.scores, f, indent=2)
+        os.replace(tmp_path, self._scores_path)
@@ -0,0 +1,326 @@
+"""Actor-learner PPO: rollout workers on any host feed one learner over TCP.
+
+Workers (``distributed_worker.run_worker``) step headless games with a
+NumPy copy of the current actor and send each finished rollout batch,
+zlib-compressed, to the learner. The learner (``DistributedPPO``) fills its rollout buffer
+from those batches instead of stepping envs itself, recomputes the values
+with its own critic and runs the usual PPO update. After every update the
+new actor weights go back to each worker with the reply to its next batch.
+
+Each batch carries the policy version it was collected with. A batch more
+than ``max_staleness`` updates old is dropped; the action log-probabilities
+it carries let PPO's clipped ratio correct for the ones that are kept.
+
+The wire format is in ``distributed_worker``.
+"""
+
+import queue
+import socket
+import socketserver
+import threading
+import time
+
+import numpy as np
+import torch as th
+from stable_baselines3 import PPO
+
+from distributed_worker import pack_arrays, recv_message, send_message, unpack_arrays
+from numpy_policy import actor_arrays
+
+
+BATCH_ARRAYS = ("obs", "actions", "rewards", "episode_starts", "log_probs", "last_obs", "last_dones")
+
+
+def batch_shapes(n_steps, num_envs, obs_shape):
+    """Exact shape of every array in a worker batch."""
+    shapes = {name: (n_steps, num_envs) for name in BATCH_ARRAYS}
+    shapes["obs"] = (n_steps, num_envs) + tuple(obs_shape)
+    shapes["last_obs"] = (num_envs,) + tuple(obs_shape)
+    shapes["last_dones"] = (num_envs,)
+    return shapes
+
+
+def _check_batch(header, arrays, shapes):
+    """Raise ValueError unless a worker batch has every field the learner reads.
+
+    ``shapes`` is ``batch_shapes(...)``; arrays must match it exactly and
+    hold bools or real numbers.
+    """
+    if not isinstance(header, dict):
+        raise ValueError("batch header is not an object")
+    for name in ("version", "steps", "collect_s"):
+        if not isinstance(header.get(name), (int, float)) or isinstance(header.get(name), bool):
+            raise ValueError(f"batch header lacks a number {name!r}")
+    for name, shape in shapes.items():
+        if name not in arrays:
+            raise ValueError(f"batch lacks {name!r}")
+        if arrays[name].shape != shape:
+            raise ValueError(f"batch {name!r} has shape {arrays[name].shape}, not {shape}")
+        if arrays[name].dtype.kind not in "biuf":
+            raise ValueError(f"batch {name!r} has dtype {arrays[name].dtype}")
+
+
+class WorkerStats:
+    """Counters of one worker connection, as seen by the learner."""
+
+    def __init__(self, worker_id, host):
+        self.worker_id = worker_id
+        self.host = host
+        self.connected = True
+        self.batches = 0
+        self.dropped = 0
+        self.steps = 0
+        self.collect_time = 0.0
+        self.staleness = 0
+        self.bytes = 0
+
+    def as_dict(self):
+        return {
+            "worker": self.worker_id,
+            "host": self.host,
+            "connected": self.connected,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "steps": self.steps,
+            "steps_per_s": self.steps / self.collect_time if self.collect_time else 0.0,
+            "staleness": self.staleness,
+            "mb_received": self.bytes / 2**20,
+        }
+
+
+class _WorkerHandler(socketserver.BaseRequestHandler):
+    """One worker connection: hand out the config, then take batches."""
+
+    def handle(self):
+        server = self.server.rollout_server
+        sock = self.request
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        stats = None
+        server.connections.add(sock)
+        try:
+            hello, _ = recv_message(sock)
+            if not isinstance(hello, dict):
+                raise ValueError("hello is not an object")
+            stats, seed = server.register(str(hello.get("host", self.client_address[0])))
+            version, header, payload = server.weights()
+            send_message(sock, dict(header, type="config", worker=stats.worker_id, seed=seed,
+                                    **server.config), payload)
+            while True:
+                header, payload = recv_message(sock)
+                arrays = unpack_arrays(payload, server.max_batch_bytes)
+                _check_batch(header, arrays, server.batch_shapes)
+                stats.bytes += len(payload) + len(header)
+                server.receive(stats, header, arrays)
+                latest, weights_header, weights = server.weights()
+                if latest != version:
+                    version = latest
+                    send_message(sock, dict(weights_header, type="weights"), weights)
+                else:
+                    send_message(sock, {"type": "ack", "version": version})
+        except (ConnectionError, OSError, ValueError):
+            pass  # Worker gone or sent garbage (dropped); its batches so far still count
+        finally:
+            server.connections.discard(sock)
+            if stats is not None:
+                stats.connected = False
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class RolloutServer:
+    """TCP endpoint of the learner: publishes weights, queues worker batches.
+
+    Every worker steps ``envs_per_worker`` games for ``n_steps`` steps per
+    batch, built with ``env_kwargs``; batches whose arrays do not match
+    ``batch_shapes`` (observations of ``obs_shape``) drop the worker. At most ``max_queue`` decoded batches
+    wait for the learner; past that, workers block on their reply, which
+    bounds both memory and how far ahead of the learner they get. About one
+    rollout's worth of batches keeps the learner busy without collecting
+    batches that go stale before they are used.
+    """
+
+    def __init__(self, host, port, n_steps, envs_per_worker=256, env_kwargs=None,
+                 max_staleness=1, max_queue=8, seed=None, obs_shape=(5,)):
+        self.config = {
+            "n_steps": n_steps,
+            "num_envs": envs_per_worker,
+            "env_kwargs": env_kwargs or {},
+        }
+        self.obs_shape = tuple(obs_shape)
+        self.batch_shapes = batch_shapes(n_steps, envs_per_worker, obs_shape)
+        # Largest decompressed batch: 8-byte elements plus the .npz headers
+        elements = sum(int(np.prod(shape)) for shape in self.batch_shapes.values())
+        self.max_batch_bytes = 8 * elements + (1 << 16)
+        self.envs_per_worker = envs_per_worker
+        self.max_staleness = max_staleness
+        self.batches = queue.Queue(max_queue)
+        self.workers = []
+        self.connections = set()
+        self.version = -1
+        self._seeds = np.random.SeedSequence(seed)
+        self._weights = None
+        self._lock = threading.Lock()
+        self._published = threading.Condition(self._lock)
+        self._server = _ThreadingServer((host, port), _WorkerHandler)
+        self._server.rollout_server = self
+        self.address = self._server.server_address
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def register(self, host):
+        """Add a worker; returns its ``WorkerStats`` and an env seed of its own."""
+        with self._lock:
+            stats = WorkerStats(len(self.workers), host)
+            self.workers.append(stats)
+            seed = int(self._seeds.spawn(1)[0].generate_state(1)[0])
+        return stats, seed
+
+    def publish(self, policy_arrays, activation):
+        """Make ``policy_arrays`` (from ``actor_arrays``) the next policy version."""
+        header = {"activation": activation}
+        payload = pack_arrays(policy_arrays)
+        with self._published:
+            self.version += 1
+            self._weights = (self.version, dict(header, version=self.version), payload)
+            self._published.notify_all()
+
+    def weights(self):
+        """``(version, header, payload)`` of the latest weights, waiting for the first."""
+        with self._published:
+            self._published.wait_for(lambda: self._weights is not None)
+            return self._weights
+
+    def receive(self, stats, header, arrays):
+        """Queue one batch (blocks while the queue is full)."""
+        stats.collect_time += header["collect_s"]
+        stats.steps += header["steps"]
+        stats.staleness = self.version - header["version"]
+        if stats.staleness > self.max_staleness:
+            stats.dropped += 1
+            return
+        stats.batches += 1
+        self.batches.put((header["version"], stats, arrays))
+
+    def next_batch(self):
+        """Next batch within the staleness bound: ``(version, stats, arrays)``."""
+        while True:
+            version, stats, arrays = self.batches.get()
+            if self.version - version <= self.max_staleness:
+                return version, stats, arrays
+            # Went stale while queued
+            stats.batches -= 1
+            stats.dropped += 1
+
+    def worker_stats(self):
+        return [stats.as_dict() for stats in self.workers]
+
+    def format_worker_stats(self):
+        lines = [f"{'worker':>6} {'host':>15} {'steps/s':>10} {'batches':>8} {'dropped':>8} {'stale':>6} {'MB':>8}"]
+        for s in self.worker_stats():
+            if s["connected"]:
+                lines.append(
+                    f"{s['worker']:>6} {s['host']:>15} {s['steps_per_s']:>10.0f} {s['batches']:>8}"
+                    f" {s['dropped']:>8} {s['staleness']:>6} {s['mb_received']:>8.1f}"
+                )
+        return "\n".join(lines)
+
+    def close(self):
+        """Stop accepting workers and disconnect the ones still running."""
+        self._server.shutdown()
+        self._server.server_close()
+        for sock in list(self.connections):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        # Unblock handlers waiting to queue a batch
+        while True:
+            try:
+                self.batches.get_nowait()
+            except queue.Empty:
+                break
+
+
+class DistributedPPO(PPO):
+    """PPO whose rollouts come from remote workers through a ``RolloutServer``.
+
+    Set ``rollout_server`` (also accepted by ``load``) before ``learn``;
+    without one it trains on its own env like plain PPO. The env passed to
+    the model only fixes the spaces and the rollout width: each rollout is
+    ``env.num_envs // envs_per_worker`` worker batches side by side.
+    Worker throughput, dropped batches and staleness are logged under
+    ``workers/``.
+    """
+
+    rollout_server = None
+
+    def _excluded_save_params(self):
+        return super()._excluded_save_params() + ["rollout_server"]
+
+    def collect_rollouts(self, env, callback, rollout_buffer, n_rollout_steps):
+        server = self.rollout_server
+        if server is None:
+            return super().collect_rollouts(env, callback, rollout_buffer, n_rollout_steps)
+        width = server.envs_per_worker
+        if server.config["n_steps"] != n_rollout_steps or env.num_envs % width:
+            raise ValueError(
+                f"workers collect {server.config['n_steps']} x {width} batches; "
+                f"the model needs {n_rollout_steps} steps x {env.num_envs} envs"
+            )
+        if server.obs_shape != env.observation_space.shape:
+            raise ValueError(f"workers send {server.obs_shape} observations; "
+                             f"the model needs {env.observation_space.shape}")
+
+        self.policy.set_training_mode(False)
+        rollout_buffer.reset()
+        server.publish(*actor_arrays(self))
+        callback.on_rollout_start()
+
+        wait_time = 0.0
+        staleness = []
+        last_values = th.zeros(env.num_envs, device=self.device)
+        dones = np.zeros(env.num_envs, dtype=bool)
+        for lo in range(0, env.num_envs, width):
+            start = time.perf_counter()
+            version, _, batch = server.next_batch()
+            wait_time += time.perf_counter() - start
+            staleness.append(server.version - version)
+            cols = slice(lo, lo + width)
+            obs = batch["obs"]
+            rollout_buffer.observations[:, cols] = obs
+            rollout_buffer.actions[:, cols, 0] = batch["actions"]
+            rollout_buffer.rewards[:, cols] = batch["rewards"]
+            rollout_buffer.episode_starts[:, cols] = batch["episode_starts"]
+            rollout_buffer.log_probs[:, cols] = batch["log_probs"]
+            with th.no_grad():
+                values = self.policy.predict_values(th.as_tensor(obs.reshape(-1, *obs.shape[2:]), device=self.device))
+                rollout_buffer.values[:, cols] = values.cpu().numpy().reshape(obs.shape[:2])
+                last_values[cols] = self.policy.predict_values(
+                    th.as_tensor(batch["last_obs"], device=self.device)
+                ).flatten()
+            dones[cols] = batch["last_dones"]
+
+            self.num_timesteps += obs.shape[0] * obs.shape[1]
+            callback.update_locals(locals())
+            if not callback.on_step():
+                return False
+
+        rollout_buffer.pos = rollout_buffer.buffer_size
+        rollout_buffer.full = True
+        rollout_buffer.compute_returns_and_advantage(last_values=last_values, dones=dones)
+
+        workers = [s for s in server.worker_stats() if s["connected"]]
+        self.logger.record("workers/connected", len(workers))
+        self.logger.record("workers/steps_per_s", sum(s["steps_per_s"] for s in workers))
+        self.logger.record("workers/dropped_batches", sum(s["dropped"] for s in server.worker_stats()))
+        self.logger.record("workers/mean_staleness", float(np.mean(staleness)))
+        self.logger.record("workers/learner_wait_s", wait_time)
+        if self.verbose >= 2:
+            print(server.format_worker_stats())
+
+        callback.update_locals(locals())
+        callback.on_rollout_end()
+        return True
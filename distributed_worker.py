@@ -0,0 +1,150 @@
+"""Rollout worker side of the actor-learner PPO in ``distributed``.
+
+Kept apart from the learner so a worker machine needs neither torch nor
+stable-baselines3: games are stepped as a ``PongBatch`` and the actor runs
+in NumPy.
+
+Wire format: every message is a ``<II`` header (JSON length, payload
+length), a JSON header and an optional payload, a zlib-compressed ``.npz``.
+Nothing is unpickled, so a stray connection cannot run code on the learner.
+"""
+
+import io
+import json
+import signal
+import socket
+import struct
+import time
+import zipfile
+import zlib
+
+import numpy as np
+
+from numpy_policy import NumpyPolicy
+from pong_core import PongBatch
+
+MAX_MESSAGE = 1 << 30  # Largest payload accepted, in bytes
+COMPRESS_LEVEL = 1     # zlib level: fast, still shrinks observations ~3x
+
+
+def pack_arrays(arrays):
+    """Compressed ``.npz`` bytes of a dict of arrays."""
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return zlib.compress(buffer.getvalue(), COMPRESS_LEVEL)
+
+
+def unpack_arrays(payload, max_size=MAX_MESSAGE):
+    """Inverse of ``pack_arrays``; raises ValueError on a corrupt payload.
+
+    A payload that inflates beyond ``max_size`` bytes is rejected before
+    the rest of it is decompressed.
+    """
+    try:
+        inflater = zlib.decompressobj()
+        raw = inflater.decompress(payload, max_size)
+        if inflater.unconsumed_tail:
+            raise ValueError(f"array payload inflates beyond {max_size} bytes")
+        with np.load(io.BytesIO(raw), allow_pickle=False) as data:
+            return {name: data[name] for name in data.files}
+    except (zlib.error, zipfile.BadZipFile, OSError, EOFError) as error:
+        raise ValueError("corrupt array payload") from error
+
+
+def send_message(sock, header, payload=b""):
+    data = json.dumps(header).encode()
+    sock.sendall(struct.pack("<II", len(data), len(payload)) + data + payload)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock):
+    """Return ``(header, payload)`` of the next message on ``sock``."""
+    header_size, payload_size = struct.unpack("<II", _recv_exactly(sock, 8))
+    if header_size > 1 << 16 or payload_size > MAX_MESSAGE:
+        raise ConnectionError("message too large")
+    header = json.loads(_recv_exactly(sock, header_size))
+    return header, _recv_exactly(sock, payload_size)
+
+
+def _sample(policy, obs):
+    """Sampled actions and their log-probabilities under ``policy``."""
+    logits = policy.logits(obs).astype(np.float64)
+    logits -= logits.max(axis=1, keepdims=True)
+    log_probs = logits - np.log(np.exp(logits).sum(axis=1, keepdims=True))
+    actions = (log_probs + policy.np_random.gumbel(size=log_probs.shape)).argmax(axis=1)
+    return actions, log_probs[np.arange(len(actions)), actions].astype(np.float32)
+
+
+def run_worker(host, port, verbose=1):
+    """Collect rollouts for the learner at ``host:port`` until it goes away.
+
+    Needs neither torch nor a display: the actor runs in NumPy. Returns the
+    number of batches sent.
+    """
+    sock = socket.create_connection((host, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sent = 0
+    try:
+        send_message(sock, {"type": "hello", "host": socket.gethostname()})
+        config, payload = recv_message(sock)
+        n_steps, num_envs = config["n_steps"], config["num_envs"]
+        policy = NumpyPolicy.from_arrays(unpack_arrays(payload), config["activation"])
+        policy.np_random = np.random.default_rng(config["seed"])
+        version = config["version"]
+        game = PongBatch(num_envs, seed=config["seed"], **config["env_kwargs"])
+        if verbose:
+            print(f"Worker {config['worker']}: {num_envs} envs x {n_steps} steps per batch")
+
+        obs = game.obs
+        dones = np.ones(num_envs, dtype=bool)
+        batch = {
+            "obs": np.zeros((n_steps,) + obs.shape, dtype=np.float32),
+            "actions": np.zeros((n_steps, num_envs), dtype=np.uint8),
+            "rewards": np.zeros((n_steps, num_envs), dtype=np.float32),
+            "episode_starts": np.zeros((n_steps, num_envs), dtype=bool),
+            "log_probs": np.zeros((n_steps, num_envs), dtype=np.float32),
+        }
+        while True:
+            start = time.perf_counter()
+            for t in range(n_steps):
+                actions, log_probs = _sample(policy, obs)
+                batch["obs"][t] = obs
+                batch["actions"][t] = actions
+                batch["log_probs"][t] = log_probs
+                batch["episode_starts"][t] = dones
+                game.step(actions)
+                dones = game.dones
+                batch["rewards"][t] = game.rewards
+            collect_time = time.perf_counter() - start
+            payload = pack_arrays(dict(batch, last_obs=obs, last_dones=dones))
+            send_message(sock, {"type": "batch", "version": version, "steps": n_steps * num_envs,
+                                "collect_s": collect_time}, payload)
+            sent += 1
+            reply, payload = recv_message(sock)
+            if reply["type"] == "weights":
+                rng = policy.np_random
+                policy = NumpyPolicy.from_arrays(unpack_arrays(payload), reply["activation"])
+                policy.np_random = rng
+                version = reply["version"]
+    except ConnectionError:
+        if verbose:
+            print(f"Learner closed the connection after {sent} batches.")
+    finally:
+        sock.close()
+    return sent
+
+
+def worker_process(host, port, verbose=0):
+    """``run_worker`` for a child process; Ctrl+C is left to the parent."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    run_worker(host, port, verbose)
@@ -0,0 +1,128 @@
+"""Episode statistics for batched Pong VecEnvs, logged to TensorBoard.
+
+SB3's ``Monitor`` wraps one env and does Python work on every step; with
+thousands of games per VecEnv that adds up. ``VecEpisodeTracker`` keeps
+the running totals of all games in NumPy arrays instead and only touches
+Python objects for the few games that finished.
+"""
+
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.vec_env import VecEnvWrapper
+
+
+class VecEpisodeTracker(VecEnvWrapper):
+    """Accumulate return, length, paddle hits and outcome of every episode.
+
+    Wraps a Pong VecEnv (it reads the env's ``hits``). Finished episodes go
+    into ring buffers holding the last ``window`` of them; ``summarize``
+    averages those. An episode is won or lost when its last reward is a
+    point for or against the agent, and neither when it was truncated.
+    """
+
+    def __init__(self, venv, window=1000):
+        super().__init__(venv)
+        n = venv.num_envs
+        self._returns = np.zeros(n)
+        self._lengths = np.zeros(n, dtype=np.int64)
+        self._hits = np.zeros(n, dtype=np.int64)
+        self.window = window
+        self.ep_returns = np.zeros(window)
+        self.ep_lengths = np.zeros(window, dtype=np.int64)
+        self.ep_hits = np.zeros(window, dtype=np.int64)
+        self.ep_outcomes = np.zeros(window, dtype=np.int8)  # +1 won, -1 lost, 0 truncated
+        self.episodes = 0  # Finished since creation; the window holds the last min(episodes, window)
+
+    def reset(self):
+        self._returns[:] = 0
+        self._lengths[:] = 0
+        self._hits[:] = 0
+        return self.venv.reset()
+
+    def step_wait(self):
+        obs, rewards, dones, infos = self.venv.step_wait()
+        self._returns += rewards
+        self._lengths += 1
+        self._hits += self.venv.hits
+        done_idx = np.flatnonzero(dones)
+        if done_idx.size:
+            kept = done_idx[-self.window:]  # More games than the window can finish at once
+            self.episodes += done_idx.size - kept.size
+            self._finish(kept, rewards, infos)
+            self._returns[done_idx] = 0
+            self._lengths[done_idx] = 0
+            self._hits[done_idx] = 0
+        return obs, rewards, dones, infos
+
+    def _finish(self, done_idx, rewards, infos):
+        """Move the totals of the games in ``done_idx`` into the window."""
+        truncated = np.array([infos[i].get("TimeLimit.truncated", False) for i in done_idx])
+        slots = (self.episodes + np.arange(done_idx.size)) % self.window
+        self.ep_returns[slots] = self._returns[done_idx]
+        self.ep_lengths[slots] = self._lengths[done_idx]
+        self.ep_hits[slots] = self._hits[done_idx]
+        self.ep_outcomes[slots] = np.where(truncated, 0, np.sign(rewards[done_idx]))
+        self.episodes += done_idx.size
+
+    def recent(self):
+        """Returns, lengths, hits and outcomes of the episodes in the window."""
+        n = min(self.episodes, self.window)
+        return self.ep_returns[:n], self.ep_lengths[:n], self.ep_hits[:n], self.ep_outcomes[:n]
+
+
+def find_trackers(env):
+    """Every ``VecEpisodeTracker`` in ``env``'s wrapper stack or env groups."""
+    trackers = []
+    while env is not None:
+        if isinstance(env, VecEpisodeTracker):
+            trackers.append(env)
+        for group in getattr(env, "groups", ()):
+            trackers += find_trackers(group)
+        env = getattr(env, "venv", None)
+    return trackers
+
+
+def summarize(trackers):
+    """Rolling averages over the windows of ``trackers`` (None before any episode ends)."""
+    recent = [tracker.recent() for tracker in trackers]
+    returns, lengths, hits, outcomes = (np.concatenate(column) for column in zip(*recent))
+    if not returns.size:
+        return None
+    points = np.count_nonzero(outcomes)
+    return {
+        "episodes": sum(tracker.episodes for tracker in trackers),
+        "ep_rew_mean": float(returns.mean()),
+        "ep_len_mean": float(lengths.mean()),
+        "hits_mean": float(hits.mean()),
+        "win_rate": float((outcomes > 0).sum() / points) if points else 0.0,
+        "truncated_frac": float(1 - points / outcomes.size),
+    }
+
+
+class EpisodeStatsCallback(BaseCallback):
+    """Log the rolling episode statistics under ``episode/`` every ``log_freq`` env steps.
+
+    Uses the ``VecEpisodeTracker``s found in the training env (including
+    the groups of a ``GroupedVecEnv``). Values are recorded for the next
+    logger dump, at the end of the PPO iteration.
+    """
+
+    def __init__(self, log_freq=100_000, verbose=0):
+        super().__init__(verbose)
+        self.log_freq = log_freq
+        self._trackers = []
+        self._next_log = 0
+
+    def _init_callback(self):
+        self._trackers = find_trackers(self.training_env)
+        self._next_log = self.num_timesteps + self.log_freq
+
+    def _on_step(self):
+        if self.num_timesteps < self._next_log or not self._trackers:
+            return True
+        self._next_log = self.num_timesteps + self.log_freq
+        summary = summarize(self._trackers)
+        if summary is not None:
+            for name, value in summary.items():
+                self.logger.record(f"episode/{name}", value)
+        return True
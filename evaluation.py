@@ -0,0 +1,131 @@
+"""Headless batched evaluation against the tracking bot, and early stopping."""
+
+import os
+import time
+
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+
+from numpy_policy import NumpyPolicy, actor_arrays
+from pong_core import PongBatch
+
+
+def evaluate(policy, n_envs, steps, seed, **game_kwargs):
+    """Play ``policy`` against the tracking bot for ``steps`` batched steps.
+
+    ``game_kwargs`` are ``PongBatch`` step options (frame skip...). Returns
+    ``(win_rate, avg_point_frames)`` over the points finished; points still
+    running at the end are not counted.
+    """
+    game = PongBatch(n_envs, seed, **game_kwargs)
+    rally = np.zeros(n_envs, dtype=np.int64)
+    wins = points = rally_frames = 0
+    for _ in range(steps):
+        actions, _ = policy.predict(game.obs)
+        done_idx = game.step(actions)
+        rally += game.frames
+        if done_idx.size:
+            wins += int((game.rewards[done_idx] > 0).sum())
+            points += done_idx.size
+            rally_frames += int(rally[done_idx].sum())
+            rally[done_idx] = 0
+    if not points:
+        return 0.0, float(rally.mean())
+    return wins / points, rally_frames / points
+
+
+class EarlyStoppingCallback(BaseCallback):
+    """Evaluate the policy every ``eval_freq`` env steps and stop when it plateaus.
+
+    The actor is copied into a ``NumpyPolicy`` and plays deterministically
+    against the tracking bot on ``n_envs`` headless games for ``eval_steps``
+    steps, always from the same ``seed`` so evaluations compare. Win rate
+    and average point length go to TensorBoard under ``eval/``. A better
+    win rate (by more than ``min_delta``) saves ``best_model_path``; while
+    no point has been won yet, longer points count as better, since the
+    agent learns to return the ball before it learns to score.
+
+    Training stops once the win rate reaches ``target_win_rate`` or after
+    ``patience`` evaluations without improvement (None disables either).
+    With ``checkpoints``, an ``AsyncCheckpointCallback``, every evaluation
+    also saves a numbered checkpoint scored by its win rate, so the
+    callback's ``keep_best`` retention keeps the best evaluated ones, and
+    all models are written by its background thread.
+    """
+
+    def __init__(self, eval_freq, best_model_path, n_envs=512, eval_steps=2000,
+                 target_win_rate=None, patience=None, min_delta=0.0, game_kwargs=None,
+                 checkpoints=None, seed=0, verbose=1):
+        super().__init__(verbose)
+        self.eval_freq = eval_freq
+        self.best_model_path = best_model_path
+        self.n_envs = n_envs
+        self.eval_steps = eval_steps
+        self.target_win_rate = target_win_rate
+        self.patience = patience
+        self.min_delta = min_delta
+        self.game_kwargs = game_kwargs or {}
+        self.checkpoints = checkpoints
+        self.seed = seed
+        self.best = None  # (win_rate, avg_point_frames) of the best evaluation
+        self.evaluations = []
+        self.stale_evaluations = 0
+        self.stop_reason = None
+        self._next_eval = eval_freq
+
+    def _init_callback(self):
+        os.makedirs(os.path.dirname(self.best_model_path) or ".", exist_ok=True)
+        self._next_eval = (self.model.num_timesteps // self.eval_freq + 1) * self.eval_freq
+
+    def _improved(self, win_rate, point_frames):
+        if self.best is None:
+            return True
+        best_win_rate, best_frames = self.best
+        if best_win_rate == 0 and win_rate == 0:
+            return point_frames > best_frames
+        return win_rate > best_win_rate + self.min_delta
+
+    def _on_step(self):
+        if self.num_timesteps < self._next_eval:
+            return True
+        self._next_eval += self.eval_freq
+
+        start = time.perf_counter()
+        policy = NumpyPolicy.from_arrays(*actor_arrays(self.model))
+        win_rate, point_frames = evaluate(
+            policy, self.n_envs, self.eval_steps, self.seed, **self.game_kwargs
+        )
+        eval_time = time.perf_counter() - start
+        self.evaluations.append((self.num_timesteps, win_rate, point_frames))
+        self.logger.record("eval/win_rate", win_rate)
+        self.logger.record("eval/point_frames", point_frames)
+        self.logger.record("eval/time_s", eval_time)
+
+        if self.checkpoints is not None:
+            path = self.checkpoints.checkpoint_path(self.num_timesteps)
+            self.checkpoints.report_score(path, win_rate)
+            self.checkpoints.save_async(path)
+
+        if self._improved(win_rate, point_frames):
+            self.best = (win_rate, point_frames)
+            self.stale_evaluations = 0
+            if self.checkpoints is not None:
+                self.checkpoints.save_async(self.best_model_path, prune=False)
+            else:
+                self.model.save(self.best_model_path)
+        else:
+            self.stale_evaluations += 1
+        self.logger.record("eval/best_win_rate", self.best[0])
+        if self.verbose:
+            print(f"Eval at {self.num_timesteps:,} steps: win rate {win_rate:.3f}, "
+                  f"{point_frames:.0f} frames per point ({eval_time:.1f}s)")
+
+        if self.target_win_rate is not None and win_rate >= self.target_win_rate:
+            self.stop_reason = f"win rate {win_rate:.3f} reached the target {self.target_win_rate}"
+        elif self.patience is not None and self.stale_evaluations >= self.patience:
+            self.stop_reason = f"no improvement in {self.patience} evaluations"
+        if self.stop_reason is None:
+            return True
+        if self.verbose:
+            print(f"Stopping early: {self.stop_reason}")
+        return False
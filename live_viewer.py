@@ -0,0 +1,114 @@
+"""Shared-memory policy weights and a viewer process that plays with them."""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from numpy_policy import NumpyPolicy
+
+HEADER_BYTES = 8  # int64 version counter
+
+
+class SharedPolicyWeights:
+    """Actor weights in a shared-memory block, guarded by a version counter.
+
+    The writer bumps the version to an odd number, copies the weights in,
+    then bumps it to the next even number. Readers retry until they see the
+    same even version before and after copying, so they never act on a
+    half-written policy and the writer never waits for them.
+    """
+
+    def __init__(self, layout, activation, name=None):
+        self.layout = layout          # [(array name, shape), ...]
+        self.activation = activation
+        sizes = [int(np.prod(shape)) for _, shape in layout]
+        self._offsets = np.cumsum([0] + sizes)
+        nbytes = HEADER_BYTES + 4 * int(self._offsets[-1])
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self._version = np.ndarray((1,), dtype=np.int64, buffer=self._shm.buf)
+        self._flat = np.ndarray(
+            (int(self._offsets[-1]),), dtype=np.float32, buffer=self._shm.buf, offset=HEADER_BYTES
+        )
+        if self._owner:
+            self._version[0] = 0
+
+    @classmethod
+    def for_arrays(cls, arrays, activation):
+        """Create a block sized for ``arrays`` (as returned by ``actor_arrays``)."""
+        return cls([(name, a.shape) for name, a in arrays.items()], activation)
+
+    def attach_args(self):
+        """Arguments that let another process attach to this block."""
+        return self.layout, self.activation, self._shm.name
+
+    @property
+    def version(self):
+        return int(self._version[0])
+
+    def publish(self, arrays):
+        """Copy new weights in and bump the version."""
+        self._version[0] += 1
+        for k, (name, _) in enumerate(self.layout):
+            self._flat[self._offsets[k]:self._offsets[k + 1]] = arrays[name].ravel()
+        self._version[0] += 1
+
+    def read(self):
+        """Return ``(version, policy)`` or ``(version, None)`` if nothing was published yet."""
+        while True:
+            before = self.version
+            if before == 0:
+                return 0, None
+            if before % 2:
+                continue
+            flat = self._flat.copy()
+            if self.version == before:
+                break
+        arrays = {}
+        for k, (name, shape) in enumerate(self.layout):
+            arrays[name] = flat[self._offsets[k]:self._offsets[k + 1]].reshape(shape)
+        return before, NumpyPolicy.from_arrays(arrays, self.activation)
+
+    def close(self):
+        del self._version, self._flat
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def run_viewer(attach_args, stop_event, sound_enabled=True):
+    """Play a rendered demo game with the newest published weights at 60 FPS.
+
+    Runs until ``stop_event`` is set; closing the window sets it.
+    """
+    # pylint: disable=import-outside-toplevel
+    import signal
+    from pong_env import PongEnv
+
+    # Ctrl+C goes to the trainer, which then stops the viewer
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    weights = SharedPolicyWeights(*attach_args)
+    env = PongEnv(render_mode="human", sound_enabled=sound_enabled)
+    obs, _ = env.reset()
+    version, policy = 0, None
+    try:
+        while not stop_event.is_set():
+            if weights.version != version:
+                version, policy = weights.read()
+            action = 0
+            if policy is not None:
+                action, _ = policy.predict(obs, deterministic=False)
+            obs, _, terminated, truncated, _ = env.step(int(action))
+            env.render()
+            if terminated or truncated:
+                obs, _ = env.reset()
+    except SystemExit:
+        # Window closed
+        stop_event.set()
+    finally:
+        env.close()
+        weights.close()
@@ -0,0 +1,230 @@
+"""Many human-vs-AI matches served from one process over localhost TCP.
+
+Every live match is a row of one two-player ``PongBatch``: the human plays
+the left paddle, the AI the right one. Each tick the server steps every
+live match at once, runs one batched ``predict`` for all the AI paddles and
+sends each client only the state fields that changed. The batch holds only
+the live matches; it is rebuilt from state snapshots when one starts or
+ends, so a tick costs what the current load needs, not the capacity.
+
+Wire format (all integers little-endian):
+
+* server -> client on connect: ``b"PONG"`` and the uint16 slot, or
+  ``b"FULL"`` when every slot is taken;
+* server -> client each tick: a bitmask byte over ``STATE_FIELDS`` followed
+  by one int16 per set bit, in field order;
+* client -> server: one byte per key change, the paddle action
+  (0 stay, 1 up, 2 down).
+"""
+
+import asyncio
+import struct
+import time
+
+import numpy as np
+
+from pong_core import PongBatch
+
+STATE_FIELDS = ("ball_x", "ball_y", "player_y", "opponent_y", "player_score", "opponent_score")
+TICK_RATE = 60
+MAX_BACKLOG = 64 * 1024  # Bytes queued for a client before it is dropped
+HELLO = b"PONG"
+FULL = b"FULL"
+
+
+def decode_deltas(buffer, state):
+    """Apply every complete delta in ``buffer`` to ``state`` (a list of ints).
+
+    Returns the unconsumed tail of ``buffer`` and the number of deltas applied.
+    """
+    offset = 0
+    applied = 0
+    while offset < len(buffer):
+        mask = buffer[offset]
+        fields = [k for k in range(len(STATE_FIELDS)) if mask >> k & 1]
+        end = offset + 1 + 2 * len(fields)
+        if end > len(buffer):
+            break
+        values = struct.unpack_from(f"<{len(fields)}h", buffer, offset + 1)
+        for k, value in zip(fields, values):
+            state[k] = value
+        offset = end
+        applied += 1
+    return buffer[offset:], applied
+
+
+class MatchServer:
+    """Host up to ``max_matches`` matches against ``policy``.
+
+    ``policy`` has the usual ``predict(obs) -> (actions, state)``; it sees
+    the right paddle's observations of all active matches as one batch.
+    ``stats()`` reports per-tick timings: the work done in a tick (physics,
+    inference, encoding and sends) and how late ticks start.
+    """
+
+    def __init__(self, policy, max_matches=1024, tick_rate=TICK_RATE, seed=None):
+        self.policy = policy
+        self.max_matches = max_matches
+        self.tick = 1.0 / tick_rate
+        self.np_random = np.random.default_rng(seed)
+        self.game = None   # Live matches only, in slot order
+        self.rows = np.zeros(0, dtype=np.int64)  # Slot of each game row
+        self.ai_actions = np.zeros(max_matches, dtype=np.int64)
+        self.human_actions = np.zeros(max_matches, dtype=np.int64)
+        self.state = np.zeros((max_matches, len(STATE_FIELDS)), dtype=np.int16)
+        self.sent = np.zeros_like(self.state)
+        self.writers = [None] * max_matches
+        self.active = np.zeros(max_matches, dtype=bool)
+        self.bits = (1 << np.arange(len(STATE_FIELDS))).astype(np.uint8)
+        self.tick_times = []
+        self.inference_times = []
+        self.lateness = []
+        self.ticks = 0
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self, report_every=5.0, duration=None):
+        """Run the tick loop, printing ``stats()`` every ``report_every`` seconds."""
+        start = next_tick = next_report = time.perf_counter()
+        while duration is None or next_tick - start < duration:
+            next_tick += self.tick
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            now = time.perf_counter()
+            self.lateness.append(max(0.0, now - next_tick))
+            self.step()
+            self.tick_times.append(time.perf_counter() - now)
+            if report_every and now >= next_report + report_every:
+                next_report = now
+                print(self.format_stats())
+                self.reset_stats()
+
+    def close(self):
+        for writer in self.writers:
+            if writer is not None:
+                writer.close()
+        if self._server is not None:
+            self._server.close()
+
+    async def _handle_client(self, reader, writer):
+        free = np.flatnonzero(~self.active)
+        if free.size == 0:
+            writer.write(FULL)
+            writer.close()
+            return
+        slot = int(free[0])
+        self.human_actions[slot] = 0
+        self.sent[slot] = np.iinfo(np.int16).min  # First delta carries every field
+        self.writers[slot] = writer
+        self.active[slot] = True
+        writer.write(HELLO + struct.pack("<H", slot))
+        try:
+            while True:
+                data = await reader.read(64)
+                if not data:
+                    break
+                action = data[-1]
+                if action <= 2:
+                    self.human_actions[slot] = action
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Disconnected, or the server is shutting down
+        finally:
+            self.active[slot] = False
+            self.writers[slot] = None
+            writer.close()
+
+    def _resize(self, active):
+        """Rebuild the batch for the live slots ``active``; new matches start fresh."""
+        game = PongBatch(active.size, self.np_random, two_player=True)
+        kept = np.isin(active, self.rows)
+        if self.game is not None and kept.any():
+            game.restore(self.game.snapshot(np.searchsorted(self.rows, active[kept])), np.flatnonzero(kept))
+        self.game = game
+        self.rows = active
+
+    def step(self):
+        """Advance every live match one tick and send the deltas."""
+        active = np.flatnonzero(self.active)
+        if active.size == 0:
+            return
+        if not np.array_equal(active, self.rows):
+            self._resize(active)
+        game = self.game
+        start = time.perf_counter()
+        actions, _ = self.policy.predict(game.obs, deterministic=True)
+        self.inference_times.append(time.perf_counter() - start)
+        self.ai_actions[active] = actions
+        game.step(self.ai_actions[active], self.human_actions[active])
+        self.ticks += 1
+
+        state = self.state
+        for k, name in enumerate(STATE_FIELDS):
+            state[active, k] = getattr(game, name)
+        changed = state[active] != self.sent[active]
+        masks = (changed * self.bits).sum(axis=1)
+        self.sent[active] = state[active]
+        for slot, mask, fields in zip(active, masks, changed):
+            writer = self.writers[slot]
+            if writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                writer.close()  # Too slow to keep up; the reader loop frees the slot
+                continue
+            writer.write(bytes((mask,)) + state[slot, fields].tobytes())
+
+    def stats(self):
+        """Tick work, inference and lateness percentiles in milliseconds."""
+        result = {"matches": int(self.active.sum()), "ticks": self.ticks}
+        for name, samples in (("tick", self.tick_times), ("inference", self.inference_times),
+                              ("late", self.lateness)):
+            if samples:
+                ms = np.array(samples) * 1000
+                result[f"{name}_p50_ms"] = float(np.percentile(ms, 50))
+                result[f"{name}_p99_ms"] = float(np.percentile(ms, 99))
+        return result
+
+    def format_stats(self):
+        s = self.stats()
+        return (f"{s['matches']} matches | tick {s.get('tick_p50_ms', 0):.2f}/{s.get('tick_p99_ms', 0):.2f} ms"
+                f" | inference {s.get('inference_p50_ms', 0):.2f}/{s.get('inference_p99_ms', 0):.2f} ms"
+                f" | late {s.get('late_p50_ms', 0):.2f}/{s.get('late_p99_ms', 0):.2f} ms (p50/p99)")
+
+    def reset_stats(self):
+        self.tick_times.clear()
+        self.inference_times.clear()
+        self.lateness.clear()
+
+
+async def bot_client(host, port, duration, seed=None):
+    """Headless load-test client: random keys, decodes every delta.
+
+    Returns the number of deltas received, or None if the server was full.
+    """
+    rng = np.random.default_rng(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    hello = await reader.readexactly(4)
+    if hello != HELLO:
+        writer.close()
+        return None
+    await reader.readexactly(2)
+    state = [0] * len(STATE_FIELDS)
+    buffer = b""
+    received = 0
+    end = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < end:
+            try:
+                data = await asyncio.wait_for(reader.read(4096), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            if not data:
+                break
+            buffer, applied = decode_deltas(buffer + data, state)
+            received += applied
+            if rng.random() < 0.1:
+                writer.write(bytes((int(rng.integers(3)),)))
+    finally:
+        writer.close()
+    return received
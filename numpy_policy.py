@@ -0,0 +1,222 @@
+"""Torch-free inference for trained PPO MlpPolicy actors."""
+
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+ACTIVATIONS = {
+    "Tanh": np.tanh,
+    "ReLU": lambda x: np.maximum(x, 0.0),
+    "Identity": lambda x: x,
+}
+
+
+def actor_arrays(model):
+    """Return ``(arrays, activation)`` for the actor of a stable-baselines3 PPO ``model``.
+
+    ``arrays`` maps ``w0, b0, ..., w_action, b_action`` to float32 copies of
+    the weights, in forward-pass order.
+    """
+    # pylint: disable=import-outside-toplevel
+    from torch import nn
+
+    policy = model.policy
+    arrays = {}
+    n_layers = 0
+    for module in policy.mlp_extractor.policy_net:
+        if isinstance(module, nn.Linear):
+            arrays[f"w{n_layers}"] = module.weight.detach().cpu().numpy().T.astype(np.float32)
+            arrays[f"b{n_layers}"] = module.bias.detach().cpu().numpy().astype(np.float32)
+            n_layers += 1
+    arrays["w_action"] = policy.action_net.weight.detach().cpu().numpy().T.astype(np.float32)
+    arrays["b_action"] = policy.action_net.bias.detach().cpu().numpy().astype(np.float32)
+    return arrays, policy.activation_fn.__name__
+
+
+def export_policy(model, path):
+    """Write the actor of a stable-baselines3 PPO ``model`` to ``path`` (.npz)."""
+    arrays, activation = actor_arrays(model)
+    np.savez(path, activation=np.array(activation), **arrays)
+
+
+class NumpyPolicy:
+    """Actor forward pass of an exported MlpPolicy, in NumPy only.
+
+    ``predict`` mirrors ``PPO.predict``: it takes one observation or a batch
+    and returns ``(actions, None)``.
+    """
+
+    def __init__(self, layers, action_layer, activation="Tanh", seed=None):
+        self.layers = layers
+        self.action_layer = action_layer
+        self.activation = activation
+        self._activation_fn = ACTIVATIONS[activation]
+        self.np_random = np.random.default_rng(seed)
+
+    @classmethod
+    def from_arrays(cls, arrays, activation="Tanh"):
+        """Build a policy from the ``arrays`` returned by ``actor_arrays``."""
+        n_layers = sum(1 for name in arrays if name[1:].isdigit() and name[0] == "w")
+        layers = [(arrays[f"w{i}"], arrays[f"b{i}"]) for i in range(n_layers)]
+        return cls(layers, (arrays["w_action"], arrays["b_action"]), activation)
+
+    @classmethod
+    def load(cls, path):
+        """Load a policy written by ``export_policy``."""
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files if name != "activation"}
+            activation = str(data["activation"])
+        return cls.from_arrays(arrays, activation)
+
+    def logits(self, obs):
+        """Action logits for a batch of observations."""
+        x = np.asarray(obs, dtype=np.float32)
+        for w, b in self.layers:
+            x = self._activation_fn(x @ w + b)
+        w, b = self.action_layer
+        return x @ w + b
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        """Return ``(actions, None)`` for one observation or a batch."""
+        # pylint: disable=unused-argument
+        obs = np.asarray(obs, dtype=np.float32)
+        single = obs.ndim == 1
+        logits = self.logits(obs[None] if single else obs)
+        if deterministic:
+            actions = logits.argmax(axis=1)
+        else:
+            # Gumbel-max sampling from the categorical distribution
+            noise = self.np_random.gumbel(size=logits.shape)
+            actions = (logits + noise).argmax(axis=1)
+        return (actions[0] if single else actions), None
+
+
+def npz_path(model_path):
+    """Path of the exported policy that belongs to ``model_path`` (.zip)."""
+    root, ext = os.path.splitext(model_path)
+    return (root if ext == ".zip" else model_path) + ".npz"
+
+
+def load_policy(model_path, cache_size=0):
+    """Load the fastest available policy for ``model_path``.
+
+    Uses the exported ``.npz`` when it is at least as new as the ``.zip``;
+    otherwise falls back to loading the model with stable-baselines3.
+    With ``cache_size`` > 0 the policy is wrapped in a ``CachedPolicy``.
+    """
+    if cache_size:
+        return CachedPolicy(model_path, cache_size)
+    zip_path = model_path if model_path.endswith(".zip") else model_path + ".zip"
+    exported = npz_path(zip_path)
+    if os.path.exists(exported) and (
+        not os.path.exists(zip_path)
+        or os.path.getmtime(exported) >= os.path.getmtime(zip_path)
+    ):
+        return NumpyPolicy.load(exported)
+    from stable_baselines3 import PPO  # pylint: disable=import-outside-toplevel
+    return PPO.load(zip_path, device="cpu")
+
+
+class CachedPolicy:
+    """Memoize the deterministic actions of the policy at ``model_path``.
+
+    Observations are small integer tuples and play keeps revisiting them,
+    so each one's action is kept in a dict keyed on its exact bytes, at
+    most ``max_entries`` of them. ``eviction="lru"`` drops the least
+    recently used entry when full, ``"fifo"`` the oldest one (cheaper
+    hits). Sampled (non-deterministic) actions always go to the policy.
+
+    At most every ``check_interval`` seconds the model files are checked;
+    when the ``.zip`` or its ``.npz`` export changed the policy is reloaded
+    and the cache cleared.
+    """
+
+    def __init__(self, model_path, max_entries=100_000, eviction="lru", check_interval=1.0):
+        if eviction not in ("lru", "fifo"):
+            raise ValueError(f"unknown eviction policy {eviction!r}")
+        self.model_path = model_path
+        self.max_entries = max_entries
+        self.eviction = eviction
+        self.check_interval = check_interval
+        self.cache = OrderedDict()
+        self.hits = self.misses = self.evictions = self.bypassed = self.reloads = 0
+        self._signature = self._files_signature()
+        self._next_check = time.monotonic() + check_interval
+        self.policy = load_policy(model_path)
+
+    def _files_signature(self):
+        zip_path = self.model_path if self.model_path.endswith(".zip") else self.model_path + ".zip"
+        signature = []
+        for path in (zip_path, npz_path(zip_path)):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return signature
+
+    def _check_model(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        signature = self._files_signature()
+        if signature != self._signature:
+            self._signature = signature
+            self.policy = load_policy(self.model_path)
+            self.cache.clear()
+            self.reloads += 1
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        """Return ``(actions, None)`` for one observation or a batch."""
+        # pylint: disable=unused-argument
+        self._check_model()
+        if not deterministic:
+            self.bypassed += 1
+            return self.policy.predict(obs, deterministic=False)
+        obs = np.asarray(obs, dtype=np.float32)
+        single = obs.ndim == 1
+        rows = obs[None] if single else obs
+        actions = np.empty(len(rows), dtype=np.int64)
+        cache = self.cache
+        missing = []
+        for i, row in enumerate(rows):
+            key = row.tobytes()
+            action = cache.get(key)
+            if action is None:
+                missing.append(i)
+            else:
+                actions[i] = action
+                if self.eviction == "lru":
+                    cache.move_to_end(key)
+        self.hits += len(rows) - len(missing)
+        if missing:
+            self.misses += len(missing)
+            computed, _ = self.policy.predict(rows[missing], deterministic=True)
+            actions[missing] = computed
+            for i, action in zip(missing, actions[missing].tolist()):
+                cache[rows[i].tobytes()] = action
+            overflow = len(cache) - self.max_entries
+            for _ in range(max(0, overflow)):
+                cache.popitem(last=False)
+            self.evictions += max(0, overflow)
+        return (actions[0] if single else actions), None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "bypassed": self.bypassed,
+            "reloads": self.reloads,
+        }
+
+    def format_stats(self):
+        s = self.stats()
+        return (f"Decision cache: {s['hit_rate']:.1%} hits ({s['hits']} of {s['hits'] + s['misses']}),"
+                f" {s['entries']} entries, {s['evictions']} evictions, {s['reloads']} reloads")
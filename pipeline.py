@@ -0,0 +1,257 @@
+"""Pipelined PPO rollouts: env groups step while the policy runs on another.
+
+``GroupedVecEnv`` puts several VecEnvs ("groups") side by side. With it,
+``PipelinedPPO`` collects rollouts out of phase: while the policy forward
+pass runs on one group's observations, the other groups step on worker
+threads (stepping releases the GIL in NumPy and waits on pipes for
+sharded groups), so neither the envs nor the policy sit idle.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch as th
+from stable_baselines3 import PPO
+from stable_baselines3.common.utils import obs_as_tensor
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+
+class GroupedVecEnv(VecEnv):
+    """VecEnv made of ``groups`` (VecEnvs with the same spaces) side by side.
+
+    Stepped as a whole it behaves like one VecEnv; ``PipelinedPPO`` steps
+    the groups separately.
+    """
+
+    def __init__(self, groups):
+        self.groups = list(groups)
+        bounds = np.cumsum([0] + [group.num_envs for group in self.groups])
+        self.slices = [slice(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+        first = self.groups[0]
+        super().__init__(int(bounds[-1]), first.observation_space, first.action_space)
+
+    def reset(self):
+        for group, cols in zip(self.groups, self.slices):
+            if self._seeds[cols.start] is not None:
+                group.seed(self._seeds[cols.start])
+        self._reset_seeds()
+        self._reset_options()
+        return np.concatenate([group.reset() for group in self.groups])
+
+    def step_async(self, actions):
+        for group, cols in zip(self.groups, self.slices):
+            group.step_async(actions[cols])
+
+    def step_wait(self):
+        results = [group.step_wait() for group in self.groups]
+        obs, rewards, dones, infos = zip(*results)
+        return np.concatenate(obs), np.concatenate(rewards), np.concatenate(dones), sum(infos, [])
+
+    def close(self):
+        for group in self.groups:
+            group.close()
+
+    def _split(self, indices):
+        """``(group, first index, local indices)`` of each group holding some of ``indices``."""
+        indices = list(self._get_indices(indices))
+        for group, cols in zip(self.groups, self.slices):
+            local = [i - cols.start for i in indices if cols.start <= i < cols.stop]
+            if local:
+                yield group, cols.start, local
+
+    def _per_env(self, call, indices):
+        """``call(group, local_indices)`` results, in the order of ``indices``."""
+        results = {}
+        for group, start, local in self._split(indices):
+            for i, result in zip(local, call(group, local)):
+                results[start + i] = result
+        return [results[i] for i in self._get_indices(indices)]
+
+    def get_attr(self, attr_name, indices=None):
+        return self._per_env(lambda group, local: group.get_attr(attr_name, local), indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        for group, _, local in self._split(indices):
+            group.set_attr(attr_name, value, local)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return self._per_env(
+            lambda group, local: group.env_method(method_name, *method_args, indices=local,
+                                                  **method_kwargs),
+            indices,
+        )
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return self._per_env(
+            lambda group, local: group.env_is_wrapped(wrapper_class, local), indices
+        )
+
+    def get_images(self):
+        return [image for group in self.groups for image in group.get_images()]
+
+
+def _timed_step(group, actions):
+    start = time.perf_counter()
+    return group.step(actions) + (time.perf_counter() - start,)
+
+
+def thread_candidates(n_groups, cores=None):
+    """Torch intra-op thread counts worth trying next to ``n_groups`` stepping threads."""
+    cores = cores or os.cpu_count() or 1
+    candidates = {max(1, cores - n_groups + 1), max(1, cores // 2)}
+    k = 1
+    while k < cores:
+        candidates.add(k)
+        k *= 2
+    return sorted(c for c in candidates if c <= cores)
+
+
+class PipelinedPPO(PPO):
+    """PPO collecting rollouts from a ``GroupedVecEnv`` with stepping overlapped.
+
+    Per step, each group in turn gets its finished step back, is run
+    through the policy and is sent stepping again, so while group A is
+    evaluated the others step on worker threads.
+
+    The torch intra-op thread count used during rollouts is auto-tuned:
+    the first rollouts each try one of ``thread_candidates``, or plain
+    sequential collection (logged as 0 threads), and the fastest is kept;
+    the update keeps torch's own setting. On a host with too few cores to
+    overlap anything, sequential collection wins and is used. Per
+    pipelined rollout it logs under ``pipeline/`` the env and inference
+    time, the time spent waiting for envs and ``overlap``, the share of
+    env stepping hidden behind inference. Any other env falls back to
+    plain PPO collection.
+    """
+
+    rollout_threads = None  # Torch threads during rollouts (0: sequential), None until tuned
+
+    def __init__(self, *args, **kwargs):
+        self._step_pool = None  # Group stepping threads, alive during learn
+        self._thread_trials = None  # Steps/s per thread count, once a warm-up rollout is done
+        super().__init__(*args, **kwargs)
+
+    def _excluded_save_params(self):
+        return super()._excluded_save_params() + ["_step_pool", "_thread_trials", "rollout_threads"]
+
+    def learn(self, *args, **kwargs):
+        env = self.env
+        if isinstance(env, GroupedVecEnv) and len(env.groups) > 1:
+            self._step_pool = ThreadPoolExecutor(len(env.groups), thread_name_prefix="env-group")
+        try:
+            return super().learn(*args, **kwargs)
+        finally:
+            if self._step_pool is not None:
+                self._step_pool.shutdown()
+                self._step_pool = None
+
+    def collect_rollouts(self, env, callback, rollout_buffer, n_rollout_steps):
+        if self._step_pool is None or not isinstance(env, GroupedVecEnv) or len(env.groups) < 2:
+            return super().collect_rollouts(env, callback, rollout_buffer, n_rollout_steps)
+        modes = [0] + thread_candidates(len(env.groups))
+        threads = self.rollout_threads
+        if threads is None:
+            tried = self._thread_trials or {}
+            threads = next(mode for mode in modes if mode not in tried)
+        start = time.perf_counter()
+        if threads == 0:
+            result = super().collect_rollouts(env, callback, rollout_buffer, n_rollout_steps)
+        else:
+            update_threads = th.get_num_threads()
+            th.set_num_threads(threads)
+            try:
+                result = self._collect_pipelined(env, callback, rollout_buffer, n_rollout_steps)
+            finally:
+                th.set_num_threads(update_threads)
+        elapsed = time.perf_counter() - start
+        if self._thread_trials is None:
+            self._thread_trials = {}  # The first rollout pays one-off warm-up costs
+        elif self.rollout_threads is None:
+            self._thread_trials[threads] = n_rollout_steps * env.num_envs / elapsed
+            if len(self._thread_trials) == len(modes):
+                self.rollout_threads = max(self._thread_trials, key=self._thread_trials.get)
+                if self.verbose:
+                    how = (f"pipelined, {self.rollout_threads} torch threads" if self.rollout_threads
+                           else "sequential, too few cores to overlap")
+                    print(f"Rollouts: {how} ({self._thread_trials[self.rollout_threads]:,.0f} steps/s)")
+        self.logger.record("pipeline/torch_threads", threads)
+        return result
+
+    def _collect_pipelined(self, env, callback, rollout_buffer, n_rollout_steps):
+        self.policy.set_training_mode(False)
+        rollout_buffer.reset()
+        callback.on_rollout_start()
+
+        slices = env.slices
+        obs = [self._last_obs[cols] for cols in slices]
+        starts = [self._last_episode_starts[cols] for cols in slices]
+        pending = [None] * len(slices)
+        inference_time = wait_time = env_time = 0.0
+        start = time.perf_counter()
+
+        def finish(g, step):
+            """Collect group ``g``'s step ``step`` and record its outcome."""
+            nonlocal wait_time, env_time
+            waited = time.perf_counter()
+            new_obs, rewards, dones, infos, step_time = pending[g].result()
+            wait_time += time.perf_counter() - waited
+            env_time += step_time
+            pending[g] = None
+            for idx in np.flatnonzero(dones):
+                # Bootstrap truncated episodes with the value function, as SB3 does
+                if infos[idx].get("TimeLimit.truncated", False) and "terminal_observation" in infos[idx]:
+                    terminal_obs = self.policy.obs_to_tensor(infos[idx]["terminal_observation"])[0]
+                    with th.no_grad():
+                        rewards[idx] += self.gamma * self.policy.predict_values(terminal_obs)[0].item()
+            rollout_buffer.rewards[step, slices[g]] = rewards
+            self._update_info_buffer(infos, dones)
+            obs[g] = new_obs
+            starts[g] = dones
+
+        for step in range(n_rollout_steps):
+            for g, cols in enumerate(slices):
+                if pending[g] is not None:
+                    finish(g, step - 1)
+                began = time.perf_counter()
+                with th.no_grad():
+                    actions, values, log_probs = self.policy(obs_as_tensor(obs[g], self.device))
+                actions = actions.cpu().numpy()
+                inference_time += time.perf_counter() - began
+                pending[g] = self._step_pool.submit(_timed_step, env.groups[g], actions)
+
+                rollout_buffer.observations[step, cols] = obs[g]
+                rollout_buffer.actions[step, cols] = actions.reshape(-1, rollout_buffer.action_dim)
+                rollout_buffer.episode_starts[step, cols] = starts[g]
+                rollout_buffer.values[step, cols] = values.cpu().numpy().flatten()
+                rollout_buffer.log_probs[step, cols] = log_probs.cpu().numpy()
+
+            self.num_timesteps += env.num_envs
+            callback.update_locals(locals())
+            if not callback.on_step():
+                for g in range(len(slices)):
+                    finish(g, step)
+                return False
+
+        for g in range(len(slices)):
+            finish(g, n_rollout_steps - 1)
+        self._last_obs = np.concatenate(obs)
+        self._last_episode_starts = np.concatenate(starts)
+        with th.no_grad():
+            values = self.policy.predict_values(obs_as_tensor(self._last_obs, self.device))
+        rollout_buffer.pos = rollout_buffer.buffer_size
+        rollout_buffer.full = True
+        rollout_buffer.compute_returns_and_advantage(last_values=values, dones=self._last_episode_starts)
+
+        elapsed = time.perf_counter() - start
+        record = self.logger.record
+        record("pipeline/env_s", env_time)
+        record("pipeline/inference_s", inference_time)
+        record("pipeline/env_wait_s", wait_time)
+        record("pipeline/overlap", (env_time - wait_time) / env_time if env_time else 0.0)
+        record("pipeline/steps_per_s", n_rollout_steps * env.num_envs / elapsed)
+
+        callback.update_locals(locals())
+        callback.on_rollout_end()
+        return True
@@ -0,0 +1,97 @@
+"""Pixel observations: NumPy rasterizer and zero-copy frame stacking.
+
+Frames are downsampled grayscale images of the table (one observation
+pixel per ``PIXEL_SCALE`` x ``PIXEL_SCALE`` screen pixels) showing both
+paddles and the ball, drawn for a whole batch of games with array slicing
+and no pygame.
+"""
+
+import numpy as np
+
+from pong_core import BALL_SIZE, HEIGHT, OPPONENT_X, PADDLE_HEIGHT, PADDLE_WIDTH, PLAYER_X, WIDTH
+
+PIXEL_SCALE = 8  # Screen pixels per observation pixel, along each axis
+LIT = 255
+
+
+def frame_shape(scale=PIXEL_SCALE):
+    """``(height, width)`` of a frame at ``scale``."""
+    return HEIGHT // scale, WIDTH // scale
+
+
+def _span(start, size, scale):
+    """First and last cell covered by ``[start, start + size)`` screen pixels."""
+    return start // scale, (start + size - 1) // scale
+
+
+def rasterize(out, ball_x, ball_y, player_y, opponent_y, scale=PIXEL_SCALE):
+    """Draw one frame per game into ``out`` (``(n, height, width)`` uint8).
+
+    A cell is lit when a paddle or the ball overlaps it. The position
+    arguments are length-``n`` integer arrays in screen pixels; a ball
+    partly off the table is clipped.
+    """
+    n, height, width = out.shape
+    out.fill(0)
+    rows = np.arange(height)
+    for x, y in ((PLAYER_X, player_y), (OPPONENT_X, opponent_y)):
+        first, last = _span(np.asarray(y), PADDLE_HEIGHT, scale)
+        lit = (rows >= first[:, None]) & (rows <= last[:, None])
+        col_first, col_last = _span(x, PADDLE_WIDTH, scale)
+        out[:, :, col_first:col_last + 1] = (lit * LIT).astype(np.uint8)[:, :, None]
+
+    # The ball covers at most ceil(BALL_SIZE / scale) + 1 cells per axis
+    row_first, row_last = _span(np.asarray(ball_y), BALL_SIZE, scale)
+    col_first, col_last = _span(np.asarray(ball_x), BALL_SIZE, scale)
+    envs = np.arange(n)
+    reach = -(-BALL_SIZE // scale) + 1
+    for dy in range(reach):
+        r = row_first + dy
+        row_ok = (r <= row_last) & (r >= 0) & (r < height)
+        for dx in range(reach):
+            c = col_first + dx
+            ok = row_ok & (c <= col_last) & (c >= 0) & (c < width)
+            out[envs[ok], r[ok], c[ok]] = LIT
+
+
+class FrameStack:
+    """Ring buffer of uint8 frames whose last ``n_stack`` are read as views.
+
+    Frames are stored once, env-major, in a ``capacity``-long time axis.
+    ``stacked`` is a view of the newest ``n_stack`` frames of every env, so
+    consecutive stacks share their frames instead of copying them. When the
+    time axis is full the last ``n_stack - 1`` frames move to its start, one
+    small copy every ``capacity - n_stack + 1`` frames. A stack stays valid
+    for at least ``capacity - 2 * n_stack + 1`` further frames.
+    """
+
+    def __init__(self, num_envs, n_stack, shape, capacity=None):
+        self.n_stack = n_stack
+        self.capacity = capacity or 4 * n_stack
+        if self.capacity < 2 * n_stack:
+            raise ValueError("capacity must be at least 2 * n_stack")
+        self.buffer = np.zeros((num_envs, self.capacity) + tuple(shape), dtype=np.uint8)
+        self._pos = n_stack - 1  # Slot of the newest frame
+
+    @property
+    def stacked(self):
+        """``(num_envs, n_stack, height, width)`` view of the newest frames."""
+        return self.buffer[:, self._pos - self.n_stack + 1:self._pos + 1]
+
+    @property
+    def newest(self):
+        """View of the newest frame of every env."""
+        return self.buffer[:, self._pos]
+
+    def next_frame(self):
+        """Advance one slot and return it for the caller to draw the next frame into."""
+        if self._pos + 1 == self.capacity:
+            keep = self.n_stack - 1
+            self.buffer[:, :keep] = self.buffer[:, self.capacity - keep:]
+            self._pos = keep - 1
+        self._pos += 1
+        return self.buffer[:, self._pos]
+
+    def fill(self, idx=slice(None)):
+        """Repeat the newest frame over the whole stack of the envs in ``idx`` (after a reset)."""
+        self.buffer[idx, self._pos - self.n_stack + 1:self._pos] = self.buffer[idx, self._pos, None]
@@ -0,0 +1,703 @@
+"""Pygame-free Pong physics shared by the environments."""
+
+import random
+import numpy as np
+
+# Geometry and speeds
+WIDTH = 800
+HEIGHT = 600
+PADDLE_WIDTH = 10
+PADDLE_HEIGHT = 100
+BALL_SIZE = 15
+PADDLE_SPEED = 6
+BALL_SPEED = 5
+
+PLAYER_X = WIDTH - 20    # Right paddle (RL agent)
+OPPONENT_X = 10          # Left paddle (auto or RL)
+
+
+# Columns of a game state snapshot (see PongBatch.snapshot and PongGame.snapshot)
+STATE_FIELDS = (
+    "ball_x", "ball_y", "ball_speed_x", "ball_speed_y",
+    "player_y", "opponent_y", "player_score", "opponent_score",
+)
+
+# Ball x range where it can touch neither paddle nor score
+SAFE_MIN_X = OPPONENT_X + PADDLE_WIDTH
+SAFE_MAX_X = PLAYER_X - BALL_SIZE
+
+# The analytic fast-forward relies on the tracker being exactly one unit per
+# frame faster than the ball (see track_offset)
+assert PADDLE_SPEED == BALL_SPEED + 1
+
+
+def mirror_x(x):
+    """Mirror a ball x position left/right, so each side sees itself on the right."""
+    return WIDTH - BALL_SIZE - x
+
+
+def mirror_state(state):
+    """Snapshot rows seen from the other side: paddles and scores swapped, ball mirrored."""
+    mirrored = state.copy()
+    mirrored[..., 0] = mirror_x(state[..., 0])
+    mirrored[..., 2] = -state[..., 2]
+    mirrored[..., 4], mirrored[..., 5] = state[..., 5], state[..., 4]
+    mirrored[..., 6], mirrored[..., 7] = state[..., 7], state[..., 6]
+    return mirrored
+
+
+def track_offset(e, n):
+    """Tracker offset after ``n`` event-free frames, in closed form.
+
+    ``e`` is the ball center minus the tracking paddle's center, signed so
+    that the ball moves in the positive direction. Each frame the ball gains
+    BALL_SPEED and the paddle moves PADDLE_SPEED towards it: a trailing paddle
+    closes in by PADDLE_SPEED + BALL_SPEED per frame, after which the offset
+    counts down by one per frame and cycles through BALL_SPEED..0.
+    Works on ints and on NumPy arrays alike.
+    """
+    closing = PADDLE_SPEED + BALL_SPEED
+    catch = np.maximum(-e + closing - 1, 0) // closing
+    trailing = n <= catch
+    e_trailing = e + n * closing
+    e = np.where(catch > 0, e + catch * closing, e)
+    n = n - catch
+    m = (n - e) % (BALL_SPEED + 1)
+    e_ahead = np.where(n <= e, e - n, np.where(m == 0, 0, BALL_SPEED + 1 - m))
+    return np.where(trailing, e_trailing, e_ahead)
+
+
+def abs_distance_sum(b, n):
+    """Sum of ``|b - BALL_SPEED * j|`` for ``j = 1..n``, in closed form."""
+    j = np.clip(b // BALL_SPEED, 0, n)
+    below = j * b - BALL_SPEED * j * (j + 1) // 2
+    above = BALL_SPEED * (n * (n + 1) - j * (j + 1)) // 2 - (n - j) * b
+    return below + above
+
+
+def idle_frames(ball_x, ball_y, speed_x, speed_y):
+    """Frames until the ball's next wall/paddle contact or point could happen."""
+    frames_y = np.where(
+        speed_y > 0,
+        (HEIGHT - BALL_SIZE - ball_y - 1) // BALL_SPEED,
+        (ball_y - 1) // BALL_SPEED,
+    )
+    frames_x = np.where(
+        speed_x > 0,
+        (SAFE_MAX_X - ball_x) // BALL_SPEED,
+        (ball_x - SAFE_MIN_X) // BALL_SPEED,
+    )
+    return np.maximum(np.minimum(frames_x, frames_y), 0)
+
+
+def tracking_actions(obs, deadband=PADDLE_SPEED // 2):
+    """The tracking bot's move for the paddle seen in ``obs`` (any leading shape).
+
+    Like the built-in opponent it steers the paddle center towards the ball
+    center, but stays put within ``deadband`` pixels instead of jittering
+    around it, since moving costs reward.
+    """
+    obs = np.asarray(obs)
+    error = obs[..., 1] + BALL_SIZE // 2 - obs[..., 4] - PADDLE_HEIGHT // 2
+    actions = np.zeros(error.shape, dtype=np.int64)
+    actions[error < -deadband] = 1
+    actions[error > deadband] = 2
+    return actions
+
+
+class TrackingPolicy:
+    """The tracking heuristic behind the ``predict`` interface of trained policies."""
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):  # pylint: disable=unused-argument
+        return tracking_actions(obs), state
+
+
+class Box:
+    """Minimal integer rectangle with the parts of pygame.Rect the game uses."""
+
+    __slots__ = ("x", "y", "width", "height")
+
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @property
+    def top(self):
+        return self.y
+
+    @property
+    def bottom(self):
+        return self.y + self.height
+
+    @property
+    def left(self):
+        return self.x
+
+    @left.setter
+    def left(self, value):
+        self.x = value
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @right.setter
+    def right(self, value):
+        self.x = value - self.width
+
+    @property
+    def centery(self):
+        return self.y + self.height // 2
+
+    def colliderect(self, other):
+        """Return True if the two boxes overlap."""
+        return (
+            self.x < other.x + other.width and other.x < self.x + self.width
+            and self.y < other.y + other.height and other.y < self.y + self.height
+        )
+
+    def as_tuple(self):
+        """Return ``(x, y, width, height)``, accepted by pygame.draw."""
+        return (self.x, self.y, self.width, self.height)
+
+
+class PongGame:
+    """State and rules of one Pong game, independent of any rendering."""
+
+    __slots__ = (
+        "player", "opponent", "ball",
+        "ball_speed_x", "ball_speed_y",
+        "player_score", "opponent_score",
+        "opponent_reward", "rng",
+    )
+
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.player_score = 0    # Right paddle (RL agent)
+        self.opponent_score = 0  # Left paddle (auto or RL)
+        self.player = Box(PLAYER_X, 0, PADDLE_WIDTH, PADDLE_HEIGHT)
+        self.opponent = Box(OPPONENT_X, 0, PADDLE_WIDTH, PADDLE_HEIGHT)
+        self.ball = Box(0, 0, BALL_SIZE, BALL_SIZE)
+        self.ball_speed_x = 0
+        self.ball_speed_y = 0
+        self.opponent_reward = 0.0
+        self.setup()
+
+    def setup(self):
+        """Put paddles and ball at their start positions."""
+        self.player.y = HEIGHT // 2 - PADDLE_HEIGHT // 2
+        self.opponent.y = HEIGHT // 2 - PADDLE_HEIGHT // 2
+        self.reset_ball()
+
+    def reset_ball(self):
+        """Reset the ball to the center with random direction."""
+        self.ball.x = WIDTH // 2
+        self.ball.y = HEIGHT // 2
+        self.ball_speed_x = BALL_SPEED * int(self.rng.choice((1, -1)))
+        self.ball_speed_y = BALL_SPEED * int(self.rng.choice((1, -1)))
+
+    def obs(self):
+        """Return the agent observation as a tuple of numbers."""
+        return (
+            self.ball.x, self.ball.y,
+            self.ball_speed_x, self.ball_speed_y,
+            self.player.y,
+        )
+
+    def opponent_obs(self):
+        """Return the left paddle's observation, mirrored to look like the right's."""
+        return (
+            mirror_x(self.ball.x), self.ball.y,
+            -self.ball_speed_x, self.ball_speed_y,
+            self.opponent.y,
+        )
+
+    def snapshot(self):
+        """The game state as one int64 row of ``STATE_FIELDS``."""
+        return np.array((
+            self.ball.x, self.ball.y, self.ball_speed_x, self.ball_speed_y,
+            self.player.y, self.opponent.y, self.player_score, self.opponent_score,
+        ), dtype=np.int64)
+
+    def restore(self, state):
+        """Continue from a ``snapshot`` row (of this game, another or a ``PongBatch``)."""
+        (self.ball.x, self.ball.y, self.ball_speed_x, self.ball_speed_y,
+         self.player.y, self.opponent.y, self.player_score, self.opponent_score) = (int(v) for v in state)
+
+    def fast_forward(self, max_frames):
+        """Fly the ball up to ``max_frames`` frames with the agent paddle idle.
+
+        Only frames before the next possible wall/paddle contact or point
+        are skipped, and the tracking opponent is advanced in closed form,
+        so the result is exactly that of ``step(0)`` repeated. Returns
+        ``(frames, reward)``.
+        """
+        ball = self.ball
+        n = min(int(idle_frames(ball.x, ball.y, self.ball_speed_x, self.ball_speed_y)), max_frames)
+        if n <= 0:
+            return 0, 0.0
+        direction = 1 if self.ball_speed_y > 0 else -1
+        ball_center = ball.y + BALL_SIZE // 2
+        e = direction * (ball_center - self.opponent.y - PADDLE_HEIGHT // 2)
+        b = direction * (self.player.y + PADDLE_HEIGHT // 2 - ball_center)
+        distance = int(abs_distance_sum(b, n))
+
+        ball.x += n * self.ball_speed_x
+        ball.y += n * self.ball_speed_y
+        self.opponent.y = (
+            ball.y + BALL_SIZE // 2 - PADDLE_HEIGHT // 2 - direction * int(track_offset(e, n))
+        )
+        return n, 0.001 * n - 0.01 * distance / HEIGHT
+
+    def step(self, action, opponent_action=None):
+        """Advance one frame.
+
+        The left paddle tracks the ball unless ``opponent_action`` is given,
+        in which case it moves like the agent paddle and its reward is left
+        in ``opponent_reward``.
+
+        Returns ``(reward, terminated, bounces)`` where ``bounces`` counts
+        wall and paddle contacts during the frame.
+        """
+        player, opponent, ball = self.player, self.opponent, self.ball
+        reward = 0.0
+        terminated = False
+        bounces = 0
+
+        # Agent paddle
+        py = player.y
+        if action == 1 and py > 0:
+            py -= PADDLE_SPEED
+        elif action == 2 and py + PADDLE_HEIGHT < HEIGHT:
+            py += PADDLE_SPEED
+        player.y = py
+
+        # Ball movement (the opponent tracks the ball's pre-move center)
+        bx = ball.x + self.ball_speed_x
+        by = ball.y
+        ball_center = by + BALL_SIZE // 2
+        by += self.ball_speed_y
+
+        # Simple auto opponent, or the second agent
+        oy = opponent.y
+        if opponent_action is None:
+            if oy + PADDLE_HEIGHT // 2 < ball_center:
+                oy += PADDLE_SPEED
+            elif oy + PADDLE_HEIGHT // 2 > ball_center:
+                oy -= PADDLE_SPEED
+        elif opponent_action == 1 and oy > 0:
+            oy -= PADDLE_SPEED
+        elif opponent_action == 2 and oy + PADDLE_HEIGHT < HEIGHT:
+            oy += PADDLE_SPEED
+        opponent.y = oy
+        opponent_reward = 0.0
+
+        # Wall bounce
+        if by <= 0 or by + BALL_SIZE >= HEIGHT:
+            self.ball_speed_y = -self.ball_speed_y
+            bounces += 1
+
+        # Paddle collisions
+        if (bx < PLAYER_X + PADDLE_WIDTH and PLAYER_X < bx + BALL_SIZE
+                and by < py + PADDLE_HEIGHT and py < by + BALL_SIZE):
+            bx = PLAYER_X - BALL_SIZE
+            self.ball_speed_x = -self.ball_speed_x
+            reward += 0.1
+            bounces += 1
+        elif (bx < OPPONENT_X + PADDLE_WIDTH and OPPONENT_X < bx + BALL_SIZE
+              and by < oy + PADDLE_HEIGHT and oy < by + BALL_SIZE):
+            bx = OPPONENT_X + PADDLE_WIDTH
+            self.ball_speed_x = -self.ball_speed_x
+            opponent_reward += 0.1
+            bounces += 1
+        ball.x = bx
+        ball.y = by
+
+        # Scoring
+        if bx <= 0:
+            reward, opponent_reward = 1.0, -1.0
+            self.player_score += 1
+            terminated = True
+            self.reset_ball()
+        elif bx + BALL_SIZE >= WIDTH:
+            reward, opponent_reward = -1.0, 1.0
+            self.opponent_score += 1
+            terminated = True
+            self.reset_ball()
+        else:
+            reward += 0.001
+            distance = abs(py + PADDLE_HEIGHT // 2 - by - BALL_SIZE // 2)
+            reward -= 0.01 * (distance / HEIGHT)
+            if action != 0:
+                reward -= 0.005
+            if opponent_action is not None:
+                opponent_reward += 0.001
+                distance = abs(oy + PADDLE_HEIGHT // 2 - by - BALL_SIZE // 2)
+                opponent_reward -= 0.01 * (distance / HEIGHT)
+                if opponent_action != 0:
+                    opponent_reward -= 0.005
+
+        self.opponent_reward = opponent_reward
+        return reward, terminated, bounces
+
+
+class PongBatch:
+    """Struct-of-arrays state and rules for many games stepped together.
+
+    Every game follows exactly the rules of ``PongGame``; a step is a handful
+    of NumPy operations over the whole batch. Outputs are written into the
+    ``obs``, ``rewards``, ``dones`` and ``terminal_obs`` arrays, which callers
+    may supply (e.g. views into shared memory) through ``out``.
+
+    With ``two_player=True`` the left paddle is driven by ``opponent_action``
+    and its mirrored outputs go to ``opponent_obs``, ``opponent_rewards`` and
+    ``opponent_terminal_obs``.
+
+    ``frame_skip`` repeats each action that many frames and sums the
+    rewards. With ``fast_forward=True`` an idle action (0) instead lasts
+    until the ball's next wall/paddle contact or point (at most
+    ``max_fast_forward`` frames), with the contact-free flight computed in
+    closed form. Games finishing early wait for the rest of the batch.
+
+    ``hits`` (and ``opponent_hits``) count the paddle hits of the last step.
+    With ``max_episode_steps`` a game still going after that many steps is
+    cut off: it is done, flagged in ``truncated`` and set up again, with
+    the observation it stopped at in ``terminal_obs``.
+    """
+
+    STATE_FIELDS = STATE_FIELDS
+
+    def __init__(self, num_envs, seed=None, out=None, two_player=False,
+                 frame_skip=1, fast_forward=False, max_fast_forward=100, max_episode_steps=None):
+        if fast_forward and two_player:
+            raise ValueError("fast_forward needs the tracking opponent (two_player=False)")
+        self.num_envs = num_envs
+        self.two_player = two_player
+        self.frame_skip = frame_skip
+        self.fast_forward = fast_forward
+        self.max_fast_forward = max_fast_forward
+        self.max_episode_steps = max_episode_steps
+        self.np_random = np.random.default_rng(seed)
+        self.frames = np.zeros(num_envs, dtype=np.int64)  # Frames taken by the last step
+        self._contacts = np.zeros(num_envs, dtype=bool)
+        self.episode_steps = np.zeros(num_envs, dtype=np.int64)  # Steps since the game's setup
+
+        # Game state, one slot per game
+        self.ball_x = np.empty(num_envs, dtype=np.int32)
+        self.ball_y = np.empty(num_envs, dtype=np.int32)
+        self.ball_speed_x = np.empty(num_envs, dtype=np.int32)
+        self.ball_speed_y = np.empty(num_envs, dtype=np.int32)
+        self.player_y = np.empty(num_envs, dtype=np.int32)
+        self.opponent_y = np.empty(num_envs, dtype=np.int32)
+        self.player_score = np.zeros(num_envs, dtype=np.int64)
+        self.opponent_score = np.zeros(num_envs, dtype=np.int64)
+
+        # Step outputs, reused every step
+        out = out or {}
+
+        def output(name, shape, dtype):
+            return out[name] if name in out else np.zeros(shape, dtype=dtype)
+
+        self.obs = output("obs", (num_envs, 5), np.float32)
+        self.terminal_obs = output("terminal_obs", (num_envs, 5), np.float32)
+        self.terminal_opponent_y = output("terminal_opponent_y", num_envs, np.int32)
+        self.rewards = output("rewards", num_envs, np.float32)
+        self.dones = output("dones", num_envs, bool)
+        self.truncated = output("truncated", num_envs, bool)
+        self.hits = output("hits", num_envs, np.int32)
+        if two_player:
+            self.opponent_obs = output("opponent_obs", (num_envs, 5), np.float32)
+            self.opponent_terminal_obs = output("opponent_terminal_obs", (num_envs, 5), np.float32)
+            self.opponent_rewards = output("opponent_rewards", num_envs, np.float32)
+            self.opponent_hits = output("opponent_hits", num_envs, np.int32)
+
+        self.setup(np.arange(num_envs))
+        self.write_obs()
+
+    def seed(self, seed):
+        """Restart the random generator from ``seed``."""
+        self.np_random = np.random.default_rng(seed)
+
+    def _random_direction(self, n):
+        """Return ``n`` random ball velocities of +/- BALL_SPEED."""
+        return BALL_SPEED * (2 * self.np_random.integers(0, 2, size=n, dtype=np.int32) - 1)
+
+    def setup(self, idx):
+        """Put paddles and ball of the games in ``idx`` at their start positions."""
+        self.player_y[idx] = HEIGHT // 2 - PADDLE_HEIGHT // 2
+        self.opponent_y[idx] = HEIGHT // 2 - PADDLE_HEIGHT // 2
+        self.episode_steps[idx] = 0
+        self.reset_ball(idx)
+
+    def reset_ball(self, idx):
+        """Center the ball of the games in ``idx`` with a random direction."""
+        self.ball_x[idx] = WIDTH // 2
+        self.ball_y[idx] = HEIGHT // 2
+        self.ball_speed_x[idx] = self._random_direction(len(idx))
+        self.ball_speed_y[idx] = self._random_direction(len(idx))
+
+    def write_obs(self):
+        """Fill ``obs`` from the game state."""
+        obs = self.obs
+        obs[:, 0] = self.ball_x
+        obs[:, 1] = self.ball_y
+        obs[:, 2] = self.ball_speed_x
+        obs[:, 3] = self.ball_speed_y
+        obs[:, 4] = self.player_y
+        if self.two_player:
+            obs = self.opponent_obs
+            obs[:, 0] = mirror_x(self.ball_x)
+            obs[:, 1] = self.ball_y
+            obs[:, 2] = -self.ball_speed_x
+            obs[:, 3] = self.ball_speed_y
+            obs[:, 4] = self.opponent_y
+
+    def reset(self, idx=None):
+        """Reset the games in ``idx`` (all by default) and refresh ``obs``."""
+        self.setup(np.arange(self.num_envs) if idx is None else idx)
+        self.write_obs()
+
+    def get_state(self, idx):
+        """Copy the state of the games in ``idx``."""
+        return {name: getattr(self, name)[idx] for name in self.STATE_FIELDS}
+
+    def set_state(self, idx, state):
+        """Restore the games in ``idx`` from ``get_state`` output."""
+        for name in self.STATE_FIELDS:
+            getattr(self, name)[idx] = state[name]
+
+    def snapshot(self, idx=None):
+        """State of the games in ``idx`` (all by default) as int64 rows of ``STATE_FIELDS``.
+
+        Rows are interchangeable with ``PongGame.snapshot``; random
+        generators and step counters are not included.
+        """
+        idx = slice(None) if idx is None else idx
+        return np.stack([getattr(self, name)[idx] for name in STATE_FIELDS], axis=-1).astype(np.int64)
+
+    def restore(self, state, idx=None):
+        """Put the games in ``idx`` (all by default) in the ``snapshot`` rows ``state``."""
+        idx = slice(None) if idx is None else idx
+        for k, name in enumerate(STATE_FIELDS):
+            getattr(self, name)[idx] = state[..., k]
+        self.write_obs()
+
+    def step(self, action, opponent_action=None):
+        """Advance every game one step and auto-reset finished ones.
+
+        Fills ``obs``, ``rewards`` and ``dones``; for finished games the
+        observation before the reset goes into ``terminal_obs`` (and the left
+        paddle's position into ``terminal_opponent_y``). The frames
+        each game advanced are in ``frames``. Returns the indices of the
+        finished games.
+        """
+        self.episode_steps += 1
+        if self.frame_skip == 1 and not self.fast_forward:
+            self.frames[:] = 1
+            done_idx = self._step_frame(action, opponent_action)
+        else:
+            done_idx = self._step_frames(action, opponent_action)
+        if self.max_episode_steps is None:
+            return done_idx
+        return self._time_limit(done_idx)
+
+    def _time_limit(self, done_idx):
+        """Cut off the games at ``max_episode_steps``; returns all finished games."""
+        truncated = self.truncated
+        np.greater_equal(self.episode_steps, self.max_episode_steps, out=truncated)
+        idx = np.flatnonzero(truncated)
+        if not idx.size:
+            return done_idx
+        self.terminal_obs[idx] = self.obs[idx]
+        self.terminal_opponent_y[idx] = self.opponent_y[idx]
+        if self.two_player:
+            self.opponent_terminal_obs[idx] = self.opponent_obs[idx]
+        self.dones[idx] = True
+        self.setup(idx)
+        self.write_obs()
+        return np.flatnonzero(self.dones)
+
+    def _fast_forward(self, mask, limit, rewards):
+        """Fly the balls of the games in ``mask`` in closed form.
+
+        See ``PongGame.fast_forward``. Adds the rewards into ``rewards`` and
+        returns the frames skipped per game.
+        """
+        skipped = np.zeros(self.num_envs, dtype=np.int64)
+        idx = np.flatnonzero(mask)
+        if not idx.size:
+            return skipped
+        bx, by = self.ball_x[idx], self.ball_y[idx]
+        vx, vy = self.ball_speed_x[idx], self.ball_speed_y[idx]
+        n = np.minimum(idle_frames(bx, by, vx, vy), limit[idx])
+
+        direction = np.where(vy > 0, 1, -1)
+        ball_center = by + BALL_SIZE // 2
+        e = direction * (ball_center - self.opponent_y[idx] - PADDLE_HEIGHT // 2)
+        b = direction * (self.player_y[idx] + PADDLE_HEIGHT // 2 - ball_center)
+        distance = abs_distance_sum(b, n)
+
+        by = by + n * vy
+        self.ball_x[idx] = bx + n * vx
+        self.ball_y[idx] = by
+        self.opponent_y[idx] = (
+            by + BALL_SIZE // 2 - PADDLE_HEIGHT // 2 - direction * track_offset(e, n)
+        )
+        rewards[idx] += 0.001 * n - 0.01 * distance / HEIGHT
+        skipped[idx] = n
+        return skipped
+
+    def _step_frames(self, action, opponent_action):
+        """Step with frame skip and/or fast-forward; see the class docstring."""
+        n = self.num_envs
+        idle = (action == 0) if self.fast_forward else np.zeros(n, dtype=bool)
+        budget = np.where(idle, self.max_fast_forward, self.frame_skip)
+        frames = self.frames
+        frames[:] = 0
+        active = np.ones(n, dtype=bool)
+        done = np.zeros(n, dtype=bool)
+        total = np.zeros(n)
+        opponent_total = np.zeros(n) if opponent_action is not None else None
+        hits = np.zeros(n, dtype=np.int32)
+        opponent_hits = np.zeros(n, dtype=np.int32) if opponent_action is not None else None
+
+        while True:
+            if self.fast_forward:
+                frames += self._fast_forward(idle & active, budget - frames, total)
+                active &= frames < budget
+            if not active.any():
+                break
+
+            # Games that are finished for this step sit the frame out: they
+            # cannot score (so no reset, serve draw or step counter change)
+            # and their state is put back afterwards
+            frozen = np.flatnonzero(~active)
+            saved = self.get_state(frozen) if frozen.size else None
+            done_idx = self._step_frame(action, opponent_action, None if saved is None else active)
+            if saved is not None:
+                self.set_state(frozen, saved)
+
+            total += self.rewards * active
+            hits += self.hits * active
+            if opponent_total is not None:
+                opponent_total += self.opponent_rewards * active
+                opponent_hits += self.opponent_hits * active
+            frames += active
+            finished = done_idx[active[done_idx]]
+            done[finished] = True
+            active[finished] = False
+            if self.fast_forward:
+                active &= ~(idle & self._contacts)
+            active &= frames < budget
+
+        self.rewards[:] = total
+        self.hits[:] = hits
+        if opponent_total is not None:
+            self.opponent_rewards[:] = opponent_total
+            self.opponent_hits[:] = opponent_hits
+        self.dones[:] = done
+        self.write_obs()
+        return np.flatnonzero(done)
+
+    def _step_frame(self, action, opponent_action=None, active=None):
+        """Advance every game one frame; see ``step``.
+
+        With an ``active`` mask only those games can finish a point.
+        """
+        bx, by = self.ball_x, self.ball_y
+        vx, vy = self.ball_speed_x, self.ball_speed_y
+        py, oy = self.player_y, self.opponent_y
+
+        # Agent paddle
+        up = (action == 1) & (py > 0)
+        down = (action == 2) & (py + PADDLE_HEIGHT < HEIGHT)
+        py += PADDLE_SPEED * (down.astype(np.int32) - up)
+
+        # Simple auto opponent, or the second agent
+        if opponent_action is None:
+            oy += PADDLE_SPEED * np.sign(
+                (by + BALL_SIZE // 2) - (oy + PADDLE_HEIGHT // 2)
+            ).astype(np.int32)
+        else:
+            up = (opponent_action == 1) & (oy > 0)
+            down = (opponent_action == 2) & (oy + PADDLE_HEIGHT < HEIGHT)
+            oy += PADDLE_SPEED * (down.astype(np.int32) - up)
+
+        # Ball movement
+        bx += vx
+        by += vy
+
+        # Wall bounce
+        wall = (by <= 0) | (by + BALL_SIZE >= HEIGHT)
+        np.negative(vy, out=vy, where=wall)
+
+        # Paddle collisions
+        hit_player = (
+            (bx < PLAYER_X + PADDLE_WIDTH) & (bx + BALL_SIZE > PLAYER_X)
+            & (by < py + PADDLE_HEIGHT) & (by + BALL_SIZE > py)
+        )
+        hit_opponent = (
+            ~hit_player
+            & (bx < OPPONENT_X + PADDLE_WIDTH) & (bx + BALL_SIZE > OPPONENT_X)
+            & (by < oy + PADDLE_HEIGHT) & (by + BALL_SIZE > oy)
+        )
+        bx[hit_player] = PLAYER_X - BALL_SIZE
+        bx[hit_opponent] = OPPONENT_X + PADDLE_WIDTH
+        np.negative(vx, out=vx, where=hit_player | hit_opponent)
+        contacts = self._contacts
+        np.logical_or(wall, hit_player, out=contacts)
+        contacts |= hit_opponent
+        self.hits[:] = hit_player
+        if opponent_action is not None:
+            self.opponent_hits[:] = hit_opponent
+
+        # Shaped reward for ongoing rallies
+        rewards = self.rewards
+        distance = np.abs((py + PADDLE_HEIGHT // 2) - (by + BALL_SIZE // 2))
+        rewards[:] = 0.001 - 0.01 * (distance / HEIGHT)
+        rewards -= 0.005 * (action != 0)
+        rewards += 0.1 * hit_player
+
+        # Scoring
+        agent_point = bx <= 0
+        opponent_point = ~agent_point & (bx + BALL_SIZE >= WIDTH)
+        rewards[agent_point] = 1.0
+        rewards[opponent_point] = -1.0
+        if opponent_action is not None:
+            opponent_rewards = self.opponent_rewards
+            distance = np.abs((oy + PADDLE_HEIGHT // 2) - (by + BALL_SIZE // 2))
+            opponent_rewards[:] = 0.001 - 0.01 * (distance / HEIGHT)
+            opponent_rewards -= 0.005 * (opponent_action != 0)
+            opponent_rewards += 0.1 * hit_opponent
+            opponent_rewards[agent_point] = -1.0
+            opponent_rewards[opponent_point] = 1.0
+        self.player_score += agent_point
+        self.opponent_score += opponent_point
+
+        dones = self.dones
+        np.logical_or(agent_point, opponent_point, out=dones)
+        if active is not None:
+            dones &= active
+        done_idx = np.flatnonzero(dones)
+        if done_idx.size:
+            # Terminal observation shows the re-centered ball, as PongEnv does
+            self.reset_ball(done_idx)
+            term = self.terminal_obs
+            term[done_idx, 0] = WIDTH // 2
+            term[done_idx, 1] = HEIGHT // 2
+            term[done_idx, 2] = vx[done_idx]
+            term[done_idx, 3] = vy[done_idx]
+            term[done_idx, 4] = py[done_idx]
+            self.terminal_opponent_y[done_idx] = oy[done_idx]
+            if self.two_player:
+                term = self.opponent_terminal_obs
+                term[done_idx, 0] = mirror_x(WIDTH // 2)
+                term[done_idx, 1] = HEIGHT // 2
+                term[done_idx, 2] = -vx[done_idx]
+                term[done_idx, 3] = vy[done_idx]
+                term[done_idx, 4] = oy[done_idx]
+            self.setup(done_idx)
+        self.write_obs()
+        return done_idx
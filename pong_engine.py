@@ -0,0 +1,220 @@
+"""Pygame front end shared by PongEnv and the interactive scripts.
+
+Physics always comes from ``pong_core.PongGame``, so a game played by hand
+follows exactly the rules the agent was trained on. ``GameLoop`` runs that
+physics at a fixed tick rate, independent of how fast frames are drawn:
+input is sampled right before each tick, and frames drawn between ticks
+interpolate paddle and ball positions.
+"""
+
+import os
+import time
+
+import numpy as np
+import pygame
+
+from pong_core import HEIGHT, WIDTH, PADDLE_WIDTH, PADDLE_HEIGHT, BALL_SIZE, OPPONENT_X, PLAYER_X, PongGame
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+
+TICK_RATE = 60         # Physics ticks per second, the rate the agent was trained at
+MAX_FPS = 240          # Render cap; frames between ticks are interpolated
+MAX_FRAME_TIME = 0.25  # Longest stall caught up on, in seconds
+
+
+def load_sounds():
+    """Return the ``(bounce, score)`` sounds."""
+    pygame.mixer.init()
+    return (
+        pygame.mixer.Sound(os.path.join(ASSETS_DIR, "bounce.wav")),
+        pygame.mixer.Sound(os.path.join(ASSETS_DIR, "score.wav")),
+    )
+
+
+class PongRenderer:
+    """Draw the game onto ``surface``, redrawing only what changed.
+
+    The table (background and center line) is drawn once and the score
+    line is re-rendered only when its text changes. Each ``draw`` erases
+    the previous frame's paddles, ball and score from the cached table and
+    returns the rectangles that changed, for ``pygame.display.update``.
+    """
+
+    def __init__(self, surface, font_size=30):
+        self.surface = surface
+        self.font = pygame.font.SysFont("Arial", font_size)
+        self.table = pygame.Surface(surface.get_size(), 0, surface)
+        self.table.fill(BLACK)
+        pygame.draw.aaline(self.table, WHITE, (WIDTH // 2, 0), (WIDTH // 2, HEIGHT))
+        self._score_text = None
+        self._score = None
+        self._drawn = None  # Rects drawn last frame, None until the table is down
+
+    def invalidate(self):
+        """Redraw everything on the next frame."""
+        self._drawn = None
+
+    def draw(self, player_y, opponent_y, ball_x, ball_y, score_text):
+        """Draw one frame (positions may be fractional) and return the dirty rects."""
+        surface = self.surface
+        if self._drawn is None:
+            surface.blit(self.table, (0, 0))
+        else:
+            for rect in self._drawn:
+                surface.blit(self.table, rect, rect)
+
+        if score_text != self._score_text:
+            self._score_text = score_text
+            self._score = self.font.render(score_text, True, WHITE)
+        rects = [
+            pygame.Rect(PLAYER_X, round(player_y), PADDLE_WIDTH, PADDLE_HEIGHT),
+            pygame.Rect(OPPONENT_X, round(opponent_y), PADDLE_WIDTH, PADDLE_HEIGHT),
+            pygame.Rect(round(ball_x), round(ball_y), BALL_SIZE, BALL_SIZE),
+            self._score.get_rect(midtop=(WIDTH // 2, 20)),
+        ]
+        pygame.draw.rect(surface, WHITE, rects[0])
+        pygame.draw.rect(surface, WHITE, rects[1])
+        pygame.draw.ellipse(surface, WHITE, rects[2])
+        surface.blit(self._score, rects[3])
+
+        # Paddles and the ball can stick out of the table; erasing an
+        # unclipped area would shift the blit
+        bounds = surface.get_rect()
+        rects = [rect.clip(bounds) for rect in rects]
+        if self._drawn is None:
+            dirty = [bounds]
+        else:
+            dirty = [new.union(old) for new, old in zip(rects, self._drawn)]
+        self._drawn = rects
+        return dirty
+
+    def draw_game(self, game, score_text):
+        return self.draw(game.player.y, game.opponent.y, game.ball.x, game.ball.y, score_text)
+
+
+def key_action(keys, up=pygame.K_UP, down=pygame.K_DOWN):
+    """Paddle action (0 stay, 1 up, 2 down) from ``pygame.key.get_pressed()``."""
+    if keys[up] and not keys[down]:
+        return 1
+    if keys[down] and not keys[up]:
+        return 2
+    return 0
+
+
+def policy_actions(right=None, left=None):
+    """Build a ``choose_actions`` for ``GameLoop`` from policies.
+
+    Each side is a policy with ``predict`` or None (right: stays idle, left:
+    the built-in tracking bot). The left policy sees the mirrored view. When
+    both sides use the same policy it runs once on a batch of two.
+    """
+    def choose_actions(game):
+        if right is not None and right is left:
+            actions, _ = right.predict(np.array((game.obs(), game.opponent_obs()), dtype=np.float32))
+            return int(actions[0]), int(actions[1])
+        right_action = 0 if right is None else int(right.predict(np.array(game.obs(), dtype=np.float32))[0])
+        left_action = None if left is None else int(
+            left.predict(np.array(game.opponent_obs(), dtype=np.float32))[0]
+        )
+        return right_action, left_action
+
+    return choose_actions
+
+
+class GameLoop:
+    """Fixed-timestep loop driving a ``PongGame`` in a window.
+
+    ``choose_actions(game)`` is called right before every physics tick and
+    returns ``(right_action, left_action)``; a left action of None lets the
+    tracking bot play. ``score_text(game)`` gives the score line. Rendering
+    runs up to ``max_fps`` frames per second and interpolates between the
+    last two ticks, so a slow frame never slows the game down and a fast
+    display shows smooth motion.
+
+    ``run`` returns input-to-display latency statistics: the time from
+    sampling a tick's input to the display update of the first frame
+    showing it.
+    """
+
+    def __init__(self, title, choose_actions, score_text, tick_rate=TICK_RATE,
+                 max_fps=MAX_FPS, sound_enabled=True, game=None):
+        self.title = title
+        self.choose_actions = choose_actions
+        self.score_text = score_text
+        self.tick = 1.0 / tick_rate
+        self.max_fps = max_fps
+        self.sound_enabled = sound_enabled
+        self.game = game or PongGame()
+        self.running = False
+        self.renderer = None
+        self.latencies = []
+
+    def _positions(self):
+        game = self.game
+        return np.array((game.player.y, game.opponent.y, game.ball.x, game.ball.y), dtype=np.float64)
+
+    def _poll(self):
+        """Handle window events; False once the player quits."""
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                self.running = False
+            elif event.type == pygame.WINDOWEXPOSED and self.renderer is not None:
+                self.renderer.invalidate()
+        return self.running
+
+    def run(self):
+        pygame.init()
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption(self.title)
+        renderer = self.renderer = PongRenderer(screen)
+        sounds = load_sounds() if self.sound_enabled else None
+        clock = pygame.time.Clock()
+
+        game = self.game
+        previous = current = self._positions()
+        accumulator = 0.0
+        last = time.perf_counter()
+        sampled = None
+        self.running = True
+        try:
+            while self._poll():
+                now = time.perf_counter()
+                accumulator += min(now - last, MAX_FRAME_TIME)
+                last = now
+                while accumulator >= self.tick:
+                    # Read input as late as possible, right before the tick uses it
+                    if not self._poll():
+                        break
+                    sampled = time.perf_counter()
+                    right_action, left_action = self.choose_actions(game)
+                    _, terminated, bounces = game.step(right_action, left_action)
+                    # No interpolation across a serve: the ball jumps to the center
+                    previous = current if not terminated else self._positions()
+                    current = self._positions()
+                    if sounds:
+                        for _ in range(bounces):
+                            sounds[0].play()
+                        if terminated:
+                            sounds[1].play()
+                    accumulator -= self.tick
+
+                alpha = min(accumulator / self.tick, 1.0)
+                pygame.display.update(
+                    renderer.draw(*(previous + (current - previous) * alpha), self.score_text(game))
+                )
+                if sampled is not None:
+                    self.latencies.append(time.perf_counter() - sampled)
+                    sampled = None
+                clock.tick(self.max_fps)
+        finally:
+            pygame.quit()
+        return self.latency_stats()
+
+    def latency_stats(self):
+        """Mean and 95th percentile input-to-display latency in milliseconds."""
+        if not self.latencies:
+            return {}
+        ms = np.array(self.latencies) * 1000
+        return {"mean_ms": float(ms.mean()), "p95_ms": float(np.percentile(ms, 95))}
@@ -1,205 +1,256 @@
 """Custom Gymnasium Pong Environment."""
 
-import os
-import random
 import numpy as np
-import pygame
 import gymnasium as gym
 from gymnasium import spaces
 from gymnasium.envs.registration import register
-
-ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
+from pong_core import (
+    BALL_SIZE, BALL_SPEED, HEIGHT, PADDLE_HEIGHT, PADDLE_SPEED, PADDLE_WIDTH, WIDTH, PongGame,
+)
+from pixels import FrameStack, frame_shape, rasterize
 
 
 class PongEnv(gym.Env):
-    """Custom Pong Environment for RL agents."""
-
-    metadata = {"render_modes": ["human"], "render_fps": 60}
-
-    def __init__(self, render_mode=None, sound_enabled=False):
+    """Custom Pong Environment for RL agents.
+
+    With ``two_player=True`` both paddles are agents: actions are
+    ``(right, left)`` pairs and observations are a ``(2, 5)`` array of the
+    right paddle's view and the left paddle's mirrored view, so one policy
+    can act for both sides in a single batched ``predict``. The returned
+    reward is the right paddle's; the left's is in ``info["opponent_reward"]``.
+
+    ``frame_skip`` repeats each action for that many frames and sums the
+    rewards. With ``fast_forward=True`` an idle action instead lasts until
+    the ball's next wall/paddle contact or point (at most
+    ``max_fast_forward`` frames), skipping the contact-free flight in closed
+    form. ``info["frames"]`` tells how many frames a step took.
+
+    With ``obs_type="pixels"`` observations are the last ``n_stack``
+    downsampled grayscale frames, ``(n_stack, height, width)`` uint8 (see
+    ``pixels``), instead of the 5 game-state numbers.
+    """
+
+    metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 60}
+
+    def __init__(self, render_mode=None, sound_enabled=False, two_player=False,
+                 frame_skip=1, fast_forward=False, max_fast_forward=100,
+                 obs_type="vector", n_stack=4):
         super().__init__()
-
-        self.width = 800
-        self.height = 600
-        self.paddle_width = 10
-        self.paddle_height = 100
-        self.ball_size = 15
-        self.paddle_speed = 6
-        self.ball_speed = 5
+        if fast_forward and two_player:
+            raise ValueError("fast_forward needs the tracking opponent (two_player=False)")
+        if obs_type not in ("vector", "pixels"):
+            raise ValueError(f"Unknown obs_type {obs_type!r}")
+        if obs_type == "pixels" and two_player:
+            raise ValueError("Pixel observations are single-player only")
+        self.frame_skip = frame_skip
+        self.fast_forward = fast_forward
+        self.max_fast_forward = max_fast_forward
+
+        self.width = WIDTH
+        self.height = HEIGHT
+        self.paddle_width = PADDLE_WIDTH
+        self.paddle_height = PADDLE_HEIGHT
+        self.ball_size = BALL_SIZE
+        self.paddle_speed = PADDLE_SPEED
+        self.ball_speed = BALL_SPEED
 
         high = np.array([
             self.width, self.height,
             10.0, 10.0,
             self.height
         ], dtype=np.float32)
+        self.two_player = two_player
+        if two_player:
+            high = np.stack([high, high])
+            self.action_space = spaces.MultiDiscrete([3, 3])
+        else:
+            self.action_space = spaces.Discrete(3)
         self.observation_space = spaces.Box(-high, high, dtype=np.float32)
-        self.action_space = spaces.Discrete(3)
+        self.obs_type = obs_type
+        self._frames = None
+        if obs_type == "pixels":
+            self.observation_space = spaces.Box(0, 255, (n_stack,) + frame_shape(), dtype=np.uint8)
+            self._frames = FrameStack(1, n_stack, frame_shape())
 
         self.render_mode = render_mode
         self.sound_enabled = sound_enabled
 
-        self.player_score = 0   # Right paddle (RL agent)
-        self.opponent_score = 0 # Left paddle (auto or RL)
+        self.game = PongGame(self.np_random)
 
+        # Pygame (via pong_engine) is only needed for sound and the window
         if self.sound_enabled:
-            pygame.mixer.init()
-            self.bounce_sound = pygame.mixer.Sound(os.path.join(ASSETS_DIR, "bounce.wav"))
-            self.score_sound = pygame.mixer.Sound(os.path.join(ASSETS_DIR, "score.wav"))
+            from pong_engine import load_sounds  # pylint: disable=import-outside-toplevel
+            self.bounce_sound, self.score_sound = load_sounds()
         else:
             self.bounce_sound = None
             self.score_sound = None
 
-        self.font = None
+        self.renderer = None
+        self.screen = None
+        self.clock = None
+        self.frame = None
 
-        if self.render_mode == "human":
-            pygame.init()
-            self.screen = pygame.display.set_mode((self.width, self.height))
-            pygame.display.set_caption("Pong RL")
-            self.clock = pygame.time.Clock()
-            self.font = pygame.font.SysFont("Arial", 30)
-
-        self._setup()
-
-    def _setup(self):
-        """Initialize game objects."""
-        self.player = pygame.Rect(
-            self.width - 20, self.height // 2 - self.paddle_height // 2,
-            self.paddle_width, self.paddle_height
-        )
-        self.opponent = pygame.Rect(
-            10, self.height // 2 - self.paddle_height // 2,
-            self.paddle_width, self.paddle_height
-        )
-        self.ball = pygame.Rect(
-            self.width // 2, self.height // 2,
-            self.ball_size, self.ball_size
-        )
-        self.ball_speed_x = self.ball_speed * random.choice([1, -1])
-        self.ball_speed_y = self.ball_speed * random.choice([1, -1])
+    # Game state, exposed for scripts that read or steer the paddles
+    player = property(lambda self: self.game.player)
+    opponent = property(lambda self: self.game.opponent)
+    ball = property(lambda self: self.game.ball)
+    ball_speed_x = property(lambda self: self.game.ball_speed_x)
+    ball_speed_y = property(lambda self: self.game.ball_speed_y)
+    player_score = property(lambda self: self.game.player_score)
+    opponent_score = property(lambda self: self.game.opponent_score)
 
     def reset(self, seed=None, options=None):
         """Reset environment to initial state."""
         super().reset(seed=seed)
-        self._setup()
-        return self._get_obs(), {}
+        # Reseeding replaces the generator, so hand the new one to the game
+        self.game.rng = self.np_random
+        self.game.setup()
+        obs = self._get_obs()
+        if self._frames is not None:
+            # A new episode starts with a stack of identical frames
+            self._frames.fill()
+            obs = self._frames.stacked[0].copy()
+        return obs, {}
+
+    def snapshot(self):
+        """The game state as an int64 row (see ``pong_core.STATE_FIELDS``)."""
+        return self.game.snapshot()
+
+    def restore(self, state):
+        """Continue from a ``snapshot`` row and return the observation there.
+
+        Pixel observations get the restored frame pushed onto the stack;
+        earlier frames are not rewound.
+        """
+        self.game.restore(state)
+        return self._get_obs()
 
     def _get_obs(self):
         """Return current observation."""
-        return np.array([
-            self.ball.x,
-            self.ball.y,
-            self.ball_speed_x,
-            self.ball_speed_y,
-            self.player.y
-        ], dtype=np.float32)
+        game = self.game
+        if self._frames is not None:
+            rasterize(
+                self._frames.next_frame(),
+                (game.ball.x,), (game.ball.y,), (game.player.y,), (game.opponent.y,),
+            )
+            return self._frames.stacked[0].copy()
+        if self.two_player:
+            return np.array((game.obs(), game.opponent_obs()), dtype=np.float32)
+        return np.array((
+            game.ball.x, game.ball.y,
+            game.ball_speed_x, game.ball_speed_y,
+            game.player.y,
+        ), dtype=np.float32)
 
     def step(self, action):
         """Apply agent action and update environment."""
-        reward = 0.0
-        terminated = False
+        info = {}
+        if self.two_player:
+            action, opponent_action = int(action[0]), int(action[1])
+        else:
+            opponent_action = None
 
-        # Agent paddle
-        if action == 1 and self.player.top > 0:
-            self.player.y -= self.paddle_speed
-        elif action == 2 and self.player.bottom < self.height:
-            self.player.y += self.paddle_speed
-
-        # Simple auto opponent
-        if self.opponent.centery < self.ball.centery:
-            self.opponent.y += self.paddle_speed
-        elif self.opponent.centery > self.ball.centery:
-            self.opponent.y -= self.paddle_speed
-
-        # Ball movement
-        self.ball.x += self.ball_speed_x
-        self.ball.y += self.ball_speed_y
-
-        # Wall bounce
-        if self.ball.top <= 0 or self.ball.bottom >= self.height:
-            self.ball_speed_y *= -1
-            if self.bounce_sound:
+        if self.frame_skip == 1 and not self.fast_forward:
+            reward, terminated, bounces = self.game.step(action, opponent_action)
+            frames = 1
+            opponent_reward = self.game.opponent_reward
+        else:
+            reward, opponent_reward, terminated, bounces, frames = self._step_frames(
+                action, opponent_action
+            )
+            info["frames"] = frames
+        if self.two_player:
+            info["opponent_reward"] = opponent_reward
+
+        if self.bounce_sound:
+            for _ in range(bounces):
                 self.bounce_sound.play()
+        if terminated and self.score_sound:
+            self.score_sound.play()
 
-        # Paddle collisions
-        if self.ball.colliderect(self.player):
-            self.ball.right = self.player.left
-            self.ball_speed_x *= -1
-            reward += 0.1
-            if self.bounce_sound:
-                self.bounce_sound.play()
-        elif self.ball.colliderect(self.opponent):
-            self.ball.left = self.opponent.right
-            self.ball_speed_x *= -1
-            if self.bounce_sound:
-                self.bounce_sound.play()
+        return self._get_obs(), reward, terminated, False, info
 
-        # Scoring
-        if self.ball.left <= 0:
-            reward = 1.0
-            self.player_score += 1
-            terminated = True
-            self._reset_ball()
-            if self.score_sound:
-                self.score_sound.play()
-        elif self.ball.right >= self.width:
-            reward = -1.0
-            self.opponent_score += 1
-            terminated = True
-            self._reset_ball()
-            if self.score_sound:
-                self.score_sound.play()
+    def _step_frames(self, action, opponent_action):
+        """Repeat or fast-forward ``action``; see the class docstring."""
+        game = self.game
+        idle = self.fast_forward and action == 0
+        budget = self.max_fast_forward if idle else self.frame_skip
+        reward = opponent_reward = 0.0
+        terminated = False
+        bounces = frames = 0
+        while frames < budget:
+            if idle:
+                skipped, skipped_reward = game.fast_forward(budget - frames)
+                frames += skipped
+                reward += skipped_reward
+                if frames >= budget:
+                    break
+            frame_reward, terminated, frame_bounces = game.step(action, opponent_action)
+            frames += 1
+            reward += frame_reward
+            opponent_reward += game.opponent_reward
+            bounces += frame_bounces
+            if terminated or (idle and frame_bounces):
+                break
+        return reward, opponent_reward, terminated, bounces, frames
+
+    def _init_window(self):
+        """Open the game window, or the offscreen frame, on first render."""
+        # pylint: disable=import-outside-toplevel
+        import pygame
+        from pong_engine import PongRenderer
+        if self.render_mode == "human":
+            pygame.init()
+            self.screen = pygame.display.set_mode((self.width, self.height))
+            pygame.display.set_caption("Pong RL")
+            self.clock = pygame.time.Clock()
         else:
-            reward += 0.001
-            distance = abs(self.player.centery - self.ball.centery)
-            reward -= 0.01 * (distance / self.height)
-            if action != 0:
-                reward -= 0.005
-
-        return self._get_obs(), reward, terminated, False, {}
+            pygame.font.init()
+            # The surface draws straight into this array, so frames need no
+            # copy (32-bit pixels: some pygame draw calls crash on 24-bit ones)
+            self.frame = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+            self.screen = pygame.image.frombuffer(self.frame, (self.width, self.height), "RGBX")
+        self.renderer = PongRenderer(self.screen)
 
     def render(self):
-        """Render the game window."""
-        if self.render_mode != "human":
-            return
+        """Render the game window, or return the frame in ``"rgb_array"`` mode.
+
+        The returned ``(height, width, 3)`` array is a read-only view of the
+        frame buffer and is overwritten by the next ``render``; copy it to
+        keep it.
+        """
+        if self.render_mode not in self.metadata["render_modes"]:
+            return None
+        import pygame  # pylint: disable=import-outside-toplevel
+        if self.screen is None:
+            self._init_window()
+
+        left_name = "IA Left" if self.two_player else "Auto"
+        score_text = f"IA Train: {self.player_score}   {left_name}: {self.opponent_score}"
+        if self.render_mode == "rgb_array":
+            self.renderer.draw_game(self.game, score_text)
+            view = self.frame[..., :3]
+            view.flags.writeable = False
+            return view
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 raise SystemExit
-
-        self.screen.fill((0, 0, 0))
-        pygame.draw.rect(self.screen, (255, 255, 255), self.player)
-        pygame.draw.rect(self.screen, (255, 255, 255), self.opponent)
-        pygame.draw.ellipse(self.screen, (255, 255, 255), self.ball)
-        pygame.draw.aaline(
-            self.screen, (255, 255, 255),
-            (self.width // 2, 0), (self.width // 2, self.height)
-        )
-
-        if self.font is None:
-            self.font = pygame.font.SysFont("Arial", 30)
-        score_text = self.font.render(
-            f"IA Train: {self.player_score}   Auto: {self.opponent_score}",
-            True, (255, 255, 255)
-        )
-        self.screen.blit(
-            score_text,
-            (self.width // 2 - score_text.get_width() // 2, 20)
-        )
-
-        pygame.display.flip()
+            if event.type == pygame.WINDOWEXPOSED:
+                self.renderer.invalidate()
+        pygame.display.update(self.renderer.draw_game(self.game, score_text))
         self.clock.tick(self.metadata["render_fps"])
-
-    def _reset_ball(self):
-        """Reset the ball to the center with random direction."""
-        self.ball.x = self.width // 2
-        self.ball.y = self.height // 2
-        self.ball_speed_x = self.ball_speed * random.choice([1, -1])
-        self.ball_speed_y = self.ball_speed * random.choice([1, -1])
+        return None
 
     def close(self):
         """Close the game window."""
-        if self.render_mode == "human":
-            pygame.quit()
+        if self.screen is not None:
+            if self.render_mode == "human":
+                import pygame  # pylint: disable=import-outside-toplevel
+                pygame.quit()
+            self.screen = None
+            self.renderer = None
 
 
 register(
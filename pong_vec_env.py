@@ -0,0 +1,448 @@
+"""Batched Pong VecEnvs that simulate every game as NumPy arrays."""
+
+import multiprocessing as mp
+import signal
+from multiprocessing import shared_memory
+
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv, VecEnvWrapper
+
+from pixels import PIXEL_SCALE, FrameStack, frame_shape, rasterize
+from pong_core import WIDTH, HEIGHT, PongBatch
+from trajectory import CHUNK_RECORDS, TrajectoryWriter
+
+
+def _shared_arrays(buf, num_envs):
+    """Lay out the step buffers of ``num_envs`` games inside ``buf``."""
+    layout = [
+        ("obs", np.float32, (num_envs, 5)),
+        ("terminal_obs", np.float32, (num_envs, 5)),
+        ("rewards", np.float32, (num_envs,)),
+        ("actions", np.int32, (num_envs,)),
+        ("dones", np.bool_, (num_envs,)),
+        ("truncated", np.bool_, (num_envs,)),
+        ("hits", np.int32, (num_envs,)),
+    ]
+    arrays = {}
+    offset = 0
+    for name, dtype, shape in layout:
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if buf is not None:
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+        offset += size
+    return arrays, offset
+
+
+class PongVecEnv(VecEnv):
+    """SB3 VecEnv running ``num_envs`` Pong games with struct-of-arrays state.
+
+    Each step moves every paddle and ball with a handful of vectorized
+    operations instead of one ``PongEnv.step`` call per game. The rules,
+    rewards and observations match ``PongEnv`` exactly, including the
+    ``frame_skip`` and ``fast_forward`` options.
+
+    With ``max_episode_steps`` games are cut off after that many steps and
+    flagged with ``info["TimeLimit.truncated"]``, as gymnasium's
+    ``TimeLimit`` does. ``hits`` holds each env's paddle hits of the last
+    step (see ``VecEpisodeTracker``).
+
+    The games are not separate env objects: ``get_attr`` reads the
+    settings in ``GAME_ATTRS``, which every game shares, and ``env_method``
+    only knows ``reset`` (of just the selected games) and ``render``.
+    """
+
+    render_mode = None
+    GAME_ATTRS = ("render_mode", "frame_skip", "fast_forward", "max_episode_steps")
+
+    def __init__(self, num_envs, seed=None, frame_skip=1, fast_forward=False, max_episode_steps=None):
+        self.frame_skip = frame_skip
+        self.fast_forward = fast_forward
+        self.max_episode_steps = max_episode_steps
+        high = np.array([WIDTH, HEIGHT, 10.0, 10.0, HEIGHT], dtype=np.float32)
+        observation_space = spaces.Box(-high, high, dtype=np.float32)
+        action_space = spaces.Discrete(3)
+
+        self._init_buffers(num_envs, seed)
+        super().__init__(num_envs, observation_space, action_space)
+
+    def _init_buffers(self, num_envs, seed):
+        """Create the game batch and the step buffers it writes into."""
+        self.game = PongBatch(
+            num_envs, seed, frame_skip=self.frame_skip, fast_forward=self.fast_forward,
+            max_episode_steps=self.max_episode_steps,
+        )
+        self._obs = self.game.obs
+        self._terminal_obs = self.game.terminal_obs
+        self._rewards = self.game.rewards
+        self._dones = self.game.dones
+        self._truncated = self.game.truncated
+        self.hits = self.game.hits
+        self._actions = np.zeros(num_envs, dtype=np.int32)
+
+    def _step_result(self, done_idx):
+        """Package the step buffers as SB3 expects them."""
+        infos = [{} for _ in range(self.num_envs)]
+        for i in done_idx:
+            infos[i]["terminal_observation"] = self._terminal_obs[i].copy()
+            if self._truncated[i]:
+                infos[i]["TimeLimit.truncated"] = True
+        return self._obs.copy(), self._rewards.copy(), self._dones.copy(), infos
+
+    def reset(self):
+        """Reset every game and return the batch of observations."""
+        if self._seeds[0] is not None:
+            self.game.seed(self._seeds[0])
+        self._reset_seeds()
+        self._reset_options()
+        self.game.reset()
+        return self._obs.copy()
+
+    def step_async(self, actions):
+        self._actions[:] = actions
+
+    def step_wait(self):
+        return self._step_result(self.game.step(self._actions))
+
+    def close(self):
+        pass
+
+    def _reset_envs(self, idx):
+        """Reset only the games of the envs in ``idx``; returns their observations."""
+        self.game.reset(idx)
+        return self._obs[idx].copy()
+
+    def get_attr(self, attr_name, indices=None):
+        if attr_name not in self.GAME_ATTRS:
+            raise AttributeError(f"{type(self).__name__} games have no attribute {attr_name!r}")
+        value = getattr(self, attr_name)
+        return [value for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        raise AttributeError(f"{type(self).__name__} games share their settings; "
+                             f"{attr_name!r} cannot be set per env")
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        indices = list(self._get_indices(indices))
+        if method_name == "render":
+            return [None for _ in indices]  # No renderer (render_mode is None)
+        if method_name != "reset":
+            raise AttributeError(f"{type(self).__name__} games have no method {method_name!r}")
+        if method_args or method_kwargs:
+            raise TypeError(f"{type(self).__name__} resets take no arguments; "
+                            "seed the VecEnv instead")
+        obs = self._reset_envs(np.array(indices, dtype=np.int64))
+        return [(o, {}) for o in obs]
+
+    def get_images(self):
+        return [None for _ in range(self.num_envs)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
+
+
+class SelfPlayPongVecEnv(PongVecEnv):
+    """Self-play VecEnv where one policy controls both paddles of every game.
+
+    ``n_games`` games appear as ``2 * n_games`` envs: the first half are the
+    right paddles, the second half the left paddles seen through a mirror.
+    Both halves are views of the same buffers, so a single batched forward
+    pass acts for every paddle and nothing is copied to interleave them.
+    """
+
+    def __init__(self, n_games, seed=None, frame_skip=1, max_episode_steps=None):
+        self.n_games = n_games
+        super().__init__(2 * n_games, seed, frame_skip=frame_skip, max_episode_steps=max_episode_steps)
+
+    def _init_buffers(self, num_envs, seed):
+        n = num_envs // 2
+        self._obs = np.zeros((num_envs, 5), dtype=np.float32)
+        self._terminal_obs = np.zeros((num_envs, 5), dtype=np.float32)
+        self._rewards = np.zeros(num_envs, dtype=np.float32)
+        self._dones = np.zeros(num_envs, dtype=bool)
+        self._truncated = np.zeros(num_envs, dtype=bool)
+        self.hits = np.zeros(num_envs, dtype=np.int32)
+        self._actions = np.zeros(num_envs, dtype=np.int32)
+        self.game = PongBatch(n, seed, two_player=True, frame_skip=self.frame_skip,
+                              max_episode_steps=self.max_episode_steps, out={
+            "obs": self._obs[:n],
+            "opponent_obs": self._obs[n:],
+            "terminal_obs": self._terminal_obs[:n],
+            "opponent_terminal_obs": self._terminal_obs[n:],
+            "rewards": self._rewards[:n],
+            "opponent_rewards": self._rewards[n:],
+            "dones": self._dones[:n],
+            "truncated": self._truncated[:n],
+            "hits": self.hits[:n],
+            "opponent_hits": self.hits[n:],
+        })
+
+    def _reset_envs(self, idx):
+        # Both paddles of a game are reset together
+        self.game.reset(np.unique(idx % self.n_games))
+        return self._obs[idx].copy()
+
+    def step_wait(self):
+        n = self.n_games
+        done_idx = self.game.step(self._actions[:n], self._actions[n:])
+        self._dones[n:] = self._dones[:n]
+        self._truncated[n:] = self._truncated[:n]
+        return self._step_result(np.concatenate([done_idx, done_idx + n]))
+
+
+class PixelPongVecEnv(PongVecEnv):
+    """``PongVecEnv`` observing stacks of the last ``n_stack`` pixel frames.
+
+    Observations are ``(n_stack, height, width)`` uint8 images (see
+    ``pixels``), channels first as SB3's ``CnnPolicy`` expects. Frames are
+    rasterized for the whole batch in place into a ``FrameStack`` ring, and
+    the returned observation batch is a view of it rather than a copy: it
+    stays valid for ``capacity - 2 * n_stack + 1`` more steps, plenty for
+    SB3, which is done with an observation one step later.
+
+    As in Atari Pong, the stack runs on across points: after a reset the
+    first frames of the new point still show the end of the last one.
+    """
+
+    def __init__(self, num_envs, seed=None, frame_skip=1, fast_forward=False,
+                 n_stack=4, scale=PIXEL_SCALE, capacity=None, max_episode_steps=None):
+        self.n_stack = n_stack
+        self.scale = scale
+        self.capacity = capacity
+        super().__init__(num_envs, seed, frame_skip=frame_skip, fast_forward=fast_forward,
+                         max_episode_steps=max_episode_steps)
+        self.observation_space = spaces.Box(
+            0, 255, (n_stack,) + frame_shape(scale), dtype=np.uint8
+        )
+
+    def _init_buffers(self, num_envs, seed):
+        super()._init_buffers(num_envs, seed)
+        self.frames = FrameStack(num_envs, self.n_stack, frame_shape(self.scale), self.capacity)
+        self._terminal_frames = np.zeros((num_envs,) + frame_shape(self.scale), dtype=np.uint8)
+
+    def _draw(self, out):
+        game = self.game
+        rasterize(out, game.ball_x, game.ball_y, game.player_y, game.opponent_y, self.scale)
+
+    def _step_result(self, done_idx):
+        self._draw(self.frames.next_frame())
+        stacked = self.frames.stacked
+        infos = [{} for _ in range(self.num_envs)]
+        if done_idx.size:
+            # The point ended on the frame before the serve; both paddles
+            # are back at the center by now, so draw the saved positions
+            terminal = self._terminal_obs[done_idx]
+            frames = self._terminal_frames[:done_idx.size]
+            rasterize(
+                frames, terminal[:, 0].astype(np.int32), terminal[:, 1].astype(np.int32),
+                terminal[:, 4].astype(np.int32), self.game.terminal_opponent_y[done_idx], self.scale,
+            )
+            for k, i in enumerate(done_idx):
+                infos[i]["terminal_observation"] = np.concatenate(
+                    (stacked[i, :-1], frames[k, None])
+                )
+                if self._truncated[i]:
+                    infos[i]["TimeLimit.truncated"] = True
+        return stacked, self._rewards.copy(), self._dones.copy(), infos
+
+    def reset(self):
+        super().reset()
+        self._draw(self.frames.next_frame())
+        self.frames.fill()
+        return self.frames.stacked
+
+    def _reset_envs(self, idx):
+        # Redraw the newest frame of the reset games and stack it alone
+        self.game.reset(idx)
+        game = self.game
+        frames = np.zeros((idx.size,) + frame_shape(self.scale), dtype=np.uint8)
+        rasterize(frames, game.ball_x[idx], game.ball_y[idx], game.player_y[idx],
+                  game.opponent_y[idx], self.scale)
+        self.frames.newest[idx] = frames
+        self.frames.fill(idx)
+        return self.frames.stacked[idx].copy()
+
+
+def _shard_worker(conn, shm, num_envs, lo, hi, seed, game_kwargs):
+    """Step games ``lo:hi`` in place inside the shared step buffers."""
+    # Ctrl+C is handled by the learner, which then closes the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    arrays, _ = _shared_arrays(shm.buf, num_envs)
+    game = PongBatch(hi - lo, seed, out={k: v[lo:hi] for k, v in arrays.items()}, **game_kwargs)
+    actions = arrays["actions"][lo:hi]
+    try:
+        while True:
+            cmd, arg = conn.recv()
+            if cmd == "step":
+                game.step(actions)
+            elif cmd == "reset":
+                if arg is not None:
+                    game.seed(arg)
+                game.reset()
+            elif cmd == "reset_envs":
+                game.reset(arg)
+            elif cmd == "close":
+                break
+            conn.send(None)
+    except EOFError:
+        pass
+    finally:
+        # Views into the block must go before it can be closed
+        del game, actions, arrays
+        shm.close()
+        conn.close()
+
+
+class ShardedPongVecEnv(PongVecEnv):
+    """PongVecEnv whose games are split across ``n_workers`` processes.
+
+    Each worker owns a contiguous slice of games and writes observations,
+    rewards and dones straight into one ``multiprocessing.shared_memory``
+    block. Per step only a short command travels over each pipe; no
+    observation is ever pickled.
+    """
+
+    def __init__(self, num_envs, n_workers, seed=None, frame_skip=1, fast_forward=False,
+                 max_episode_steps=None):
+        self.n_workers = max(1, min(n_workers, num_envs))
+        super().__init__(num_envs, seed, frame_skip=frame_skip, fast_forward=fast_forward,
+                         max_episode_steps=max_episode_steps)
+
+    def _init_buffers(self, num_envs, seed):
+        _, size = _shared_arrays(None, num_envs)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        arrays, _ = _shared_arrays(self._shm.buf, num_envs)
+        self._obs = arrays["obs"]
+        self._terminal_obs = arrays["terminal_obs"]
+        self._rewards = arrays["rewards"]
+        self._dones = arrays["dones"]
+        self._truncated = arrays["truncated"]
+        self.hits = arrays["hits"]
+        self._actions = arrays["actions"]
+
+        bounds = np.linspace(0, num_envs, self.n_workers + 1).astype(int)
+        self._bounds = bounds
+        seeds = np.random.SeedSequence(seed).spawn(self.n_workers)
+        self._conns = []
+        self._processes = []
+        for k in range(self.n_workers):
+            parent, child = mp.Pipe()
+            process = mp.Process(
+                target=_shard_worker,
+                args=(
+                    child, self._shm, num_envs, bounds[k], bounds[k + 1], seeds[k],
+                    {"frame_skip": self.frame_skip, "fast_forward": self.fast_forward,
+                     "max_episode_steps": self.max_episode_steps},
+                ),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+        self.closed = False
+
+    def _command(self, cmd, args=None):
+        """Send ``cmd`` to every worker and wait until all are done."""
+        for k, conn in enumerate(self._conns):
+            conn.send((cmd, None if args is None else args[k]))
+        for conn in self._conns:
+            conn.recv()
+
+    def reset(self):
+        """Reset every game and return the batch of observations."""
+        seeds = None
+        if self._seeds[0] is not None:
+            seeds = np.random.SeedSequence(self._seeds[0]).spawn(self.n_workers)
+        self._reset_seeds()
+        self._reset_options()
+        self._command("reset", seeds)
+        return self._obs.copy()
+
+    def _reset_envs(self, idx):
+        # Each worker resets its own games, by index within its slice
+        lo = self._bounds[:-1]
+        self._command("reset_envs", [
+            idx[(idx >= lo[k]) & (idx < self._bounds[k + 1])] - lo[k] for k in range(self.n_workers)
+        ])
+        return self._obs[idx].copy()
+
+    def step_async(self, actions):
+        self._actions[:] = actions
+        for conn in self._conns:
+            conn.send(("step", None))
+
+    def step_wait(self):
+        for conn in self._conns:
+            conn.recv()
+        return self._step_result(np.flatnonzero(self._dones))
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for conn in self._conns:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+        for conn in self._conns:
+            conn.close()
+        # Drop our views before releasing the block
+        del self._obs, self._terminal_obs, self._rewards, self._dones, self._truncated
+        del self.hits, self._actions
+        self._shm.close()
+        self._shm.unlink()
+
+
+class VecTrajectoryRecorder(VecEnvWrapper):
+    """Record every step of a vectorized env to a trajectory file.
+
+    Each env's episodes get their own ids, so ``TrajectoryReader.episode``
+    can pull one game out of the interleaved records. There are no
+    per-episode seeds; replay restores the serve from the first observation.
+    ``env_kwargs`` are the ``PongEnv`` options replay needs (frame skip...).
+    """
+
+    def __init__(self, venv, path, env_kwargs=None, chunk_records=CHUNK_RECORDS):
+        super().__init__(venv)
+        self.writer = TrajectoryWriter(
+            path, venv.observation_space.shape, venv.action_space.shape, env_kwargs,
+            max(chunk_records, venv.num_envs),
+        )
+        self._episodes = self.writer.new_episodes(venv.num_envs)
+        self._steps = np.zeros(venv.num_envs, dtype=np.uint32)
+        self._obs = None
+        self._actions = None
+
+    def reset(self):
+        self._obs = self.venv.reset()
+        if self._steps.any():
+            self._episodes = self.writer.new_episodes(self.num_envs)
+            self._steps[:] = 0
+        return self._obs
+
+    def step_async(self, actions):
+        self._actions = actions
+        self.venv.step_async(actions)
+
+    def step_wait(self):
+        obs, rewards, dones, infos = self.venv.step_wait()
+        truncated = np.array([info.get("TimeLimit.truncated", False) for info in infos])
+        self.writer.append(
+            self._episodes, self._steps, self._obs, self._actions,
+            rewards, dones & ~truncated, truncated,
+        )
+        self._steps += 1
+        done_idx = np.flatnonzero(dones)
+        if done_idx.size:
+            self._episodes[done_idx] = self.writer.new_episodes(done_idx.size)
+            self._steps[done_idx] = 0
+        self._obs = obs
+        return obs, rewards, dones, infos
+
+    def close(self):
+        self.writer.close()
+        self.venv.close()
@@ -0,0 +1,172 @@
+"""Per-phase wall-time profiling of PPO training, logged to TensorBoard."""
+
+import cProfile
+import functools
+import math
+import os
+import pstats
+import sys
+import time
+
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.vec_env import VecEnvWrapper
+
+
+def rss_mb():
+    """Current and peak resident set size of this process in MB (None if unknown)."""
+    current = peak = None
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        pass
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes
+        peak = peak / 2**20 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    return current, peak
+
+
+class TimedVecEnv(VecEnvWrapper):
+    """Accumulate the wall time spent inside the wrapped env's ``step``."""
+
+    def __init__(self, venv):
+        super().__init__(venv)
+        self.step_time = 0.0
+        self._start = 0.0
+
+    def reset(self):
+        return self.venv.reset()
+
+    def step_async(self, actions):
+        self._start = time.perf_counter()
+        self.venv.step_async(actions)
+
+    def step_wait(self):
+        result = self.venv.step_wait()
+        self.step_time += time.perf_counter() - self._start
+        return result
+
+
+class TrainingProfiler(BaseCallback):
+    """Log where each PPO iteration spends its time under ``profile/``.
+
+    A rollout is split into env stepping (measured by a ``TimedVecEnv``
+    anywhere in the env stack), policy forward passes, GAE and the rest
+    (buffer writes, tensor conversion, callbacks). The update phase is timed
+    from the end of one rollout to the start of the next, so its numbers
+    show up one iteration later. Throughput and process RSS are logged
+    alongside, so everything lands in the run's TensorBoard directory.
+
+    With ``profile_rollout=k`` the k-th rollout (0-based) and the update
+    after it run under cProfile, written to ``profile_path`` (open it with
+    ``python -m pstats`` or snakeviz). The process id is printed when the
+    window opens, for attaching ``py-spy`` instead.
+    """
+
+    def __init__(self, profile_rollout=None, profile_path="rollout.prof", verbose=0):
+        super().__init__(verbose)
+        self.profile_rollout = profile_rollout
+        self.profile_path = profile_path
+        self._timed_env = None
+        self._patched = []
+        self._rollouts = 0
+        self._profiler = None
+        self._rollout_start = 0.0
+        self._rollout_end = None
+        self._env_start = 0.0
+        self._forward_time = 0.0
+        self._gae_time = 0.0
+
+    def _init_callback(self):
+        env = self.training_env
+        while env is not None and not isinstance(env, TimedVecEnv):
+            env = getattr(env, "venv", None)
+        self._timed_env = env
+        self._patch(self.model.policy, "forward", "_forward_time")
+        self._patch(self.model.rollout_buffer, "compute_returns_and_advantage", "_gae_time")
+
+    def _patch(self, owner, name, total_attr):
+        """Wrap ``owner.name`` on the instance, adding its time to ``total_attr``."""
+        original = getattr(owner, name)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                setattr(self, total_attr, getattr(self, total_attr) + time.perf_counter() - start)
+
+        setattr(owner, name, timed)
+        self._patched.append((owner, name))
+
+    def _on_training_end(self):
+        self._log_update()
+        for owner, name in self._patched:
+            delattr(owner, name)
+        self._patched = []
+        self._stop_profile()
+
+    def _on_rollout_start(self):
+        self._log_update()
+        if self._rollouts == self.profile_rollout:
+            print(f"Profiling rollout {self._rollouts} in process {os.getpid()}...")
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._forward_time = self._gae_time = 0.0
+        if self._timed_env is not None:
+            self._env_start = self._timed_env.step_time
+        self._rollout_start = time.perf_counter()
+
+    def _on_step(self):
+        return True
+
+    def _on_rollout_end(self):
+        rollout_time = time.perf_counter() - self._rollout_start
+        steps = self.model.n_steps * self.training_env.num_envs
+        other_time = rollout_time - self._forward_time - self._gae_time
+        record = self.logger.record
+        if self._timed_env is not None:
+            env_time = self._timed_env.step_time - self._env_start
+            other_time -= env_time
+            record("profile/env_step_s", env_time)
+        record("profile/rollout_s", rollout_time)
+        record("profile/forward_s", self._forward_time)
+        record("profile/gae_s", self._gae_time)
+        record("profile/rollout_other_s", other_time)
+        record("profile/rollout_steps_per_s", steps / rollout_time)
+        self._rollouts += 1
+        self._rollout_end = time.perf_counter()
+
+    def _log_update(self):
+        """Log the update that followed the last rollout, if any."""
+        if self._rollout_end is None:
+            return
+        train_time = time.perf_counter() - self._rollout_end
+        self._rollout_end = None
+        model = self.model
+        buffer_size = model.n_steps * self.training_env.num_envs
+        updates = model.n_epochs * math.ceil(buffer_size / model.batch_size)
+        record = self.logger.record
+        record("profile/train_s", train_time)
+        record("profile/updates_per_s", updates / train_time)
+        current, peak = rss_mb()
+        if current is not None:
+            record("profile/rss_mb", current)
+        if peak is not None:
+            record("profile/peak_rss_mb", peak)
+        self._stop_profile()
+
+    def _stop_profile(self):
+        if self._profiler is None:
+            return
+        self._profiler.disable()
+        self._profiler.dump_stats(self.profile_path)
+        if self.verbose:
+            pstats.Stats(self._profiler).sort_stats("cumulative").print_stats(20)
+        print(f"Profile written to {self.profile_path}")
+        self._profiler = None
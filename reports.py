@@ -0,0 +1,16 @@
+"""CSV leaderboard plus JSON report, as written by the sweep and tournament scripts."""
+
+import csv
+import json
+
+
+def write_report(prefix, rows, report):
+    """Write ``rows`` to ``prefix.csv`` and ``report`` to ``prefix.json``; returns both paths."""
+    csv_path, json_path = prefix + ".csv", prefix + ".json"
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return csv_path, json_path
@@ -0,0 +1,140 @@
+"""Compact PPO rollout storage for Pong's small integer observations."""
+
+import numpy as np
+import torch as th
+from gymnasium import spaces
+from stable_baselines3.common.buffers import RolloutBuffer
+from stable_baselines3.common.type_aliases import RolloutBufferSamples
+
+
+def bytes_per_transition(buffer):
+    """Bytes a rollout buffer keeps per stored transition (its NumPy arrays only)."""
+    arrays = [value for value in vars(buffer).values() if isinstance(value, np.ndarray)]
+    return sum(a.nbytes for a in arrays) / (buffer.buffer_size * buffer.n_envs)
+
+
+class CompactRolloutBuffer(RolloutBuffer):
+    """``RolloutBuffer`` storing transitions in narrow dtypes.
+
+    Vector observations are whole numbers (positions, +-5 velocities) and
+    are kept as int16, image observations stay uint8 and the three actions
+    fit a uint8; ``add`` raises if an observation would not survive the
+    cast. Returns are not stored: GAE writes the advantages in place and
+    each minibatch adds the values back.
+
+    Minibatches are shuffled across time steps and games as in SB3, but
+    ``get`` gathers each one straight from the flattened views of the
+    storage, so it never makes the flattened copy of the whole buffer that
+    ``RolloutBuffer.get`` does; only one minibatch is copied at a time.
+    """
+
+    def __init__(self, buffer_size, observation_space, action_space, device="auto",
+                 gae_lambda=1, gamma=0.99, n_envs=1, obs_dtype=None):
+        if not isinstance(action_space, spaces.Discrete) or action_space.n > 256:
+            raise ValueError("CompactRolloutBuffer stores Discrete actions as uint8")
+        if obs_dtype is None:
+            obs_dtype = observation_space.dtype
+            if np.issubdtype(obs_dtype, np.floating):
+                info = np.iinfo(np.int16)
+                fits = np.all(observation_space.low >= info.min) and np.all(observation_space.high <= info.max)
+                obs_dtype = np.int16 if fits else obs_dtype
+        self.obs_dtype = np.dtype(obs_dtype)
+        super().__init__(buffer_size, observation_space, action_space, device, gae_lambda, gamma, n_envs)
+
+    def reset(self):
+        shape = (self.buffer_size, self.n_envs)
+        self.observations = np.zeros(shape + self.obs_shape, dtype=self.obs_dtype)
+        self.actions = np.zeros(shape + (self.action_dim,), dtype=np.uint8)
+        self.rewards = np.zeros(shape, dtype=np.float32)
+        self.episode_starts = np.zeros(shape, dtype=np.bool_)
+        self.values = np.zeros(shape, dtype=np.float32)
+        self.log_probs = np.zeros(shape, dtype=np.float32)
+        self.advantages = np.zeros(shape, dtype=np.float32)
+        self.generator_ready = False
+        self.pos = 0
+        self.full = False
+
+    @property
+    def returns(self):
+        """TD(lambda) returns, computed on demand from advantages and values."""
+        return self.advantages + self.values
+
+    def add(self, obs, action, reward, episode_start, value, log_prob):
+        stored = self.observations[self.pos]
+        stored[...] = obs
+        if self.obs_dtype != np.asarray(obs).dtype and not np.array_equal(stored, obs):
+            raise ValueError(
+                f"observations do not fit {self.obs_dtype} exactly; pass obs_dtype=np.float32"
+            )
+        self.actions[self.pos] = np.asarray(action).reshape(self.n_envs, self.action_dim)
+        self.rewards[self.pos] = reward
+        self.episode_starts[self.pos] = episode_start
+        self.values[self.pos] = value.detach().cpu().numpy().flatten()
+        self.log_probs[self.pos] = log_prob.detach().cpu().numpy().flatten()
+        self.pos += 1
+        if self.pos == self.buffer_size:
+            self.full = True
+
+    def compute_returns_and_advantage(self, last_values, dones):
+        """GAE(lambda) advantages, written straight into ``self.advantages``."""
+        last_values = last_values.detach().cpu().numpy().flatten()
+        next_non_terminal = np.empty(self.n_envs, dtype=np.float32)
+        last_gae_lam = np.zeros(self.n_envs, dtype=np.float32)
+        for step in reversed(range(self.buffer_size)):
+            if step == self.buffer_size - 1:
+                np.subtract(1.0, dones, out=next_non_terminal)
+                next_values = last_values
+            else:
+                np.subtract(1.0, self.episode_starts[step + 1], out=next_non_terminal)
+                next_values = self.values[step + 1]
+            # delta = r + gamma * V' * (1 - done) - V, built in the advantage row
+            advantage = self.advantages[step]
+            np.multiply(next_values, next_non_terminal, out=advantage)
+            advantage *= self.gamma
+            advantage += self.rewards[step]
+            advantage -= self.values[step]
+            last_gae_lam *= next_non_terminal
+            last_gae_lam *= self.gamma * self.gae_lambda
+            advantage += last_gae_lam
+            last_gae_lam[:] = advantage
+
+    def get(self, batch_size=None):
+        assert self.full, ""
+        total = self.buffer_size * self.n_envs
+        if batch_size is None:
+            batch_size = total
+        indices = np.random.permutation(total)
+        for start in range(0, total, batch_size):
+            yield self._get_samples(indices[start:start + batch_size])
+
+    def _get_samples(self, batch_inds, env=None):
+        def rows(array):
+            # Reshaping the time-major storage is a view; indexing copies only the minibatch
+            flat = array.reshape(self.buffer_size * self.n_envs, *array.shape[2:])
+            return th.as_tensor(flat[batch_inds], device=self.device)
+
+        values = rows(self.values)
+        advantages = rows(self.advantages)
+        return RolloutBufferSamples(
+            observations=rows(self.observations),
+            actions=rows(self.actions),
+            old_values=values,
+            old_log_prob=rows(self.log_probs),
+            advantages=advantages,
+            returns=advantages + values,
+        )
+
+
+def use_compact_buffer(model, obs_dtype=None):
+    """Give an on-policy SB3 ``model`` a ``CompactRolloutBuffer``.
+
+    Swapping the buffer in, rather than passing ``rollout_buffer_class``,
+    keeps this module out of the saved model, so checkpoints still load
+    anywhere. Call it again after ``load``. Returns the new buffer.
+    """
+    old = model.rollout_buffer
+    model.rollout_buffer = CompactRolloutBuffer(
+        old.buffer_size, old.observation_space, old.action_space, old.device,
+        gae_lambda=old.gae_lambda, gamma=old.gamma, n_envs=old.n_envs, obs_dtype=obs_dtype,
+    )
+    return model.rollout_buffer
@@ -0,0 +1,40 @@
+# scripts/export_policy.py
+
+import argparse
+import os
+import sys
+
+# Add the project root to sys.path so 'numpy_policy' is importable
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+import numpy as np
+from stable_baselines3 import PPO
+from numpy_policy import NumpyPolicy, export_policy, npz_path
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "ppo_pong_agent.zip")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export a trained PPO model's actor to a torch-free .npz."
+    )
+    parser.add_argument("model", nargs="?", default=MODEL_PATH, help="Model .zip to export")
+    parser.add_argument("--out", help="Output .npz (default: next to the model)")
+    args = parser.parse_args()
+
+    out = args.out or npz_path(args.model)
+    model = PPO.load(args.model, device="cpu")
+    export_policy(model, out)
+
+    # Check the exported actor picks the same actions on random observations
+    high = model.observation_space.high
+    obs = np.random.default_rng(0).uniform(-high, high, size=(4096, len(high))).astype(np.float32)
+    expected, _ = model.predict(obs, deterministic=True)
+    actions, _ = NumpyPolicy.load(out).predict(obs, deterministic=True)
+    mismatches = int((expected != actions).sum())
+
+    print(f"Exported policy to {out} ({os.path.getsize(out)} bytes).")
+    print(f"Action mismatches on {len(obs)} random observations: {mismatches}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# scripts/play_online.py
+"""Thin client for scripts/serve_matches.py: draws the match and sends keys.
+
+All physics runs on the server; the client only applies state deltas.
+"""
+
+import argparse
+import os
+import socket
+import struct
+import sys
+
+# Add the project root to sys.path so project modules are importable
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+import pygame
+from match_server import FULL, STATE_FIELDS, decode_deltas
+from pong_core import HEIGHT, WIDTH
+from pong_engine import MAX_FPS, PongRenderer, key_action
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a match hosted by serve_matches.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    sock = socket.create_connection((args.host, args.port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    hello = sock.recv(4, socket.MSG_WAITALL)
+    if hello == FULL:
+        print("Server is full.")
+        return
+    (slot,) = struct.unpack("<H", sock.recv(2, socket.MSG_WAITALL))
+    print(f"Joined match {slot}. You are the left paddle (arrow keys).")
+    sock.setblocking(False)
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Pong Online")
+    renderer = PongRenderer(screen)
+    clock = pygame.time.Clock()
+
+    state = [0] * len(STATE_FIELDS)
+    fields = {name: k for k, name in enumerate(STATE_FIELDS)}
+    buffer = b""
+    sent_action = None
+    running = True
+    try:
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.WINDOWEXPOSED:
+                    renderer.invalidate()
+
+            action = key_action(pygame.key.get_pressed())
+            if action != sent_action:
+                sock.sendall(bytes((action,)))
+                sent_action = action
+
+            try:
+                data = sock.recv(65536)
+                if not data:
+                    print("Server closed the match.")
+                    break
+                buffer, applied = decode_deltas(buffer + data, state)
+            except BlockingIOError:
+                applied = 0
+
+            if applied:
+                pygame.display.update(renderer.draw(
+                    state[fields["player_y"]], state[fields["opponent_y"]],
+                    state[fields["ball_x"]], state[fields["ball_y"]],
+                    f"You: {state[fields['opponent_score']]}   RL: {state[fields['player_score']]}",
+                ))
+            clock.tick(MAX_FPS)
+    finally:
+        sock.close()
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# scripts/replay.py
+"""Inspect and replay trajectory recordings.
+
+Without ``--episode`` a summary of the recording is printed. Replays
+re-simulate the episode from its recorded actions and report any step where
+the simulation drifts from the recorded observations.
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to sys.path so project modules are importable
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from trajectory import TrajectoryReader, replay_episode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and replay trajectory recordings.")
+    parser.add_argument("path", help="Recording written by RecordingWrapper or VecTrajectoryRecorder")
+    parser.add_argument("--episode", type=int, help="Episode id to replay")
+    parser.add_argument("--render", action="store_true", help="Show the replay in a window")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed when rendering")
+    parser.add_argument("--verify", type=int, metavar="N",
+                        help="Replay the first N episodes headless and check they match")
+    args = parser.parse_args()
+
+    reader = TrajectoryReader(args.path)
+    records = reader.records
+    episodes = reader.episode_ids()
+    size_mb = os.path.getsize(args.path) / 2**20
+    print(f"{len(reader)} steps, {episodes.size} episodes, {size_mb:.1f} MB "
+          f"({reader.dtype.itemsize} bytes/step), options {reader.env_kwargs}")
+
+    if args.verify:
+        bad = 0
+        for episode_id in episodes[:args.verify]:
+            _, _, mismatches = replay_episode(reader, int(episode_id))
+            bad += mismatches > 0
+        print(f"Replayed {min(args.verify, episodes.size)} episodes, {bad} diverged.")
+
+    if args.episode is None:
+        if episodes.size:
+            points = int(records["terminated"].sum())
+            print(f"{points} points, mean reward per episode {records['reward'].sum() / episodes.size:+.3f}")
+        return
+
+    steps, total_reward, mismatches = replay_episode(
+        reader, args.episode, render=args.render, speed=args.speed
+    )
+    print(f"Episode {args.episode}: {steps} steps, reward {total_reward:+.1f}, "
+          f"{mismatches} mismatched steps")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
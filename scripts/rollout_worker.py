@@ -0,0 +1,47 @@
+# scripts/rollout_worker.py
+"""Rollout worker for ``train_nowatch.py --distributed``.
+
+Run it on any machine that can reach the learner; each process steps its
+own batch of headless games and sends the rollouts over TCP.
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+
+# Add the project root to sys.path so project modules are importable
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from distributed_worker import run_worker, worker_process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect PPO rollouts for a remote learner.")
+    parser.add_argument("--host", default="127.0.0.1", help="Learner address")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Worker processes to run on this machine (one core each)")
+    args = parser.parse_args()
+
+    if args.processes == 1:
+        run_worker(args.host, args.port)
+        return
+    processes = [
+        mp.Process(target=worker_process, args=(args.host, args.port, 1), daemon=True)
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        print("Workers stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# scripts/serve_matches.py
+"""Host many human-vs-AI matches from one process (see match_server.py).
+
+Humans connect with scripts/play_online.py. ``--bots N`` also starts N
+headless load-test clients in a separate process, to see how many matches
+a core can hold at 60 ticks per second.
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import sys
+
+# Add the project root to sys.path so project modules are importable
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from match_server import MatchServer, bot_client
+from pong_core import TrackingPolicy
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "ppo_pong_agent.zip")
+
+
+def run_bots(host, port, n_bots, duration):
+    """Load-test process: ``n_bots`` clients for ``duration`` seconds."""
+    async def main():
+        results = await asyncio.gather(*(
+            bot_client(host, port, duration, seed=k) for k in range(n_bots)
+        ))
+        joined = [r for r in results if r is not None]
+        print(f"{len(joined)} bots played, {n_bots - len(joined)} turned away; "
+              f"{sum(joined) / max(1, len(joined)) / duration:.1f} deltas/s per bot")
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve human-vs-AI matches over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-matches", type=int, default=1024)
+    parser.add_argument("--ai", choices=("model", "tracking"), default="model",
+                        help="Trained model or the built-in tracking heuristic")
+    parser.add_argument("--bots", type=int, default=0, help="Headless load-test clients")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds")
+    args = parser.parse_args()
+
+    if args.ai == "model":
+        from numpy_policy import load_policy  # pylint: disable=import-outside-toplevel
+        policy = load_policy(MODEL_PATH)
+    else:
+        policy = TrackingPolicy()
+    server = MatchServer(policy, max_matches=args.max_matches)
+
+    async def serve():
+        port = await server.start(args.host, args.port)
+        print(f"Serving up to {args.max_matches} matches on {args.host}:{port}")
+        bots = None
+        if args.bots:
+            bot_time = args.duration - 1 if args.duration else 60.0
+            bots = mp.get_context("spawn").Process(
+                target=run_bots, args=(args.host, port, args.bots, bot_time)
+            )
+            bots.start()
+        try:
+            await server.serve_forever(duration=args.duration)
+        finally:
+            server.close()
+            if bots is not None:
+                bots.join(timeout=5)
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("Server stopped.")
+    print(server.format_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# scripts/sweep.py
+"""Hyperparameter sweep for the PPO settings of train_nowatch.py.
+
+Samples ``--trials`` configurations (trial 0 is the current train_nowatch
+settings) and trains them in a process pool, each process pinned to its
+own cores. After every rung of training the trials are evaluated headless
+against the tracking bot and the best ``1 / --eta`` of them continue, with
+``--eta`` times the budget (successive halving). Every trial trains with a
+seed of its own but is evaluated on the same games, so a rung ranks the
+settings rather than the luck of the evaluation draw. Results go to a CSV
+leaderboard and a JSON report with every evaluation.
+"""
+
+import argparse
+import math
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the project root to sys.path so project modules are importable
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+import numpy as np
+from evaluation import evaluate
+from numpy_policy import NumpyPolicy, actor_arrays
+from reports import write_report
+
+TRIALS_DIR = os.path.join(PROJECT_ROOT, "sweep_trials")
+
+# train_nowatch.py's settings, always trial 0
+BASELINE = {"n_steps": 256, "batch_size": 256, "clip_range": 0.15, "ent_coef": 0.05, "learning_rate": 1e-4}
+# Lists are sampled uniformly, (low, high) pairs log-uniformly
+SEARCH_SPACE = {
+    "n_steps": [64, 128, 256, 512],
+    "batch_size": [256, 1024, 4096, 16384],
+    "clip_range": [0.1, 0.15, 0.2, 0.3],
+    "ent_coef": (1e-3, 1e-1),
+    "learning_rate": (3e-5, 1e-3),
+}
+FIXED = {"gamma": 0.99, "gae_lambda": 0.95, "n_epochs": 4}
+
+
+def sample_configs(n, seed):
+    """``n`` configurations: the baseline, then random draws from ``SEARCH_SPACE``."""
+    rng = np.random.default_rng(seed)
+    configs = [dict(BASELINE)]
+    while len(configs) < n:
+        config = {}
+        for name, space in SEARCH_SPACE.items():
+            if isinstance(space, list):
+                config[name] = space[rng.integers(len(space))]
+            else:
+                low, high = np.log(space[0]), np.log(space[1])
+                config[name] = float(f"{math.exp(rng.uniform(low, high)):.3g}")
+        configs.append(config)
+    return configs
+
+
+def pin_worker(core_sets):
+    """Pool initializer: claim a set of cores and size torch's thread pool to it."""
+    import torch  # pylint: disable=import-outside-toplevel
+    cores = core_sets.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    torch.set_num_threads(len(cores))
+
+
+def run_trial(task):
+    """Worker: train a trial up to ``task["steps"]`` env steps, then evaluate it."""
+    # pylint: disable=import-outside-toplevel
+    from stable_baselines3 import PPO
+    from pong_vec_env import PongVecEnv
+
+    start = time.perf_counter()
+    env = PongVecEnv(task["envs"], seed=task["seed"])
+    if os.path.exists(task["path"]):
+        model = PPO.load(task["path"], env=env, device="cpu")
+    else:
+        model = PPO("MlpPolicy", env, device="cpu", seed=task["seed"], **task["config"], **FIXED)
+    model.learn(task["steps"] - model.num_timesteps, reset_num_timesteps=False)
+    model.save(task["path"])
+    win_rate, rally = evaluate(
+        NumpyPolicy.from_arrays(*actor_arrays(model)), task["eval_envs"], task["eval_steps"],
+        task["eval_seed"],
+    )
+    env.close()
+    return {
+        "trial": task["trial"],
+        "steps": int(model.num_timesteps),
+        "win_rate": win_rate,
+        "avg_rally_frames": rally,
+        "train_s": time.perf_counter() - start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Successive-halving sweep over PPO settings.")
+    parser.add_argument("--trials", type=int, default=16, help="Configurations in the first rung")
+    parser.add_argument("--eta", type=int, default=2, help="Keep 1/eta of the trials per rung")
+    parser.add_argument("--min-steps", type=int, default=1_000_000,
+                        help="Env steps per trial in the first rung (multiplied by eta each rung)")
+    parser.add_argument("--envs", type=int, default=256, help="Training games per trial")
+    parser.add_argument("--eval-envs", type=int, default=512, help="Evaluation games per trial")
+    parser.add_argument("--eval-steps", type=int, default=2000, help="Frames per evaluation")
+    parser.add_argument("--target-win-rate", type=float, default=0.5,
+                        help="Report how many env steps each trial took to reach this win rate")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 2),
+                        help="Trials trained at once")
+    parser.add_argument("--threads", type=int, help="Cores per trial (default: all cores / workers)")
+    parser.add_argument("--out", default=os.path.join(PROJECT_ROOT, "sweep"),
+                        help="Report path prefix (.csv and .json are added)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+    core_sets = mp.Queue()
+    for k in range(args.workers):
+        core_sets.put({(k * threads + i) % (os.cpu_count() or 1) for i in range(threads)})
+    os.makedirs(TRIALS_DIR, exist_ok=True)
+
+    configs = sample_configs(args.trials, args.seed)
+    trials = {
+        k: {"trial": k, "config": config, "path": os.path.join(TRIALS_DIR, f"trial_{k}.zip"),
+            "evaluations": [], "rung": 0, "steps_to_target": None}
+        for k, config in enumerate(configs)
+    }
+    for trial in trials.values():
+        if os.path.exists(trial["path"]):
+            os.remove(trial["path"])  # Left over from an earlier sweep
+
+    alive = list(trials)
+    n_rungs = int(math.log(args.trials, args.eta) + 1e-9) + 1
+    print(f"{args.trials} trials, {n_rungs} rungs, {args.workers} workers x {threads} threads...")
+    with ProcessPoolExecutor(args.workers, initializer=pin_worker, initargs=(core_sets,)) as pool:
+        for rung in range(n_rungs):
+            steps = args.min_steps * args.eta ** rung
+            tasks = [
+                {"trial": k, "config": trials[k]["config"], "path": trials[k]["path"], "steps": steps,
+                 "envs": args.envs, "eval_envs": args.eval_envs, "eval_steps": args.eval_steps,
+                 "seed": args.seed + k, "eval_seed": args.seed}
+                for k in alive
+            ]
+            for result in pool.map(run_trial, tasks):
+                trial = trials[result["trial"]]
+                trial["evaluations"].append(result)
+                trial["rung"] = rung
+                if trial["steps_to_target"] is None and result["win_rate"] >= args.target_win_rate:
+                    trial["steps_to_target"] = result["steps"]
+            # Win rate first; rally length separates trials that never beat the bot yet
+            alive.sort(key=lambda k: (trials[k]["evaluations"][-1]["win_rate"],
+                                      trials[k]["evaluations"][-1]["avg_rally_frames"]), reverse=True)
+            best = trials[alive[0]]["evaluations"][-1]
+            print(f"Rung {rung}: {len(alive)} trials at {steps:,} steps, best trial {alive[0]} "
+                  f"(win rate {best['win_rate']:.3f})")
+            alive = alive[:max(1, len(alive) // args.eta)]
+
+    rows = []
+    for trial in trials.values():
+        last = trial["evaluations"][-1]
+        rows.append({
+            "trial": trial["trial"],
+            "rung": trial["rung"],
+            "steps": last["steps"],
+            "win_rate": round(last["win_rate"], 4),
+            "avg_rally_frames": round(last["avg_rally_frames"], 1),
+            "steps_to_target": trial["steps_to_target"] or "",
+            "train_s": round(sum(e["train_s"] for e in trial["evaluations"]), 1),
+            **trial["config"],
+        })
+    rows.sort(key=lambda r: (-r["rung"], r["steps_to_target"] or math.inf, -r["win_rate"]))
+
+    write_report(args.out, rows,
+                 {"settings": vars(args), "leaderboard": rows, "trials": list(trials.values())})
+
+    for row in rows:
+        config = ", ".join(f"{name}={row[name]}" for name in BASELINE)
+        print(f"trial {row['trial']:>3}  rung {row['rung']}  win rate {row['win_rate']:.3f}"
+              f"  target at {row['steps_to_target'] or '-':>10}  {config}")
+    print(f"Report written to {args.out}.csv and {args.out}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# scripts/tournament.py
+"""Round-robin tournament between training checkpoints, with Elo ratings.
+
+Every pair of checkpoints plays headless batched games on both sides of the
+table; pairs are spread over a process pool. One game is one point, as in
+PongEnv. Results go to a CSV leaderboard and a JSON report.
+"""
+
+import argparse
+import glob
+import itertools
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the project root to sys.path so project modules are importable
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+import numpy as np
+from numpy_policy import NumpyPolicy, export_policy, npz_path
+from pong_core import PongBatch
+from reports import write_report
+
+CHECKPOINTS_DIR = os.path.join(PROJECT_ROOT, "checkpoints")
+BOT = "bot"
+
+
+def exported_policy(zip_path):
+    """Return the .npz for ``zip_path``, exporting it first if it is stale."""
+    out = npz_path(zip_path)
+    if not os.path.exists(out) or os.path.getmtime(out) < os.path.getmtime(zip_path):
+        from stable_baselines3 import PPO  # pylint: disable=import-outside-toplevel
+        export_policy(PPO.load(zip_path, device="cpu"), out)
+    return out
+
+
+def play_side(right, left, n_envs, steps, seed):
+    """Play ``steps`` frames with ``right`` on the right paddle.
+
+    ``left`` is a policy, or None for the built-in tracking bot. Returns
+    ``(right_points, left_points, rally_frames)``.
+    """
+    game = PongBatch(n_envs, seed, two_player=left is not None)
+    rally = np.zeros(n_envs, dtype=np.int64)
+    right_points = left_points = rally_frames = 0
+    for _ in range(steps):
+        action, _ = right.predict(game.obs)
+        left_action = None if left is None else left.predict(game.opponent_obs)[0]
+        done_idx = game.step(action, left_action)
+        rally += 1
+        if done_idx.size:
+            right_won = game.rewards[done_idx] > 0
+            right_points += int(right_won.sum())
+            left_points += int(done_idx.size - right_won.sum())
+            rally_frames += int(rally[done_idx].sum())
+            rally[done_idx] = 0
+    return right_points, left_points, rally_frames
+
+
+def play_match(task):
+    """Worker: play both sides of one pairing and return the tally."""
+    name_a, path_a, name_b, path_b, n_envs, steps, seed = task
+    policy_a = NumpyPolicy.load(path_a)
+    policy_b = None if path_b is None else NumpyPolicy.load(path_b)
+
+    wins_a, wins_b, frames = play_side(policy_a, policy_b, n_envs, steps, seed)
+    if policy_b is not None:
+        b_right, a_left, more_frames = play_side(policy_b, policy_a, n_envs, steps, seed + 1)
+        wins_a += a_left
+        wins_b += b_right
+        frames += more_frames
+    return {"a": name_a, "b": name_b, "wins_a": wins_a, "wins_b": wins_b, "frames": frames}
+
+
+def fit_elo(names, matches, iterations=1000):
+    """Fit Elo ratings (Bradley-Terry maximum likelihood) to all game results."""
+    index = {name: i for i, name in enumerate(names)}
+    wins = np.zeros((len(names), len(names)))
+    for m in matches:
+        wins[index[m["a"]], index[m["b"]]] += m["wins_a"]
+        wins[index[m["b"]], index[m["a"]]] += m["wins_b"]
+    games = wins + wins.T
+    # Half a win each way keeps undefeated or winless players finite
+    total_wins = wins.sum(axis=1) + 0.5
+    strength = np.ones(len(names))
+    for _ in range(iterations):
+        denom = (games / (strength[:, None] + strength[None, :])).sum(axis=1) + 1.0 / (strength + 1.0)
+        strength = total_wins / denom
+        strength /= math.exp(np.log(strength).mean())
+    return 1500 + 400 * np.log10(strength)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin tournament between checkpoints.")
+    parser.add_argument("--checkpoints", default=CHECKPOINTS_DIR, help="Directory of .zip checkpoints")
+    parser.add_argument("--envs", type=int, default=1024, help="Parallel games per match side")
+    parser.add_argument("--steps", type=int, default=2000, help="Frames played per match side")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--include-bot", action="store_true", help="Also play the tracking bot")
+    parser.add_argument("--out", default=os.path.join(PROJECT_ROOT, "tournament"),
+                        help="Report path prefix (.csv and .json are added)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    zips = sorted(glob.glob(os.path.join(args.checkpoints, "*.zip")), key=os.path.getmtime)
+    if len(zips) + args.include_bot < 2:
+        print("Need at least two players; train some checkpoints first.")
+        return
+    players = {os.path.splitext(os.path.basename(z))[0]: exported_policy(z) for z in zips}
+    if args.include_bot:
+        players[BOT] = None
+    names = list(players)
+
+    tasks = []
+    for k, (a, b) in enumerate(itertools.combinations(names, 2)):
+        if a == BOT:
+            a, b = b, a
+        tasks.append((a, players[a], b, players[b], args.envs, args.steps, args.seed + 2 * k))
+    print(f"{len(names)} players, {len(tasks)} pairings, {args.workers} workers...")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        matches = list(pool.map(play_match, tasks))
+
+    ratings = fit_elo(names, matches)
+    rows = []
+    for i, name in enumerate(names):
+        wins = losses = frames = 0
+        for m in matches:
+            if name in (m["a"], m["b"]):
+                mine, theirs = ("wins_a", "wins_b") if m["a"] == name else ("wins_b", "wins_a")
+                wins += m[mine]
+                losses += m[theirs]
+                frames += m["frames"]
+        games = wins + losses
+        rows.append({
+            "player": name,
+            "elo": round(float(ratings[i]), 1),
+            "games": games,
+            "wins": wins,
+            "losses": losses,
+            "win_rate": round(wins / games, 4) if games else 0.0,
+            "avg_rally_frames": round(frames / games, 1) if games else 0.0,
+        })
+    rows.sort(key=lambda r: r["elo"], reverse=True)
+
+    write_report(args.out, rows, {"leaderboard": rows, "matches": matches})
+
+    total = sum(m["wins_a"] + m["wins_b"] for m in matches)
+    print(f"Played {total} games.")
+    for row in rows:
+        print(f"{row['player']:<32} Elo {row['elo']:7.1f}  win rate {row['win_rate']:.3f}"
+              f"  avg rally {row['avg_rally_frames']:.0f} frames")
+    print(f"Report written to {args.out}.csv and {args.out}.json")
+
+
+if __name__ == "__main__":
+    main()
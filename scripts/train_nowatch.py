@@ -1,5 +1,7 @@
 # scripts/train_nowatch.py
 
+import argparse
+import multiprocessing as mp
 import os
 import sys
 
@@ -7,16 +9,27 @@ import sys
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
 
-import gymnasium as gym
 from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv
-from stable_baselines3.common.callbacks import CheckpointCallback
-import pong_env  # Registers CustomPong-v0
+from behavior_cloning import generate_demonstrations, pretrain_policy
+from checkpointing import AsyncCheckpointCallback, CheckpointError
+from evaluation import EarlyStoppingCallback
+from episode_stats import EpisodeStatsCallback, VecEpisodeTracker
+from distributed import DistributedPPO, RolloutServer
+from distributed_worker import worker_process
+from pipeline import GroupedVecEnv, PipelinedPPO
+from planner import LookaheadPlanner
+from profiling import TimedVecEnv, TrainingProfiler
+from rollout_buffer import bytes_per_transition, use_compact_buffer
+from pong_vec_env import PongVecEnv, SelfPlayPongVecEnv, ShardedPongVecEnv, VecTrajectoryRecorder
+from trajectory import read_header
 
 MODELS_DIR = os.path.join(PROJECT_ROOT, "models")
 CHECKPOINTS_DIR = os.path.join(PROJECT_ROOT, "checkpoints")
 TENSORBOARD_DIR = os.path.join(PROJECT_ROOT, "ppo_pong_tensorboard")
 MODEL_PATH = os.path.join(MODELS_DIR, "ppo_pong_agent.zip")
+BEST_MODEL_PATH = os.path.join(MODELS_DIR, "best_model.zip")
+DEMOS_PATH = os.path.join(MODELS_DIR, "expert_demos.trj")
+PLANNER_DEMOS_PATH = os.path.join(MODELS_DIR, "expert_demos_planner.trj")
 
 for d in [MODELS_DIR, CHECKPOINTS_DIR, TENSORBOARD_DIR]:
     os.makedirs(d, exist_ok=True)
@@ -25,24 +38,165 @@ for d in [MODELS_DIR, CHECKPOINTS_DIR, TENSORBOARD_DIR]:
 N_ENVS = 2048
 TOTAL_TIMESTEPS = 50_000_000
 
-def make_env():
-    return gym.make(
-        "CustomPong-v0",
-        render_mode=None,
-        sound_enabled=False
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the Pong PPO agent headless.")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Processes stepping the envs through shared memory (1 = in-process)"
     )
+    parser.add_argument(
+        "--self-play", action="store_true",
+        help="Train one policy on both paddles of N_ENVS // 2 games"
+    )
+    parser.add_argument(
+        "--frame-skip", type=int, default=1,
+        help="Frames each action is repeated for"
+    )
+    parser.add_argument(
+        "--fast-forward", action="store_true",
+        help="Let an idle action last until the ball's next contact"
+    )
+    parser.add_argument(
+        "--record", metavar="PATH",
+        help="Append every training step to a trajectory recording (see scripts/replay.py)"
+    )
+    parser.add_argument(
+        "--pretrain", action="store_true",
+        help="Warm-start a new model by cloning the tracking bot before PPO"
+    )
+    parser.add_argument(
+        "--teacher", choices=["tracking", "planner"], default="tracking",
+        help="Expert cloned by --pretrain: the tracking bot or the lookahead planner"
+    )
+    parser.add_argument(
+        "--demo-steps", type=int, default=1_000_000,
+        help="Expert transitions to generate for --pretrain (reused if present)"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Log per-phase timings, throughput and RSS to TensorBoard (profile/*)"
+    )
+    parser.add_argument(
+        "--profile-rollout", type=int, metavar="K",
+        help="Also cProfile the K-th rollout and its update into profile.prof"
+    )
+    parser.add_argument(
+        "--distributed", action="store_true",
+        help="Learn from rollouts sent by scripts/rollout_worker.py instead of local envs"
+    )
+    parser.add_argument(
+        "--bind", default="127.0.0.1",
+        help="Address the learner listens on with --distributed (0.0.0.0 for remote workers)"
+    )
+    parser.add_argument("--port", type=int, default=5555, help="Learner port for --distributed")
+    parser.add_argument(
+        "--envs-per-worker", type=int, default=256,
+        help="Games each rollout worker steps; N_ENVS must be a multiple of it"
+    )
+    parser.add_argument(
+        "--max-staleness", type=int, default=1,
+        help="Drop worker batches collected more than this many policy updates ago"
+    )
+    parser.add_argument(
+        "--local-workers", type=int, default=0,
+        help="Rollout worker processes to start on this machine with --distributed"
+    )
+    parser.add_argument(
+        "--pipeline", type=int, default=1, metavar="G",
+        help="Split the envs into G groups that step while the policy runs on another"
+    )
+    parser.add_argument(
+        "--max-episode-steps", type=int,
+        help="Truncate points still running after this many steps (0 = never; default 5000, "
+             "never with --distributed)"
+    )
+    parser.add_argument(
+        "--stats-freq", type=int, default=100_000,
+        help="Env steps between episode statistics in TensorBoard (episode/*)"
+    )
+    parser.add_argument(
+        "--eval-freq", type=int, default=1_000_000,
+        help="Env steps between evaluations against the tracking bot (0 = never)"
+    )
+    parser.add_argument("--eval-envs", type=int, default=512, help="Games per evaluation")
+    parser.add_argument("--eval-steps", type=int, default=2000, help="Steps per evaluation")
+    parser.add_argument(
+        "--target-win-rate", type=float, default=0.95,
+        help="Stop training once an evaluation reaches this win rate"
+    )
+    parser.add_argument(
+        "--patience", type=int, default=10,
+        help="Stop training after this many evaluations without a better win rate (0 = never)"
+    )
+    args = parser.parse_args()
+    if args.record and args.self_play:
+        parser.error("--record replays against the tracking opponent; it cannot follow --self-play")
+    if args.fast_forward and args.self_play:
+        parser.error("--fast-forward needs the tracking opponent; it cannot follow --self-play")
+    if args.workers > 1 and args.self_play:
+        parser.error("--self-play games run in-process; drop --workers")
+    if args.distributed:
+        if args.self_play or args.record or args.workers > 1:
+            parser.error("--distributed collects rollouts remotely; drop --self-play, --record and --workers")
+        if args.max_episode_steps:
+            parser.error("--distributed workers cannot bootstrap truncated points; drop --max-episode-steps")
+        if N_ENVS % args.envs_per_worker:
+            parser.error(f"--envs-per-worker must divide N_ENVS ({N_ENVS})")
+    if args.pipeline > 1 and (args.record or args.distributed):
+        parser.error("--pipeline steps the env groups directly; it cannot follow --record or --distributed")
+    if args.max_episode_steps is None:
+        args.max_episode_steps = 0 if args.distributed else 5000
+    return args
+
+
+def make_env(args, num_envs, workers):
+    """Vectorized envs for ``num_envs`` agent slots (all games stepped as NumPy arrays)."""
+    max_steps = args.max_episode_steps or None
+    if args.self_play:
+        env = SelfPlayPongVecEnv(num_envs // 2, frame_skip=args.frame_skip, max_episode_steps=max_steps)
+    elif workers > 1:
+        env = ShardedPongVecEnv(num_envs, workers, frame_skip=args.frame_skip,
+                                fast_forward=args.fast_forward, max_episode_steps=max_steps)
+    else:
+        env = PongVecEnv(num_envs, frame_skip=args.frame_skip, fast_forward=args.fast_forward,
+                         max_episode_steps=max_steps)
+    return VecEpisodeTracker(env)
 
 if __name__ == "__main__":
+    args = parse_args()
+
     # Create vectorized environments
-    env = DummyVecEnv([make_env for _ in range(N_ENVS)])
+    # With --distributed the env is never stepped: it only fixes the spaces
+    # and the rollout width (N_ENVS // --envs-per-worker worker batches)
+    if args.pipeline > 1:
+        env = GroupedVecEnv([
+            make_env(args, N_ENVS // args.pipeline, args.workers // args.pipeline)
+            for _ in range(args.pipeline)
+        ])
+    else:
+        env = make_env(args, N_ENVS, args.workers)
+    if args.record:
+        env = VecTrajectoryRecorder(
+            env, args.record,
+            env_kwargs={"frame_skip": args.frame_skip, "fast_forward": args.fast_forward},
+        )
+    profiling = args.profile or args.profile_rollout is not None
+    if profiling and args.pipeline <= 1:
+        env = TimedVecEnv(env)  # Pipelined rollouts log their own env time (pipeline/*)
 
     # Load existing model or create a new one
+    if args.distributed:
+        algorithm = DistributedPPO
+    elif args.pipeline > 1:
+        algorithm = PipelinedPPO
+    else:
+        algorithm = PPO
     if os.path.exists(MODEL_PATH):
         print("Loading existing model...")
-        model = PPO.load(MODEL_PATH, env=env, device="cpu")
+        model = algorithm.load(MODEL_PATH, env=env, device="cpu")
     else:
         print("Creating new model...")
-        model = PPO(
+        model = algorithm(
             "MlpPolicy",
             env,
             verbose=1,
@@ -57,24 +211,84 @@ if __name__ == "__main__":
             ent_coef=0.05,
             learning_rate=1e-4,
         )
+        if args.pretrain:
+            demo_kwargs = {"frame_skip": args.frame_skip, "fast_forward": args.fast_forward}
+            demos_path, expert = DEMOS_PATH, None
+            if args.teacher == "planner":
+                planner = LookaheadPlanner(repeat=max(args.frame_skip, 4))
+                demos_path, expert = PLANNER_DEMOS_PATH, lambda game: planner.plan(game.snapshot())
+            if os.path.exists(demos_path) and read_header(demos_path)[0]["env_kwargs"] != demo_kwargs:
+                os.remove(demos_path)  # Recorded with other step options
+            if not os.path.exists(demos_path):
+                print("Generating expert demonstrations...")
+                generate_demonstrations(demos_path, args.demo_steps, N_ENVS, expert=expert, **demo_kwargs)
+            pretrain_policy(model, demos_path)
+
+    # Narrow dtypes, no flattened copy: ~28 instead of ~96 bytes per transition at peak
+    buffer = use_compact_buffer(model)
+    transitions = buffer.buffer_size * buffer.n_envs
+    print(f"Rollout buffer: {bytes_per_transition(buffer):.0f} bytes per transition, "
+          f"{bytes_per_transition(buffer) * transitions / 2**20:.1f} MB for {transitions:,} transitions")
 
-    # Set up checkpoint callback
-    checkpoint_callback = CheckpointCallback(
+    # Set up checkpoint callback (written in the background; the last 10 and,
+    # with --eval-freq, the best evaluated one are kept)
+    checkpoint_callback = AsyncCheckpointCallback(
         save_freq=500_000,
         save_path=CHECKPOINTS_DIR,
-        name_prefix="ppo_pong"
+        name_prefix="ppo_pong",
+        keep_last=10,
     )
 
+    callbacks = [checkpoint_callback, EpisodeStatsCallback(args.stats_freq)]
+    if args.eval_freq:
+        # Best evaluated model goes to models/best_model.zip
+        callbacks.append(EarlyStoppingCallback(
+            args.eval_freq, BEST_MODEL_PATH, n_envs=args.eval_envs, eval_steps=args.eval_steps,
+            target_win_rate=args.target_win_rate, patience=args.patience or None,
+            game_kwargs={"frame_skip": args.frame_skip, "fast_forward": args.fast_forward},
+            checkpoints=checkpoint_callback,
+        ))
+    if profiling:
+        callbacks.append(TrainingProfiler(
+            args.profile_rollout, os.path.join(PROJECT_ROOT, "profile.prof")
+        ))
+
+    server = None
+    local_workers = []
+    if args.distributed:
+        server = RolloutServer(
+            args.bind, args.port, model.n_steps, args.envs_per_worker,
+            env_kwargs={"frame_skip": args.frame_skip, "fast_forward": args.fast_forward},
+            max_staleness=args.max_staleness, max_queue=N_ENVS // args.envs_per_worker,
+            obs_shape=env.observation_space.shape,
+        )
+        model.rollout_server = server
+        print(f"Waiting for rollout workers on {args.bind}:{server.address[1]}...")
+        for _ in range(args.local_workers):
+            worker = mp.Process(target=worker_process, args=("127.0.0.1", server.address[1]), daemon=True)
+            worker.start()
+            local_workers.append(worker)
+
     # Train
     try:
         model.learn(
             total_timesteps=TOTAL_TIMESTEPS,
-            callback=checkpoint_callback
+            callback=callbacks
         )
-        model.save(MODEL_PATH)
-        print("Training completed. Final model saved.")
     except KeyboardInterrupt:
         print("Training interrupted! Saving current model...")
-        model.save(MODEL_PATH)
+        checkpoint_callback.save_now(MODEL_PATH, model)
+    except CheckpointError:
+        # A failed background checkpoint stops training; keep the model anyway
+        print("A background checkpoint failed! Saving current model...")
+        checkpoint_callback.save_now(MODEL_PATH, model)
+        raise
+    else:
+        checkpoint_callback.save_now(MODEL_PATH, model)
+        print("Training completed. Final model saved.")
     finally:
+        if server is not None:
+            server.close()
+        for worker in local_workers:
+            worker.join(timeout=5)
         env.close()
@@ -1,78 +1,93 @@
 # scripts/train_watch.py
 
+import argparse
+import multiprocessing as mp
 import os
 import sys
-import threading
-import time
-import numpy as np
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
 
-from stable_baselines3 import PPO
-from pong_env import PongEnv
+# Only light imports at module level: the viewer process re-imports this file
+from live_viewer import SharedPolicyWeights, run_viewer
 
-MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "ppo_pong_agent")
-TRAINING = True  # Global flag
+MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "ppo_pong_agent.zip")
+N_ENVS = 256
+PUBLISH_EVERY = 1  # Rollouts between weight updates sent to the viewer
 
-def train_loop(env, model):
-    global TRAINING
-    try:
-        while TRAINING:
-            model.learn(total_timesteps=2048, reset_num_timesteps=False)
-    except KeyboardInterrupt:
-        print("Training interrupted (background).")
-    finally:
-        TRAINING = False
-        try:
-            model.save(MODEL_PATH)
-        except Exception as e:
-            print(f"Error saving model: {e}")
-        try:
-            env.close()
-        except Exception:
-            pass
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Train at full speed while a separate process shows a live demo game."
+    )
+    parser.add_argument("--envs", type=int, default=N_ENVS, help="Headless training envs")
+    parser.add_argument("--no-sound", action="store_true", help="Mute the viewer")
+    return parser.parse_args()
 
 def main():
-    global TRAINING
-    env = PongEnv(render_mode="human", sound_enabled=True)
-    if os.path.exists(MODEL_PATH + ".zip"):
+    # pylint: disable=import-outside-toplevel
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.callbacks import BaseCallback
+    from checkpointing import snapshot_model, write_snapshot
+    from numpy_policy import actor_arrays
+    from pong_vec_env import PongVecEnv
+
+    class PublishWeights(BaseCallback):
+        """Send the actor to the viewer and stop when the viewer goes away."""
+
+        def __init__(self, weights, stop_event):
+            super().__init__()
+            self.weights = weights
+            self.stop_event = stop_event
+            self.rollouts = 0
+
+        def _on_rollout_start(self):
+            if self.rollouts % PUBLISH_EVERY == 0:
+                self.weights.publish(actor_arrays(self.model)[0])
+            self.rollouts += 1
+
+        def _on_step(self):
+            return not self.stop_event.is_set()
+
+    args = parse_args()
+    env = PongVecEnv(args.envs)
+    if os.path.exists(MODEL_PATH):
         print("Loading existing model...")
         model = PPO.load(MODEL_PATH, env=env, device="cpu")
     else:
         print("Creating new model...")
         model = PPO("MlpPolicy", env, verbose=1, device="cpu")
 
-    # Start training in a background thread
-    t_train = threading.Thread(target=train_loop, args=(env, model), daemon=True)
-    t_train.start()
+    weights = SharedPolicyWeights.for_arrays(*actor_arrays(model))
+    weights.publish(actor_arrays(model)[0])
+
+    # The viewer is its own process: no GIL contention, no torch import
+    ctx = mp.get_context("spawn")
+    stop_event = ctx.Event()
+    viewer = ctx.Process(
+        target=run_viewer,
+        args=(weights.attach_args(), stop_event, not args.no_sound),
+        daemon=True,
+    )
+    viewer.start()
 
-    obs, _ = env.reset()
     try:
-        while TRAINING:
-            # --- FIX: Always batch the observation! ---
-            obs_batch = obs.reshape(1, -1) if obs.ndim == 1 else obs
-            action, _ = model.predict(obs_batch, deterministic=False)
-            action = int(np.asarray(action).flatten()[0])  # ensure int
-            obs, reward, terminated, truncated, _ = env.step(action)
-            env.render()
-            time.sleep(1 / env.metadata["render_fps"])
-            if terminated or truncated:
-                obs, _ = env.reset()
+        while not stop_event.is_set():
+            model.learn(
+                total_timesteps=args.envs * model.n_steps * 10,
+                callback=PublishWeights(weights, stop_event),
+                reset_num_timesteps=False,
+            )
     except KeyboardInterrupt:
         print("KeyboardInterrupt detected. Stopping...")
-        TRAINING = False
+    finally:
+        stop_event.set()
         try:
-            model.save(MODEL_PATH)
+            write_snapshot(snapshot_model(model), MODEL_PATH)
+            print(f"Model saved to {MODEL_PATH}")
         except Exception as e:
             print(f"Error saving model: {e}")
-        try:
-            env.close()
-        except Exception:
-            pass
-    finally:
-        TRAINING = False
-        t_train.join(timeout=2)
+        viewer.join(timeout=5)
+        weights.close()
         env.close()
 
 if __name__ == "__main__":
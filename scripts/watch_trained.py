@@ -1,5 +1,6 @@
 # scripts/watch_trained.py
 
+import argparse
 import os
 import sys
 
@@ -8,14 +9,24 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
 
 import gymnasium as gym
-from stable_baselines3 import PPO
 import pong_env  # Registers CustomPong-v0
+from numpy_policy import load_policy
+from trajectory import RecordingWrapper
 
 MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "ppo_pong_agent.zip")
 
 def main():
+    parser = argparse.ArgumentParser(description="Watch the trained agent play.")
+    parser.add_argument("--record", metavar="PATH",
+                        help="Append the games to a trajectory recording (see scripts/replay.py)")
+    parser.add_argument("--cache", type=int, default=0, metavar="N",
+                        help="Memoize up to N observation -> action decisions (0 = off)")
+    args = parser.parse_args()
+
     env = gym.make("CustomPong-v0", render_mode="human", sound_enabled=True)
-    model = PPO.load(MODEL_PATH, device="cpu")
+    if args.record:
+        env = RecordingWrapper(env, args.record)
+    model = load_policy(MODEL_PATH, cache_size=args.cache)
 
     obs, _ = env.reset()
 
@@ -33,6 +44,8 @@ def main():
         print("Execution interrupted by user.")
     finally:
         env.close()
+        if args.cache:
+            print(model.format_stats())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,79 @@
+"""Atomic checkpoint writes and the retention policy of ``AsyncCheckpointCallback``."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+from stable_baselines3 import PPO
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import checkpointing
+from checkpointing import AsyncCheckpointCallback, snapshot_model, write_snapshot
+from pong_vec_env import PongVecEnv
+
+
+@pytest.fixture(name="model")
+def fixture_model():
+    return PPO("MlpPolicy", PongVecEnv(4, seed=0), n_steps=16, batch_size=64, device="cpu", seed=0)
+
+
+def test_snapshot_loads_like_save(tmp_path, model):
+    path = write_snapshot(snapshot_model(model), str(tmp_path / "snap"))
+    assert path.endswith("snap.zip")
+    loaded = PPO.load(path, device="cpu")
+    obs = np.random.default_rng(0).integers(0, 500, (64, 5)).astype(np.float32)
+    np.testing.assert_array_equal(
+        loaded.predict(obs, deterministic=True)[0], model.predict(obs, deterministic=True)[0]
+    )
+    assert os.listdir(tmp_path) == ["snap.zip"]
+
+
+def test_failed_write_keeps_the_previous_file(tmp_path, model, monkeypatch):
+    path = str(tmp_path / "model.zip")
+    write_snapshot(snapshot_model(model), path)
+    before = (tmp_path / "model.zip").read_bytes()
+
+    def broken_save(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(checkpointing.th, "save", broken_save)
+    with pytest.raises(OSError):
+        write_snapshot(snapshot_model(model), path)
+    assert (tmp_path / "model.zip").read_bytes() == before
+    assert os.listdir(tmp_path) == ["model.zip"]  # No temporary file left behind
+
+
+def checkpoint_files(directory):
+    return sorted(
+        (name for name in os.listdir(directory) if name.endswith("_steps.zip")),
+        key=lambda name: int(name.split("_")[-2]),
+    )
+
+
+def test_prune_keeps_the_last_and_the_best(tmp_path, model):
+    callback = AsyncCheckpointCallback(1, str(tmp_path), keep_last=2, keep_best=1)
+    callback.init_callback(model)
+    for steps in (100, 200, 300, 400, 500):
+        path = callback.checkpoint_path(steps)
+        callback.report_score(path, 1.0 if steps == 200 else 0.1 * steps / 100)
+        write_snapshot(snapshot_model(model), path)
+        # Exported policies next to a checkpoint go with it
+        (tmp_path / f"ppo_pong_{steps}_steps.npz").touch()
+    callback._prune()  # pylint: disable=protected-access
+
+    kept = ["ppo_pong_200_steps.zip", "ppo_pong_400_steps.zip", "ppo_pong_500_steps.zip"]
+    assert checkpoint_files(tmp_path) == kept
+    assert sorted(n for n in os.listdir(tmp_path) if n.endswith(".npz")) == [
+        name[:-4] + ".npz" for name in kept
+    ]
+    assert set(callback.scores) == set(kept)
+
+
+def test_scores_survive_a_restart(tmp_path, model):
+    callback = AsyncCheckpointCallback(1, str(tmp_path), keep_last=1, keep_best=1)
+    callback.init_callback(model)
+    callback.report_score(callback.checkpoint_path(100), 0.9)
+    restarted = AsyncCheckpointCallback(1, str(tmp_path), keep_last=1, keep_best=1)
+    assert restarted.scores == {"ppo_pong_100_steps.zip": 0.9}
@@ -0,0 +1,75 @@
+"""``NumpyPolicy`` against the torch actor it was exported from."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+import torch as th
+from stable_baselines3 import PPO
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from numpy_policy import NumpyPolicy, actor_arrays, export_policy, load_policy
+from pong_vec_env import PongVecEnv
+
+
+def make_model(activation_fn):
+    """A PPO model whose action head is scaled up, so logits are far from ties."""
+    model = PPO("MlpPolicy", PongVecEnv(4, seed=0), device="cpu", seed=0,
+                policy_kwargs={"activation_fn": activation_fn})
+    with th.no_grad():
+        model.policy.action_net.weight.mul_(300.0)
+    return model
+
+
+def observations(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(0, 800, n), rng.integers(0, 600, n),
+        rng.choice([-5, 5], n), rng.choice([-5, 5], n), rng.integers(0, 500, n),
+    ]).astype(np.float32)
+
+
+@pytest.mark.parametrize("activation_fn", [th.nn.Tanh, th.nn.ReLU])
+def test_logits_and_actions_match_torch(activation_fn):
+    model = make_model(activation_fn)
+    policy = NumpyPolicy.from_arrays(*actor_arrays(model))
+    obs = observations(2000)
+    with th.no_grad():
+        distribution = model.policy.get_distribution(th.as_tensor(obs))
+        logits = distribution.distribution.logits.numpy()
+    expected = logits.argmax(axis=1)
+    np.testing.assert_allclose(
+        policy.logits(obs) - policy.logits(obs).max(axis=1, keepdims=True),
+        logits - logits.max(axis=1, keepdims=True), atol=1e-3,
+    )
+    actions, _ = policy.predict(obs)
+    # Rows whose two best logits nearly tie may round either way in float32
+    top2 = np.sort(logits, axis=1)[:, -2:]
+    clear = top2[:, 1] - top2[:, 0] > 1e-3
+    assert clear.mean() > 0.9
+    np.testing.assert_array_equal(actions[clear], expected[clear])
+    np.testing.assert_array_equal(actions[clear], model.predict(obs, deterministic=True)[0][clear])
+
+
+def test_export_round_trip(tmp_path):
+    model = make_model(th.nn.Tanh)
+    model_path = str(tmp_path / "agent.zip")
+    model.save(model_path)
+    export_policy(model, str(tmp_path / "agent.npz"))
+    loaded = load_policy(model_path)
+    assert isinstance(loaded, NumpyPolicy)
+    obs = observations(500)
+    np.testing.assert_array_equal(
+        loaded.predict(obs)[0], NumpyPolicy.from_arrays(*actor_arrays(model)).predict(obs)[0]
+    )
+
+
+def test_single_observation_gives_one_action():
+    policy = NumpyPolicy.from_arrays(*actor_arrays(make_model(th.nn.Tanh)))
+    obs = observations(8)
+    action, state = policy.predict(obs[3])
+    assert state is None
+    assert np.ndim(action) == 0
+    assert action == policy.predict(obs)[0][3]
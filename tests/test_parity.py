@@ -0,0 +1,149 @@
+"""Batched games against ``PongEnv``; frame skip and fast-forward against single frames."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pong_core import PongBatch, PongGame
+from pong_env import PongEnv
+from pong_vec_env import PongVecEnv, SelfPlayPongVecEnv
+
+STEP_OPTIONS = [
+    {}, {"frame_skip": 4}, {"fast_forward": True}, {"fast_forward": True, "frame_skip": 3},
+]
+
+
+def synced_env(game, i, **options):
+    """A ``PongEnv`` in the state of game ``i`` of ``game``."""
+    env = PongEnv(**options)
+    env.reset(seed=i)
+    env.restore(game.snapshot(i))
+    return env
+
+
+@pytest.mark.parametrize("options", STEP_OPTIONS)
+def test_batch_steps_like_pong_env(options):
+    # Serves are random and drawn differently, so each env is re-synced after a point
+    game = PongBatch(32, seed=0, **options)
+    envs = [synced_env(game, i, **options) for i in range(32)]
+    rng = np.random.default_rng(0)
+    points = 0
+    for _ in range(2000):
+        actions = rng.integers(0, 3, 32)
+        game.step(actions)
+        for i, env in enumerate(envs):
+            obs, reward, terminated, _, info = env.step(int(actions[i]))
+            assert terminated == game.dones[i]
+            assert info.get("frames", 1) == game.frames[i]
+            assert reward == pytest.approx(game.rewards[i], rel=1e-5, abs=1e-6)
+            if terminated:
+                points += 1
+                envs[i] = synced_env(game, i, **options)
+            else:
+                np.testing.assert_array_equal(obs, game.obs[i])
+    assert points > 50
+
+
+def test_two_player_batch_steps_like_pong_env():
+    game = PongBatch(32, seed=0, two_player=True)
+    envs = [synced_env(game, i, two_player=True) for i in range(32)]
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        actions, opponent_actions = rng.integers(0, 3, (2, 32))
+        game.step(actions, opponent_actions)
+        for i, env in enumerate(envs):
+            obs, reward, terminated, _, info = env.step((actions[i], opponent_actions[i]))
+            assert terminated == game.dones[i]
+            assert reward == pytest.approx(game.rewards[i], rel=1e-5, abs=1e-6)
+            assert info["opponent_reward"] == pytest.approx(
+                game.opponent_rewards[i], rel=1e-5, abs=1e-6
+            )
+            if terminated:
+                envs[i] = synced_env(game, i, two_player=True)
+            else:
+                np.testing.assert_array_equal(obs, (game.obs[i], game.opponent_obs[i]))
+
+
+def test_vec_envs_return_the_batch_outputs():
+    env = PongVecEnv(16, seed=0)
+    reference = PongBatch(16, seed=0)
+    reference.reset()
+    np.testing.assert_array_equal(env.reset(), reference.obs)
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        actions = rng.integers(0, 3, 16)
+        obs, rewards, dones, infos = env.step(actions)
+        done_idx = reference.step(actions)
+        np.testing.assert_array_equal(obs, reference.obs)
+        np.testing.assert_array_equal(rewards, reference.rewards)
+        np.testing.assert_array_equal(dones, reference.dones)
+        for i in done_idx:
+            terminal_obs = infos[i]["terminal_observation"]
+            np.testing.assert_array_equal(terminal_obs, reference.terminal_obs[i])
+
+
+def test_self_play_halves_are_the_two_paddles():
+    env = SelfPlayPongVecEnv(16, seed=0)
+    reference = PongBatch(16, seed=0, two_player=True)
+    reference.reset()
+    env.reset()
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        actions = rng.integers(0, 3, 32)
+        obs, rewards, dones, _ = env.step(actions)
+        reference.step(actions[:16], actions[16:])
+        np.testing.assert_array_equal(obs, np.concatenate([reference.obs, reference.opponent_obs]))
+        np.testing.assert_array_equal(
+            rewards, np.concatenate([reference.rewards, reference.opponent_rewards])
+        )
+        np.testing.assert_array_equal(dones, np.tile(reference.dones, 2))
+
+
+def game_states(n, seed=0):
+    """``n`` snapshot rows of games in play, taken from random play."""
+    game = PongBatch(n, seed=seed)
+    rng = np.random.default_rng(seed)
+    for _ in range(rng.integers(50, 150)):
+        game.step(rng.integers(0, 3, n))
+    return game.snapshot()
+
+
+def test_fast_forward_equals_idle_frames():
+    for state in game_states(256):
+        fast, slow = PongGame(), PongGame()
+        fast.restore(state)
+        slow.restore(state)
+        frames, reward = fast.fast_forward(100)
+        expected = 0.0
+        for _ in range(frames):
+            frame_reward, terminated, bounces = slow.step(0)
+            assert not terminated and not bounces
+            expected += frame_reward
+        np.testing.assert_array_equal(fast.snapshot(), slow.snapshot())
+        assert reward == pytest.approx(expected, abs=1e-9)
+
+
+@pytest.mark.parametrize("options", [{"frame_skip": 4}, {"fast_forward": True}])
+def test_env_step_options_equal_single_frames(options):
+    rng = np.random.default_rng(0)
+    for k, state in enumerate(game_states(128)):
+        env, single = PongEnv(**options), PongEnv()
+        env.reset(seed=k)
+        single.reset(seed=k)
+        env.restore(state)
+        single.restore(state)
+        action = int(rng.integers(0, 3))
+        obs, reward, terminated, _, info = env.step(action)
+        expected = 0.0
+        for _ in range(info["frames"]):
+            obs_single, frame_reward, terminated_single, _, _ = single.step(action)
+            expected += frame_reward
+            assert not terminated_single or terminated
+        assert terminated == terminated_single
+        assert reward == pytest.approx(expected, abs=1e-9)
+        if not terminated:
+            np.testing.assert_array_equal(obs, obs_single)
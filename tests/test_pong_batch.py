@@ -0,0 +1,42 @@
+"""Step bookkeeping of ``PongBatch`` under frame skip and fast-forward."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pong_core import PongBatch
+
+STEP_OPTIONS = [{}, {"frame_skip": 4}, {"fast_forward": True}, {"fast_forward": True, "frame_skip": 3}]
+
+
+def play(game, steps, seed=0):
+    """Step ``game`` with random actions; yield the indices finished each step."""
+    rng = np.random.default_rng(seed)
+    for _ in range(steps):
+        yield game.step(rng.integers(0, 3, game.num_envs))
+
+
+@pytest.mark.parametrize("options", STEP_OPTIONS)
+def test_episode_steps_count_steps_since_last_point(options):
+    game = PongBatch(256, seed=0, **options)
+    expected = np.zeros(256, dtype=np.int64)
+    for done_idx in play(game, 3000):
+        expected += 1
+        expected[done_idx] = 0
+        np.testing.assert_array_equal(game.episode_steps, expected)
+
+
+@pytest.mark.parametrize("options", STEP_OPTIONS)
+def test_truncation_at_max_episode_steps(options):
+    game = PongBatch(256, seed=0, max_episode_steps=50, **options)
+    longest = np.zeros(256, dtype=np.int64)
+    for done_idx in play(game, 500):
+        assert game.episode_steps.max() < 50
+        truncated = np.flatnonzero(game.truncated)
+        assert np.isin(truncated, done_idx).all()
+        longest = np.maximum(longest, game.episode_steps)
+    assert longest.max() == 49
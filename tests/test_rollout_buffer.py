@@ -0,0 +1,89 @@
+"""``CompactRolloutBuffer`` against SB3's ``RolloutBuffer``."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+import torch as th
+from gymnasium import spaces
+from stable_baselines3.common.buffers import RolloutBuffer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from rollout_buffer import CompactRolloutBuffer
+
+N_STEPS, N_ENVS = 64, 8
+HIGH = np.full(5, 800, dtype=np.float32)
+
+
+def filled_buffers(seed=0):
+    """A ``RolloutBuffer`` and a ``CompactRolloutBuffer`` fed the same random rollout."""
+    obs_space, action_space = spaces.Box(-HIGH, HIGH, dtype=np.float32), spaces.Discrete(3)
+    kwargs = {"gae_lambda": 0.95, "gamma": 0.99, "n_envs": N_ENVS}
+    buffers = (RolloutBuffer(N_STEPS, obs_space, action_space, "cpu", **kwargs),
+               CompactRolloutBuffer(N_STEPS, obs_space, action_space, "cpu", **kwargs))
+    rng = np.random.default_rng(seed)
+    for _ in range(N_STEPS):
+        step = (
+            rng.integers(-800, 800, (N_ENVS, 5)).astype(np.float32),
+            rng.integers(0, 3, N_ENVS),
+            rng.normal(size=N_ENVS).astype(np.float32),
+            rng.random(N_ENVS) < 0.1,
+            th.as_tensor(rng.normal(size=N_ENVS).astype(np.float32)),
+            th.as_tensor(rng.normal(size=N_ENVS).astype(np.float32)),
+        )
+        for buffer in buffers:
+            buffer.add(*step)
+    last_values = th.as_tensor(rng.normal(size=N_ENVS).astype(np.float32))
+    dones = rng.random(N_ENVS) < 0.1
+    for buffer in buffers:
+        buffer.compute_returns_and_advantage(last_values, dones)
+    return buffers
+
+
+def test_gae_matches_rollout_buffer():
+    reference, compact = filled_buffers()
+    np.testing.assert_allclose(compact.advantages, reference.advantages, rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(compact.returns, reference.returns, rtol=1e-5, atol=1e-5)
+
+
+def flat(array):
+    """Transitions of a ``(n_steps, n_envs, ...)`` buffer array, one per row."""
+    return array.reshape(N_STEPS * N_ENVS, *array.shape[2:])
+
+
+def test_minibatches_cover_every_transition_once():
+    reference, compact = filled_buffers()
+    # Random observations are distinct, so they identify the transitions
+    row_of = {tuple(obs): i for i, obs in enumerate(flat(reference.observations).tolist())}
+    actions, advantages = flat(reference.actions)[:, 0], flat(reference.advantages)
+    returns, log_probs = flat(reference.returns), flat(reference.log_probs)
+    seen = []
+    for batch in compact.get(batch_size=100):
+        for k, obs in enumerate(batch.observations.tolist()):
+            i = row_of[tuple(float(v) for v in obs)]
+            seen.append(i)
+            assert batch.actions[k].item() == actions[i]
+            assert batch.advantages[k].item() == pytest.approx(advantages[i], abs=1e-5)
+            assert batch.returns[k].item() == pytest.approx(returns[i], abs=1e-5)
+            assert batch.old_log_prob[k].item() == pytest.approx(log_probs[i])
+    assert sorted(seen) == list(range(N_STEPS * N_ENVS))
+
+
+def test_minibatches_are_shuffled_across_steps():
+    _, compact = filled_buffers()
+    first = next(compact.get(batch_size=N_ENVS))
+    steps = {
+        int(np.flatnonzero((compact.observations == obs.numpy()).all(axis=-1))[0] // N_ENVS)
+        for obs in first.observations
+    }
+    assert len(steps) > 1
+
+
+def test_add_rejects_observations_the_narrow_dtype_cannot_hold():
+    obs_space = spaces.Box(-HIGH, HIGH, dtype=np.float32)
+    buffer = CompactRolloutBuffer(N_STEPS, obs_space, spaces.Discrete(3), "cpu", n_envs=1)
+    with pytest.raises(ValueError):
+        buffer.add(np.full((1, 5), 0.5, dtype=np.float32), np.zeros(1), np.zeros(1),
+                   np.zeros(1, dtype=bool), th.zeros(1), th.zeros(1))
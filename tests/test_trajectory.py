@@ -0,0 +1,114 @@
+"""Trajectory recordings: write/read round trip, appends and replay."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pong_env import PongEnv
+from pong_vec_env import PongVecEnv, VecTrajectoryRecorder
+from trajectory import (
+    UNKNOWN_SEED, RecordingWrapper, TrajectoryReader, TrajectoryWriter, replay_episode,
+)
+
+
+def random_rows(rng, n, first_episode=0):
+    """One column per ``TrajectoryWriter.append`` argument, ``n`` rows each."""
+    return {
+        "episode": np.arange(first_episode, first_episode + n, dtype=np.uint32),
+        "step": rng.integers(0, 1000, n),
+        "obs": rng.integers(-800, 800, (n, 5)).astype(np.float32),
+        "action": rng.integers(0, 3, n),
+        "reward": rng.normal(size=n).astype(np.float32),
+        "terminated": rng.random(n) < 0.5,
+        "truncated": rng.random(n) < 0.5,
+    }
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "run.trj")
+    rng = np.random.default_rng(0)
+    writer = TrajectoryWriter(path, (5,), (), {"frame_skip": 2}, chunk_records=8)
+    written = []
+    for n in (3, 5, 1, 20, 7):  # Around and above the chunk size
+        rows = random_rows(rng, n, sum(len(r["reward"]) for r in written))
+        writer.append(rows["episode"], rows["step"], rows["obs"], rows["action"],
+                      rows["reward"], rows["terminated"], rows["truncated"], seed=42)
+        written.append(rows)
+    writer.close()
+
+    reader = TrajectoryReader(path)
+    assert reader.env_kwargs == {"frame_skip": 2}
+    assert len(reader) == 36
+    for name in written[0]:
+        expected = np.concatenate([rows[name] for rows in written])
+        np.testing.assert_array_equal(reader.records[name], expected)
+    assert (reader.records["seed"] == 42).all()
+
+
+def test_append_drops_a_torn_record_and_continues_episode_ids(tmp_path):
+    path = str(tmp_path / "run.trj")
+    rng = np.random.default_rng(0)
+    writer = TrajectoryWriter(path, (5,), ())
+    rows = random_rows(rng, 4, writer.new_episodes(4)[0])
+    writer.append(*rows.values())
+    writer.close()
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03")  # A crash in the middle of a record
+
+    writer = TrajectoryWriter(path, (5,), ())
+    assert writer.new_episode() == 4
+    more = random_rows(rng, 2, 4)
+    writer.append(*more.values())
+    writer.close()
+
+    reader = TrajectoryReader(path)
+    assert len(reader) == 6
+    np.testing.assert_array_equal(reader.records["episode"], np.arange(6))
+    np.testing.assert_array_equal(reader.records["obs"][4:], more["obs"])
+
+
+def test_recorded_episodes_replay_exactly(tmp_path):
+    path = str(tmp_path / "run.trj")
+    env = RecordingWrapper(PongEnv(frame_skip=2), path, seed=0)
+    rng = np.random.default_rng(0)
+    totals = []
+    for _ in range(3):
+        env.reset()
+        total, terminated = 0.0, False
+        while not terminated:
+            _, reward, terminated, _, _ = env.step(int(rng.integers(0, 3)))
+            total += reward
+        totals.append(total)
+    env.close()
+
+    reader = TrajectoryReader(path)
+    for episode_id, total in zip(reader.episode_ids(), totals):
+        steps, replayed, mismatches = replay_episode(reader, episode_id)
+        assert steps == len(reader.episode(episode_id))
+        assert mismatches == 0
+        assert replayed == pytest.approx(total, abs=1e-9)
+
+
+def test_vec_recordings_replay_from_the_first_observation(tmp_path):
+    path = str(tmp_path / "vec.trj")
+    env = VecTrajectoryRecorder(PongVecEnv(8, seed=0), path)
+    env.reset()
+    rng = np.random.default_rng(0)
+    for _ in range(400):
+        env.step(rng.integers(0, 3, 8))
+    env.close()
+
+    reader = TrajectoryReader(path)
+    assert (reader.records["seed"] == UNKNOWN_SEED).all()
+    finished = [
+        episode_id for episode_id in reader.episode_ids()
+        if reader.episode(episode_id)["terminated"][-1]
+    ]
+    assert len(finished) > 8
+    for episode_id in finished:
+        _, _, mismatches = replay_episode(reader, episode_id)
+        assert mismatches == 0
@@ -0,0 +1,265 @@
+"""Compact binary trajectory recordings, memory-mapped reading and replay.
+
+A recording is a small JSON header followed by fixed-width records, one per
+environment step: episode id, step index, episode seed, the observation the
+action was chosen from, the action, the reward and the done flags. Records
+are buffered in chunks and only ever appended, so a crashed run leaves a
+readable file (a torn last record is ignored) and the reader can
+``np.memmap`` the whole thing without loading it.
+"""
+
+import json
+import os
+import struct
+
+import gymnasium as gym
+import numpy as np
+
+MAGIC = b"PONGTRJ1"
+HEADER_ALIGN = 64
+UNKNOWN_SEED = -1
+CHUNK_RECORDS = 4096
+
+
+def record_dtype(obs_shape, action_shape):
+    """Packed record layout for the given observation and action shapes."""
+    return np.dtype([
+        ("episode", "<u4"),
+        ("step", "<u4"),
+        ("seed", "<i8"),
+        ("obs", "<f4", tuple(obs_shape)),
+        ("action", "i1", tuple(action_shape)),
+        ("reward", "<f4"),
+        ("terminated", "?"),
+        ("truncated", "?"),
+    ])
+
+
+def read_header(path):
+    """Return ``(header dict, offset of the first record)``."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a trajectory recording")
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length))
+    return header, _header_size(length)
+
+
+def _header_size(length):
+    size = len(MAGIC) + 4 + length
+    return -(-size // HEADER_ALIGN) * HEADER_ALIGN
+
+
+class TrajectoryWriter:
+    """Append records to a recording, ``chunk_records`` at a time.
+
+    Opening an existing file with the same layout appends to it; episode ids
+    continue from the last one recorded.
+    """
+
+    def __init__(self, path, obs_shape, action_shape, env_kwargs=None, chunk_records=CHUNK_RECORDS):
+        self.path = path
+        self.dtype = record_dtype(obs_shape, action_shape)
+        self._chunk = np.zeros(chunk_records, dtype=self.dtype)
+        self._fill = 0
+        self._next_episode = 0
+        header = {
+            "version": 1,
+            "obs_shape": list(obs_shape),
+            "action_shape": list(action_shape),
+            "env_kwargs": env_kwargs or {},
+        }
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            existing, offset = read_header(path)
+            if existing["obs_shape"] != header["obs_shape"] or \
+                    existing["action_shape"] != header["action_shape"]:
+                raise ValueError(f"{path} was recorded with a different layout")
+            # Drop a record torn by a crash so appends stay aligned
+            count = (os.path.getsize(path) - offset) // self.dtype.itemsize
+            with open(path, "rb+") as f:
+                f.truncate(offset + count * self.dtype.itemsize)
+            if count:
+                records = np.memmap(path, dtype=self.dtype, mode="r", offset=offset, shape=(count,))
+                self._next_episode = int(records["episode"].max()) + 1
+                del records
+            self._file = open(path, "ab")  # pylint: disable=consider-using-with
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            blob = json.dumps(header).encode()
+            self._file = open(path, "wb")  # pylint: disable=consider-using-with
+            self._file.write(MAGIC + struct.pack("<I", len(blob)) + blob)
+            self._file.write(b" " * (_header_size(len(blob)) - len(MAGIC) - 4 - len(blob)))
+
+    def new_episode(self):
+        """Reserve and return the next episode id."""
+        self._next_episode += 1
+        return self._next_episode - 1
+
+    def new_episodes(self, count):
+        """Reserve ``count`` consecutive episode ids."""
+        start = self._next_episode
+        self._next_episode += count
+        return np.arange(start, start + count, dtype=np.uint32)
+
+    def append(self, episode, step, obs, action, reward, terminated, truncated, seed=UNKNOWN_SEED):
+        """Append one record per row; every argument is an array with one entry per row
+        (``seed`` may be a scalar)."""
+        n = len(reward)
+        if self._fill + n > len(self._chunk):
+            self.flush()
+        if n > len(self._chunk):
+            rows = np.empty(n, dtype=self.dtype)
+        else:
+            rows = self._chunk[self._fill:self._fill + n]
+        rows["episode"] = episode
+        rows["step"] = step
+        rows["seed"] = seed
+        rows["obs"] = np.reshape(obs, (n,) + self.dtype["obs"].shape)
+        rows["action"] = np.reshape(action, (n,) + self.dtype["action"].shape)
+        rows["reward"] = reward
+        rows["terminated"] = terminated
+        rows["truncated"] = truncated
+        if n > len(self._chunk):
+            self._file.write(rows.tobytes())
+        else:
+            self._fill += n
+
+    def flush(self):
+        """Write buffered records to the file."""
+        if self._fill:
+            self._file.write(self._chunk[:self._fill].tobytes())
+            self._fill = 0
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class TrajectoryReader:
+    """Memory-mapped view of a recording.
+
+    ``records`` is a structured ``np.memmap``; column scans such as
+    ``records["reward"].sum()`` page through the file instead of loading it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.header, offset = read_header(path)
+        self.env_kwargs = self.header["env_kwargs"]
+        self.dtype = record_dtype(self.header["obs_shape"], self.header["action_shape"])
+        count = (os.path.getsize(path) - offset) // self.dtype.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=offset, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def episode_ids(self):
+        """Ids of the episodes whose first step is in the file, in recording order."""
+        return np.asarray(self.records["episode"][self.records["step"] == 0])
+
+    def episode(self, episode_id):
+        """Records of one episode, in step order."""
+        idx = np.flatnonzero(self.records["episode"] == episode_id)
+        if idx.size == 0:
+            raise KeyError(f"episode {episode_id} is not in {self.path}")
+        if idx[-1] - idx[0] + 1 == idx.size:
+            return self.records[idx[0]:idx[-1] + 1]
+        # Vectorized recordings interleave episodes
+        return self.records[idx]
+
+
+class RecordingWrapper(gym.Wrapper):
+    """Record every step of a ``PongEnv`` to ``path``.
+
+    Each episode is reset with its own seed (drawn from ``seed`` when the
+    caller passes none), so any single episode can be replayed on its own.
+    """
+
+    def __init__(self, env, path, seed=None, chunk_records=CHUNK_RECORDS):
+        super().__init__(env)
+        base = env.unwrapped
+        env_kwargs = {
+            "two_player": base.two_player,
+            "frame_skip": base.frame_skip,
+            "fast_forward": base.fast_forward,
+            "max_fast_forward": base.max_fast_forward,
+        }
+        self.writer = TrajectoryWriter(
+            path, env.observation_space.shape, env.action_space.shape, env_kwargs, chunk_records
+        )
+        self._seeds = np.random.default_rng(seed)
+        self._obs = None
+        self._episode = 0
+        self._step = 0
+        self._seed = UNKNOWN_SEED
+
+    def reset(self, *, seed=None, options=None):
+        if seed is None:
+            seed = int(self._seeds.integers(2**31))
+        obs, info = self.env.reset(seed=seed, options=options)
+        self._obs = obs
+        self._episode = self.writer.new_episode()
+        self._step = 0
+        self._seed = seed
+        return obs, info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self.writer.append(
+            (self._episode,), (self._step,), self._obs[None], np.asarray(action)[None],
+            (reward,), (terminated,), (truncated,), seed=self._seed,
+        )
+        self._obs = obs
+        self._step += 1
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        self.writer.close()
+        super().close()
+
+
+def replay_episode(reader, episode_id, render=False, speed=1.0):
+    """Re-simulate a recorded episode from its actions.
+
+    Headless replays run as fast as possible; rendered ones play at
+    ``speed`` times real time (above 1x only every few frames are drawn).
+    Returns ``(steps, total_reward, mismatches)`` where ``mismatches``
+    counts steps whose simulated observation differs from the recording.
+    """
+    from pong_env import PongEnv  # pylint: disable=import-outside-toplevel
+
+    rows = reader.episode(episode_id)
+    env = PongEnv(render_mode="human" if render else None, **reader.env_kwargs)
+    stride = max(1, int(speed))
+    env.metadata = {**env.metadata, "render_fps": max(1, round(env.metadata["render_fps"] * speed / stride))}
+
+    seed = int(rows["seed"][0])
+    obs, _ = env.reset(seed=seed if seed != UNKNOWN_SEED else None)
+    if seed == UNKNOWN_SEED:
+        # Vectorized recordings have no per-episode seed; the serve is the
+        # only random draw and it is visible in the first observation
+        first = np.asarray(rows["obs"][0]).reshape(-1, obs.shape[-1])[0]
+        env.game.ball_speed_x, env.game.ball_speed_y = int(first[2]), int(first[3])
+        obs = env._get_obs()  # pylint: disable=protected-access
+
+    total_reward = 0.0
+    mismatches = 0
+    try:
+        for t, row in enumerate(rows):
+            mismatches += int(not np.array_equal(obs, row["obs"]))
+            action = row["action"] if reader.env_kwargs.get("two_player") else int(row["action"])
+            obs, reward, terminated, _, _ = env.step(action)
+            total_reward += reward
+            if render and t % stride == 0:
+                env.render()
+            if terminated:
+                break
+    finally:
+        env.close()
+    return len(rows), total_reward, mismatches